@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "Measurement" ADD COLUMN     "suppressed" INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,3 @@
+-- AlterTable
+ALTER TABLE "Device" ADD COLUMN     "health" JSONB,
+ADD COLUMN     "healthAt" TIMESTAMP(3);
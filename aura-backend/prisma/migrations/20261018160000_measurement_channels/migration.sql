@@ -0,0 +1,6 @@
+-- AlterTable
+ALTER TABLE "Measurement" ADD COLUMN     "seq" INTEGER,
+ADD COLUMN     "temperature" DOUBLE PRECISION,
+ADD COLUMN     "humidity" DOUBLE PRECISION,
+ADD COLUMN     "db" DOUBLE PRECISION,
+ADD COLUMN     "sound" DOUBLE PRECISION;
@@ -22,6 +22,19 @@ async function main() {
     });
   }
 
+  // Flota para tools/loadgen.py: SEED_FLEET=N crea AURA-LG00001..N
+  const fleet = Number(process.env.SEED_FLEET) || 0;
+  if (fleet > 0) {
+    const codes = Array.from({ length: fleet }, (_, i) =>
+      `AURA-LG${String(i + 1).padStart(5, "0")}`
+    );
+    const { count } = await prisma.device.createMany({
+      data: codes.map((code) => ({ code, registered: false, name: code })),
+      skipDuplicates: true,
+    });
+    console.log(`Flota de carga: ${count} códigos nuevos (${fleet} en total).`);
+  }
+
   console.log("Seeding de códigos de fábrica completo.");
 }
 
@@ -9,6 +9,8 @@ import { Server as SocketIOServer, Socket } from "socket.io";
 import authRoutes from "./routes/auth.js";
 import deviceRoutes from "./routes/device.js";
 import usersRoutes from "./routes/users.js";
+import { startMqttIngest } from "./mqtt.js";
+import { normalizeRoomState } from "./utils/roomState.js";
 import { PrismaClient } from "@prisma/client";
 
 dotenv.config();
@@ -43,6 +45,9 @@ const io = new SocketIOServer(server, {
   cors: { origin: "http://localhost:5173", credentials: true }
 });
 
+// Las rutas acceden a Socket.IO con req.app.get("io")
+app.set("io", io);
+
 io.on("connection", (socket: Socket) => {
   // El cliente debe pasar su userId en handshake.query
   const userId = socket.handshake.query.userId as string;
@@ -52,7 +57,7 @@ io.on("connection", (socket: Socket) => {
 // Nuevo endpoint definitivo
 app.post("/api/devices/data", async (req, res) => {
   // deviceId es en realidad el código público (p.ej. "AURA-ABC002")
-  const { code, measurement, roomState } = req.body;
+  const { code, measurement, roomState, suppressed } = req.body;
   
   // Normalizar estados con tildes
   const normalizedRoomState = normalizeRoomState(roomState);
@@ -71,7 +76,9 @@ app.post("/api/devices/data", async (req, res) => {
         deviceId: device.id,
         value: measurement,
         roomState: normalizedRoomState,  // Usamos el estado normalizado
-        timestamp: new Date()
+        timestamp: new Date(),
+        // Lecturas omitidas por el dispositivo desde el envío anterior
+        suppressed: typeof suppressed === "number" && suppressed > 0 ? Math.floor(suppressed) : 0
       }
     });
     // Emitimos al cliente conectado
@@ -83,20 +90,6 @@ app.post("/api/devices/data", async (req, res) => {
   }
 });
 
-// Función para normalizar estados emocionales (añadir tildes)
-function normalizeRoomState(state: string): string {
-  const stateMap: Record<string, string> = {
-    "Energia": "Energía",
-    "Estres": "Estrés",
-    "Monotonia": "Monotonía",
-    "Distraccion": "Distracción",
-    "Expectacion": "Expectación"
-  };
-  
-  // Devolver el estado normalizado o el original si no hay coincidencia
-  return stateMap[state] || state;
-}
-
 // Rutas de autenticación
 app.use("/auth", authRoutes);
 
@@ -109,6 +102,11 @@ app.use("/api/users", usersRoutes);
 // Health check
 app.get("/healthz", (req, res) => res.json({ status: "ok" }));
 
+// Lotes por MQTT (firmware con TRANSPORT = "mqtt"): opcional
+if (process.env.MQTT_URL) {
+  startMqttIngest(process.env.MQTT_URL, io);
+}
+
 const port = Number(process.env.PORT) || 4000;
 // Cambia a 0.0.0.0
 server.listen({ port, host: "0.0.0.0" }, () =>
@@ -27,5 +27,6 @@ export async function verifyDeviceCode(req: Request, res: Response, next: NextFu
 
   // Adjuntamos el deviceId al request para uso en la ruta
   (req as any).deviceId = device.id;
+  (req as any).device = device;
   next();
 }
@@ -0,0 +1,175 @@
+// aura-backend/src/mqtt.ts
+
+// Ingesta por MQTT (aura/transport.py, MqttTransport): el backend se
+// suscribe a aura/+/batch en el broker de MQTT_URL (mqtt://host:puerto) y
+// pasa cada mensaje, el mismo JSON que POST /devices/data/batch, por
+// ingestBatch. El código del dispositivo sale del tema. Las alertas
+// inmediatas (aura/alert.py) llegan en aura/+/alert con el JSON de
+// POST /devices/alert y van a pushAlert sin esperar a los lotes en cola.
+//
+// Cliente MQTT 3.1.1 mínimo sobre `net` (solo suscribirse): CONNECT,
+// SUBSCRIBE con QoS 1, PUBLISH entrantes QoS 0/1 (PUBACK tras guardar el
+// lote), PINGREQ cada mitad del keepalive y reconexión con retroceso.
+import net from "net";
+import { PrismaClient } from "@prisma/client";
+import { Server as SocketIOServer } from "socket.io";
+import { ingestBatch, pushAlert } from "./routes/device.js";
+
+const prisma = new PrismaClient();
+
+const TOPIC = "aura/+/batch";
+const ALERT_TOPIC = "aura/+/alert";
+const KEEPALIVE = 60; // s
+const RECONNECT_MAX = 60; // s
+
+const CONNECT = 0x10;
+const CONNACK = 0x20;
+const PUBLISH = 0x30;
+const PUBACK = 0x40;
+const SUBSCRIBE = 0x82;
+const SUBACK = 0x90;
+const PINGREQ = 0xc0;
+
+function varlen(n: number): Buffer {
+  const out: number[] = [];
+  do {
+    let b = n & 0x7f;
+    n >>= 7;
+    if (n) b |= 0x80;
+    out.push(b);
+  } while (n);
+  return Buffer.from(out);
+}
+
+function str(s: string): Buffer {
+  const b = Buffer.from(s);
+  const len = Buffer.alloc(2);
+  len.writeUInt16BE(b.length);
+  return Buffer.concat([len, b]);
+}
+
+function packet(type: number, body: Buffer): Buffer {
+  return Buffer.concat([Buffer.from([type]), varlen(body.length), body]);
+}
+
+async function handlePublish(topic: string, message: Buffer, io: SocketIOServer) {
+  const [, code, kind] = topic.split("/");
+  const what = kind === "alert" ? "alerta" : "lote";
+  const device = await prisma.device.findUnique({ where: { code } });
+  if (!device || !device.registered) {
+    console.warn(`mqtt: ${what} de ${code} sin dispositivo registrado`);
+    return;
+  }
+  let payload: unknown;
+  try {
+    payload = JSON.parse(message.toString("utf8"));
+  } catch {
+    console.warn(`mqtt: ${what} de ${code} con JSON inválido`);
+    return;
+  }
+  const { status, body } =
+    kind === "alert" ? pushAlert(device, payload, io) : await ingestBatch(device, payload, io);
+  if (status !== 200) {
+    console.warn(`mqtt: ${what} de ${code} rechazado (${status})`, body);
+  }
+}
+
+/**
+ * Conecta con el broker de `url` y mantiene la suscripción mientras viva
+ * el proceso. Los errores de red solo se registran y reconectan.
+ */
+export function startMqttIngest(url: string, io: SocketIOServer) {
+  const { hostname, port } = new URL(url);
+  let delay = 1;
+
+  const connect = () => {
+    const socket = net.connect(Number(port) || 1883, hostname);
+    let buf = Buffer.alloc(0);
+    let ping: NodeJS.Timeout | undefined;
+    // Los lotes se guardan en orden: cada PUBLISH espera al anterior
+    let queue = Promise.resolve();
+
+    socket.on("connect", () => {
+      const clientId = `aura-backend-${process.pid}`;
+      const header = Buffer.from([0, 4, 0x4d, 0x51, 0x54, 0x54, 4, 0x02, 0, KEEPALIVE]);
+      socket.write(packet(CONNECT, Buffer.concat([header, str(clientId)])));
+    });
+
+    socket.on("data", (chunk) => {
+      buf = Buffer.concat([buf, chunk]);
+      for (;;) {
+        // Cabecera fija: tipo + longitud restante (1–4 bytes)
+        let len = 0;
+        let mult = 1;
+        let pos = 1;
+        for (; pos < buf.length && pos < 5; pos++) {
+          len += (buf[pos] & 0x7f) * mult;
+          mult *= 128;
+          if (!(buf[pos] & 0x80)) break;
+        }
+        if (pos >= buf.length || buf.length < pos + 1 + len) return;
+        const type = buf[0];
+        const body = buf.subarray(pos + 1, pos + 1 + len);
+        buf = buf.subarray(pos + 1 + len);
+
+        switch (type & 0xf0) {
+          case CONNACK:
+            if (body[1] !== 0) {
+              console.error(`mqtt: CONNACK rechazado (${body[1]})`);
+              socket.destroy();
+              return;
+            }
+            delay = 1;
+            socket.write(
+              packet(
+                SUBSCRIBE,
+                Buffer.concat([
+                  Buffer.from([0, 1]),
+                  str(TOPIC),
+                  Buffer.from([1]),
+                  str(ALERT_TOPIC),
+                  Buffer.from([0]),
+                ])
+              )
+            );
+            ping = setInterval(() => socket.write(Buffer.from([PINGREQ, 0])), (KEEPALIVE * 1000) / 2);
+            break;
+          case SUBACK:
+            console.log(`mqtt: suscrito a ${TOPIC} y ${ALERT_TOPIC} en ${url}`);
+            break;
+          case PUBLISH: {
+            const qos = (type >> 1) & 3;
+            const tlen = body.readUInt16BE(0);
+            const topic = body.subarray(2, 2 + tlen).toString("utf8");
+            const pid = qos ? body.subarray(2 + tlen, 4 + tlen) : null;
+            const message = Buffer.from(body.subarray(qos ? 4 + tlen : 2 + tlen));
+            if (topic.endsWith("/alert")) {
+              // Alertas (QoS 0): al momento, sin esperar a los lotes en cola
+              handlePublish(topic, message, io).catch((err) => console.error("mqtt:", err));
+              break;
+            }
+            queue = queue
+              .then(() => handlePublish(topic, message, io))
+              .catch((err) => console.error("mqtt:", err))
+              .then(() => {
+                if (pid && !socket.destroyed) {
+                  socket.write(packet(PUBACK, Buffer.from(pid)));
+                }
+              });
+            break;
+          }
+          // PINGRESP: nada que hacer
+        }
+      }
+    });
+
+    socket.on("error", (err) => console.error("mqtt:", err.message));
+    socket.on("close", () => {
+      if (ping) clearInterval(ping);
+      setTimeout(connect, delay * 1000);
+      delay = Math.min(delay * 2, RECONNECT_MAX);
+    });
+  };
+
+  connect();
+}
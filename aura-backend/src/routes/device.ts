@@ -1,12 +1,77 @@
 // aura-backend/src/routes/device.ts
 import { Router, Request, Response } from "express";
-import { PrismaClient } from "@prisma/client";
+import { PrismaClient, Device } from "@prisma/client";
+import { createHash } from "crypto";
+import { Server as SocketIOServer } from "socket.io";
 import { verifyDeviceCode } from "../middleware/deviceAuth.js";
 import { verifyToken, AuthReq } from "../middleware/auth.js";
+import { normalizeRoomState } from "../utils/roomState.js";
+import { decodeRecords, MeasurementRecord } from "../utils/codec.js";
 
 const prisma = new PrismaClient();
 const router = Router();
 
+// Envío agrupado: parámetros ajustables por despliegue
+const BATCH_SIZE = Number(process.env.DEVICE_BATCH_SIZE) || 10;
+const FLUSH_INTERVAL = Number(process.env.DEVICE_FLUSH_INTERVAL) || 300; // s
+const MAX_BATCH_ITEMS = 500;
+
+// Envío por cambios (aura/policy.py): bandas muertas y latido en s
+const DEADBAND_TEMP = Number(process.env.DEVICE_DEADBAND_TEMP) || 0.5; // °C
+const DEADBAND_HUM = Number(process.env.DEVICE_DEADBAND_HUM) || 2; // %
+const DEADBAND_SOUND = Number(process.env.DEVICE_DEADBAND_SOUND) || 0.1; // nivel 0-1
+const HEARTBEAT = Number(process.env.DEVICE_HEARTBEAT) || 600; // s
+
+// Calibración de sonido (aura/loudness.py): dB SPL a 0 dBFS si el
+// dispositivo no tiene la suya. INMP441: -26 dBFS a 94 dB SPL.
+const DB_OFFSET = Number(process.env.DEVICE_DB_OFFSET) || 120;
+
+// Revalidación de la config (aura/config.py): s entre GET condicionales
+const CONFIG_REFRESH = Number(process.env.DEVICE_CONFIG_REFRESH) || 600;
+
+// Alertas inmediatas (aura/alert.py): s mínimos entre alertas de un mismo umbral
+const ALERT_COOLDOWN = Number(process.env.DEVICE_ALERT_COOLDOWN) || 10;
+const ALERT_FIELDS = ["temp", "hum", "sound"];
+
+// Registro por long-poll (aura/register.py): s máximos que se retiene la consulta
+const REGISTER_WAIT_MAX = Number(process.env.DEVICE_REGISTER_WAIT) || 30;
+
+// Consultas de registro en espera, por código de dispositivo. Al reclamar
+// (POST /devices) se despiertan; en varias instancias, la que no atiende el
+// reclamo responde al vencer la espera, tras volver a mirar la base de datos.
+const registrationWaiters = new Map<string, Set<() => void>>();
+
+function wakeRegistration(code: string) {
+  const waiters = registrationWaiters.get(code);
+  if (!waiters) return;
+  registrationWaiters.delete(code);
+  for (const wake of waiters) wake();
+}
+
+/**
+ * Configuración efectiva de un dispositivo y su versión: hash corto del
+ * JSON. La versión es el ETag de GET /config y viaja como `configVersion`
+ * en las respuestas de envío, para que el dispositivo sepa cuándo
+ * revalidar su copia en flash.
+ */
+function deviceConfig(device: Device) {
+  const config = {
+    samplingInterval: device.registered ? 60 : 300,
+    alias: device.name,
+    batchSize: BATCH_SIZE,
+    flushInterval: FLUSH_INTERVAL,
+    deadbandTemp: DEADBAND_TEMP,
+    deadbandHum: DEADBAND_HUM,
+    deadbandSound: DEADBAND_SOUND,
+    heartbeat: HEARTBEAT,
+    dbOffset: device.dbOffset ?? DB_OFFSET,
+    configRefresh: CONFIG_REFRESH,
+    alertCooldown: ALERT_COOLDOWN,
+  };
+  const version = createHash("sha1").update(JSON.stringify(config)).digest("hex").slice(0, 12);
+  return { config, version };
+}
+
 /**
  * POST /devices/data
  * Body: { emotion: string, value: number, timestamp?: string }
@@ -37,33 +102,274 @@ router.post(
   }
 );
 
+/**
+ * POST /devices/data/batch
+ * Body: { code, items: [{ measurement: number, roomState: string, age?: number, ts?: number, suppressed?: number, stats?: object,
+ *         temperature?: number, humidity?: number, db?: number, sound?: number }], records?: string, health?: object }
+ * `age` es la antigüedad de la lectura en ms respecto al envío; `ts` es la
+ * hora de la lectura en segundos Unix (mediciones reenviadas desde flash).
+ * `suppressed` son las lecturas que el dispositivo omitió antes de esta por
+ * no haber cambios (banda muerta). `stats` es el resumen de la ventana de
+ * reporte (n, media, desviación, mín, máx y último de temp/hum/sound) y,
+ * con micrófono I2S, `audio`: bloques, pico, LAmax y LA10/LA50/LA90 en dB.
+ * `records` (opcional) son los registros binarios de las lecturas en base64
+ * (utils/codec.ts), uno por item y en el mismo orden: temperatura, humedad,
+ * dB, nivel, seq y hora del dispositivo. Si no vienen, los canales se toman
+ * de los campos del item (mediciones reenviadas desde flash).
+ * `health` (opcional, a nivel de lote) son los tiempos y el heap por fase
+ * del dispositivo (aura.probe); se guarda el último en el Device.
+ * Inserta todas las mediciones con un único createMany. La respuesta
+ * lleva `configVersion` (ver deviceConfig). Los lotes que llegan por MQTT
+ * pasan por la misma ingesta (ingestBatch, src/mqtt.ts).
+ */
+router.post(
+  "/data/batch",
+  verifyDeviceCode,
+  async (req: Request, res: Response) => {
+    const { status, body } = await ingestBatch((req as any).device, req.body, req.app.get("io"));
+    return res.status(status).json(body);
+  }
+);
+
+/**
+ * Valida e inserta un lote de mediciones de `device` (cuerpo de
+ * POST /devices/data/batch o mensaje MQTT de aura/<código>/batch, ver
+ * src/mqtt.ts). Devuelve el código HTTP y la respuesta.
+ */
+export async function ingestBatch(
+  device: Device,
+  payload: any,
+  io?: SocketIOServer
+): Promise<{ status: number; body: object }> {
+  const { items, health, records } = payload ?? {};
+
+  if (!Array.isArray(items) || items.length === 0) {
+    return { status: 400, body: { message: "Campo 'items' es necesario" } };
+  }
+  if (items.length > MAX_BATCH_ITEMS) {
+    return { status: 413, body: { message: `Máximo ${MAX_BATCH_ITEMS} mediciones por lote` } };
+  }
+  let decoded: MeasurementRecord[] | null = null;
+  if (records !== undefined) {
+    try {
+      decoded = typeof records === "string" ? decodeRecords(records) : null;
+    } catch {
+      decoded = null;
+    }
+    if (!decoded || decoded.length !== items.length) {
+      return {
+        status: 400,
+        body: { message: "Campo 'records' inválido: un registro por medición" },
+      };
+    }
+  }
+  if (!device.ownerId) {
+    return { status: 200, body: { status: "no_registrado" } };
+  }
+
+  const num = (v: unknown) => (typeof v === "number" && Number.isFinite(v) ? v : null);
+  const now = Date.now();
+  const data = [];
+  for (const [i, item] of items.entries()) {
+    if (!item || typeof item.measurement !== "number" || typeof item.roomState !== "string") {
+      return {
+        status: 400,
+        body: { message: "Cada medición necesita 'measurement' y 'roomState'" },
+      };
+    }
+    const rec = decoded ? decoded[i] : null;
+    const age = typeof item.age === "number" && item.age > 0 ? item.age : 0;
+    const ts = typeof item.ts === "number" ? item.ts : rec?.ts ?? 0;
+    const timestamp =
+      ts > 0 && ts * 1000 <= now ? new Date(ts * 1000) : new Date(now - age);
+    data.push({
+      deviceId: device.id,
+      value: item.measurement,
+      roomState: normalizeRoomState(item.roomState),
+      timestamp,
+      suppressed:
+        typeof item.suppressed === "number" && item.suppressed > 0
+          ? Math.floor(item.suppressed)
+          : 0,
+      stats:
+        item.stats && typeof item.stats === "object" && !Array.isArray(item.stats)
+          ? item.stats
+          : undefined,
+      seq: rec ? rec.seq : undefined,
+      temperature: rec ? rec.temperature : num(item.temperature),
+      humidity: rec ? rec.humidity : num(item.humidity),
+      db: rec ? rec.db : num(item.db),
+      sound: rec ? rec.sound : num(item.sound),
+    });
+  }
+
+  try {
+    const { count } = await prisma.measurement.createMany({ data });
+    if (health && typeof health === "object" && !Array.isArray(health)) {
+      await prisma.device.update({
+        where: { id: device.id },
+        data: { health, healthAt: new Date(now) },
+      });
+    }
+    // El dashboard solo necesita la lectura más reciente del lote
+    io?.to(`user-${device.ownerId}`).emit("new_measurement", data[data.length - 1]);
+    return {
+      status: 200,
+      body: { status: "ok", count, configVersion: deviceConfig(device).version },
+    };
+  } catch (err) {
+    console.error(err);
+    return { status: 500, body: { status: "error" } };
+  }
+}
+
+/**
+ * POST /devices/alert
+ * Cabecera x-device-code. Body: { state: string, on: boolean, field: "temp" | "hum" | "sound",
+ *         value: number, limit: number, age?: number, held?: number, seq?: number }
+ * Alerta inmediata del dispositivo (aura/alert.py): la sala entra en un
+ * estado de alerta (on) o sale de él al cruzar un umbral, entre reportes.
+ * `age` son los ms desde el cruce hasta el envío y `held` los cambios que
+ * el límite de ritmo del dispositivo no llegó a notificar. No se guarda:
+ * se emite en el momento al dashboard (evento "device_alert"); el estado
+ * llega a la base de datos con el siguiente lote. Por MQTT llega en
+ * aura/<código>/alert (src/mqtt.ts).
+ */
+router.post(
+  "/alert",
+  verifyDeviceCode,
+  (req: Request, res: Response) => {
+    const { status, body } = pushAlert((req as any).device, req.body, req.app.get("io"));
+    return res.status(status).json(body);
+  }
+);
+
+/**
+ * Valida una alerta de `device` y la emite al dueño por Socket.IO, sin
+ * esperar a la base de datos. Devuelve el código HTTP y la respuesta.
+ */
+export function pushAlert(
+  device: Device,
+  payload: any,
+  io?: SocketIOServer
+): { status: number; body: object } {
+  const { state, on, field, value, limit, age, held, seq } = payload ?? {};
+  if (
+    typeof state !== "string" ||
+    typeof on !== "boolean" ||
+    !ALERT_FIELDS.includes(field) ||
+    typeof value !== "number" ||
+    typeof limit !== "number"
+  ) {
+    return {
+      status: 400,
+      body: { message: "Campos 'state', 'on', 'field', 'value' y 'limit' son necesarios" },
+    };
+  }
+  if (!device.ownerId) {
+    return { status: 200, body: { status: "no_registrado" } };
+  }
+  const now = Date.now();
+  const ms = typeof age === "number" && age > 0 ? Math.min(age, 60000) : 0;
+  io?.to(`user-${device.ownerId}`).emit("device_alert", {
+    deviceId: device.id,
+    code: device.code,
+    roomState: normalizeRoomState(state),
+    on,
+    field,
+    value,
+    limit,
+    held: typeof held === "number" && held > 0 ? Math.floor(held) : 0,
+    seq: typeof seq === "number" ? seq : undefined,
+    timestamp: new Date(now - ms),
+  });
+  return { status: 200, body: { status: "ok" } };
+}
+
 /**
  * GET /devices/config
- * Devuelve la configuración actual del dispositivo
+ * Devuelve la configuración actual del dispositivo y su versión, con
+ * ETag. Si If-None-Match coincide responde 304 sin cuerpo: el
+ * dispositivo sigue con la copia que guarda en flash.
  */
 router.get(
   "/config",
   verifyDeviceCode,
   async (req: Request, res: Response) => {
-    const deviceId = (req as any).deviceCode as string;
+    const deviceId = (req as any).deviceId as string;
     const device = await prisma.device.findUnique({ where: { id: deviceId } });
     if (!device) {
       return res.status(404).json({ message: "Dispositivo no registrado" });
     }
 
-    // Ejemplo de configuración
-    const config = {
-      samplingInterval: device.registered ? 60 : 300,
-      alias: device.name,
-    };
+    const { config, version } = deviceConfig(device);
+    const etag = `"${version}"`;
+    res.set("ETag", etag);
+    res.set("Cache-Control", "no-cache");
+    const inm = req.headers["if-none-match"];
+    if (inm && inm.split(",").some((t) => t.trim() === etag)) {
+      return res.status(304).end();
+    }
 
-    return res.json({ config });
+    return res.json({ config, version });
   }
 );
 
+/**
+ * GET /devices/registration?wait=<s>
+ * Cabecera x-device-code. Estado de registro para un dispositivo sin
+ * reclamar, sin escribir nada: { status: "ok" } si ya tiene dueño. Si no,
+ * con `wait` (máx. REGISTER_WAIT_MAX) retiene la petición hasta que se
+ * reclame o pase ese tiempo, y entonces responde
+ * { status: "ok" | "no_registrado", wait } con los s retenidos.
+ */
+router.get("/registration", async (req: Request, res: Response) => {
+  const header = req.headers["x-device-code"];
+  if (typeof header !== "string" || !header) {
+    return res.status(401).json({ message: "Código de dispositivo requerido" });
+  }
+  const code: string = header;
+  const claimed = async () =>
+    !!(await prisma.device.findUnique({ where: { code }, select: { ownerId: true } }))?.ownerId;
+
+  if (await claimed()) {
+    return res.json({ status: "ok" });
+  }
+  const wait = Math.min(Math.max(Number(req.query.wait) || 0, 0), REGISTER_WAIT_MAX);
+  if (!wait) {
+    return res.json({ status: "no_registrado", wait: 0 });
+  }
+
+  const t0 = Date.now();
+  let gone = false;
+  await new Promise<void>((resolve) => {
+    const timer = setTimeout(done, wait * 1000);
+    let waiters = registrationWaiters.get(code);
+    if (!waiters) registrationWaiters.set(code, (waiters = new Set()));
+    waiters.add(done);
+    // El dispositivo cortó la conexión (timeout, reinicio): no esperar más
+    res.on("close", () => {
+      gone = true;
+      done();
+    });
+    function done() {
+      clearTimeout(timer);
+      waiters!.delete(done);
+      if (!waiters!.size && registrationWaiters.get(code) === waiters) {
+        registrationWaiters.delete(code);
+      }
+      resolve();
+    }
+  });
+  if (gone) return;
+  const held = Math.round((Date.now() - t0) / 1000);
+  return res.json({ status: (await claimed()) ? "ok" : "no_registrado", wait: Math.max(held, 1) });
+});
+
 /**
  * POST /devices
- * Body: { code, name?, description?, location? }
+ * Body: { code, name?, description?, location?, dbOffset? }
+ * `dbOffset` es la calibración del micrófono del dispositivo (dB SPL a 0 dBFS).
  * Requiere Authorization: Bearer <token>
  */
 router.post(
@@ -72,7 +378,7 @@ router.post(
   async (req: AuthReq, res: Response) => {
     const userId = req.user!.id;
 
-    const { code, name, description, location } = req.body;
+    const { code, name, description, location, dbOffset } = req.body;
     if (!code) {
       return res.status(400).json({ message: "El código de dispositivo es obligatorio" });
     }
@@ -93,8 +399,10 @@ router.post(
         name,
         description,
         location,
+        dbOffset: typeof dbOffset === "number" && isFinite(dbOffset) ? dbOffset : undefined,
       },
     });
+    wakeRegistration(code);
 
     return res.status(201).json(updated);
   }
@@ -0,0 +1,76 @@
+// aura-backend/src/utils/codec.ts
+
+// Registros binarios de las lecturas (versión 1, ver aura/codec.py):
+// 18 bytes little-endian por lectura, en base64 en el campo "records"
+// de POST /devices/data/batch.
+//
+//   off tipo campo
+//    0  u8   versión
+//    1  u8   estado (índice de aura/states.py; 255 = desconocido)
+//    2  u32  seq
+//    6  u32  ts (segundos Unix; 0 = reloj sin poner en hora)
+//   10  i16  temperatura x100
+//   12  u16  humedad x100
+//   14  i16  dB x100
+//   16  u16  nivel 0-1 x10000
+export const RECORD_VERSION = 1;
+export const RECORD_SIZE = 18;
+
+const NONE_I16 = -32768;
+const NONE_U16 = 0xffff;
+
+// Mismo orden que aura/states.py (solo se añaden estados al final)
+const STATES = [
+  "Confort",
+  "Incomodidad",
+  "Calma",
+  "Estrés",
+  "Expectativa",
+  "Energía",
+  "Distracción",
+  "Monotonía",
+  "Conflicto",
+];
+
+export interface MeasurementRecord {
+  seq: number;
+  ts: number;
+  state: string | null;
+  temperature: number | null;
+  humidity: number | null;
+  db: number | null;
+  sound: number | null;
+}
+
+/**
+ * Decodifica todos los registros de un texto base64. Lanza un Error si
+ * la longitud no es múltiplo de RECORD_SIZE o algún registro es de otra
+ * versión.
+ */
+export function decodeRecords(b64: string): MeasurementRecord[] {
+  const buf = Buffer.from(b64, "base64");
+  if (buf.length % RECORD_SIZE !== 0) {
+    throw new Error(`records: ${buf.length} bytes no son registros enteros`);
+  }
+  const out: MeasurementRecord[] = [];
+  for (let off = 0; off < buf.length; off += RECORD_SIZE) {
+    const version = buf.readUInt8(off);
+    if (version !== RECORD_VERSION) {
+      throw new Error(`records: versión ${version} desconocida`);
+    }
+    const t = buf.readInt16LE(off + 10);
+    const h = buf.readUInt16LE(off + 12);
+    const db = buf.readInt16LE(off + 14);
+    const lvl = buf.readUInt16LE(off + 16);
+    out.push({
+      seq: buf.readUInt32LE(off + 2),
+      ts: buf.readUInt32LE(off + 6),
+      state: STATES[buf.readUInt8(off + 1)] ?? null,
+      temperature: t === NONE_I16 ? null : t / 100,
+      humidity: h === NONE_U16 ? null : h / 100,
+      db: db === NONE_I16 ? null : db / 100,
+      sound: lvl === NONE_U16 ? null : lvl / 10000,
+    });
+  }
+  return out;
+}
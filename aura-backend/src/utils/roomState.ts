@@ -0,0 +1,15 @@
+// aura-backend/src/utils/roomState.ts
+
+// Función para normalizar estados emocionales (añadir tildes)
+export function normalizeRoomState(state: string): string {
+  const stateMap: Record<string, string> = {
+    "Energia": "Energía",
+    "Estres": "Estrés",
+    "Monotonia": "Monotonía",
+    "Distraccion": "Distracción",
+    "Expectacion": "Expectación"
+  };
+  
+  // Devolver el estado normalizado o el original si no hay coincidencia
+  return stateMap[state] || state;
+}
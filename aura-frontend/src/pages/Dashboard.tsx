@@ -19,6 +19,7 @@ interface Device {
     emotion: string;
     value: number;
     timestamp: string;
+    suppressed?: number;
   };
 }
 
@@ -28,8 +29,29 @@ interface MeasurementRecord {
   value: number;
   roomState: string;
   timestamp: string;
+  suppressed?: number; // lecturas sin cambios que el dispositivo no envió
 }
 
+// Alerta inmediata del dispositivo (POST /api/devices/alert): la sala
+// entra en un estado de alerta (on) o sale de él, sin esperar al lote
+interface DeviceAlert {
+  deviceId: string;
+  code: string;
+  roomState: string;
+  on: boolean;
+  field: "temp" | "hum" | "sound";
+  value: number;
+  limit: number;
+  held: number;
+  timestamp: string;
+}
+
+const ALERT_FIELDS: Record<DeviceAlert["field"], string> = {
+  temp: "Temperatura",
+  hum: "Humedad",
+  sound: "Sonido",
+};
+
 export default function Dashboard() {
   const token = useAuth((s) => s.token);
   const navigate = useNavigate();
@@ -40,6 +62,8 @@ export default function Dashboard() {
   const [expandedId, setExpandedId] = useState<string | null>(null);
   const [alerts, setAlerts] = useState<string[]>([]);
   const [alertEmotions, setAlertEmotions] = useState<Record<string, string>>({});
+  // Alertas activas por dispositivo y umbral ("<deviceId>:<field>")
+  const [liveAlerts, setLiveAlerts] = useState<Record<string, DeviceAlert>>({});
 
   // Mapeo de emociones a colores
   const EMOTION_COLORS: Record<string, string> = {
@@ -72,6 +96,19 @@ export default function Dashboard() {
     const sock = io("http://localhost:4000", {
       query: { userId: String(userId) },
     });
+    // lanza la animación y overlay durante 3s
+    const flash = (deviceId: string, emotion: string) => {
+      setAlertEmotions((prev) => ({ ...prev, [deviceId]: emotion }));
+      setAlerts((prev) => [...prev, deviceId]);
+      setTimeout(() => {
+        setAlerts((prev) => prev.filter((id) => id !== deviceId));
+        setAlertEmotions((prev) => {
+          const rest = { ...prev };
+          delete rest[deviceId];
+          return rest;
+        });
+      }, 3000);
+    };
     sock.on("new_measurement", (rec: MeasurementRecord) => {
       // actualiza última medición
       setDevices((prev) =>
@@ -83,22 +120,24 @@ export default function Dashboard() {
                   emotion: rec.roomState,
                   value: rec.value,
                   timestamp: rec.timestamp,
+                  suppressed: rec.suppressed,
                 },
               }
             : d
         )
       );
-      // lanza la animación y overlay durante 3s
-      setAlertEmotions((prev) => ({ ...prev, [rec.deviceId]: rec.roomState }));
-      setAlerts((prev) => [...prev, rec.deviceId]);
-      setTimeout(() => {
-        setAlerts((prev) => prev.filter((id) => id !== rec.deviceId));
-        setAlertEmotions((prev) => {
-          const rest = { ...prev };
-          delete rest[rec.deviceId];
-          return rest;
-        });
-      }, 3000);
+      flash(rec.deviceId, rec.roomState);
+    });
+    // alertas inmediatas: quedan en la tarjeta hasta que llega su "on: false"
+    sock.on("device_alert", (alert: DeviceAlert) => {
+      const key = `${alert.deviceId}:${alert.field}`;
+      setLiveAlerts((prev) => {
+        const rest = { ...prev };
+        if (alert.on) rest[key] = alert;
+        else delete rest[key];
+        return rest;
+      });
+      if (alert.on) flash(alert.deviceId, alert.roomState);
     });
     setSocket(sock);
     return () => {
@@ -145,6 +184,7 @@ export default function Dashboard() {
           const borderColor = d.lastMeasurement
             ? EMOTION_COLORS[d.lastMeasurement.emotion]
             : undefined;
+          const deviceAlerts = Object.values(liveAlerts).filter((a) => a.deviceId === d.id);
 
           return (
             <div
@@ -180,6 +220,24 @@ export default function Dashboard() {
                 </span>
               </button>
 
+              {/* Alertas activas (llegan en cuanto el dispositivo cruza el umbral) */}
+              {deviceAlerts.length > 0 && (
+                <div className="px-4 pb-3 space-y-1">
+                  {deviceAlerts.map((a) => (
+                    <p
+                      key={a.field}
+                      className="text-sm font-semibold"
+                      style={{ color: EMOTION_COLORS[a.roomState] }}
+                    >
+                      ⚠ {a.roomState}: {ALERT_FIELDS[a.field]} {a.value} (límite {a.limit})
+                      <span className="ml-2 text-xs text-gray-400">
+                        {new Date(a.timestamp).toLocaleTimeString()}
+                      </span>
+                    </p>
+                  ))}
+                </div>
+              )}
+
               {/* Detalles expandibles */}
               {expandedId === d.id && (
                 <div className="p-4 bg-gray-50 space-y-2">
@@ -205,6 +263,11 @@ export default function Dashboard() {
                           d.lastMeasurement.timestamp
                         ).toLocaleString()}
                       </p>
+                      {!!d.lastMeasurement.suppressed && (
+                        <p className="text-xs text-gray-400">
+                          Sala estable: {d.lastMeasurement.suppressed} lecturas sin cambios
+                        </p>
+                      )}
                     </div>
                   ) : (
                     <p className="text-gray-500">Sin mediciones aún</p>
@@ -0,0 +1,22 @@
+"""
+aura – módulos comunes del dispositivo AURA
+-------------------------------------------
+Copiar el directorio aura/ completo a la raíz de la Pico W junto a main.py,
+mejor ya compilado a .mpy (tools/build_mpy.py): así la Pico no compila
+la fuente en cada arranque. Todos los módulos funcionan en MicroPython y
+en CPython (herramientas de host).
+
+Los módulos de uso raro se importan dentro de la función que los usa
+(aura.sampler, aura.mqtt, aura.register...); unload() suelta los de un
+solo uso para que el recolector recupere su RAM.
+"""
+
+import sys
+
+
+def unload(name):
+    """Olvida aura.<name> (sys.modules y el paquete); gc.collect() hace el resto."""
+    sys.modules.pop("aura." + name, None)
+    g = globals()
+    if name in g:
+        del g[name]
@@ -0,0 +1,34 @@
+"""
+Ruta rápida (emisor viper) para aura.level.
+Solo se importa en puertos de MicroPython con emisor nativo; en CPython
+falla el import de micropython y aura.level usa la versión en Python puro.
+"""
+
+import micropython
+
+
+@micropython.viper
+def accumulate(buf, n: int, out) -> int:
+    """
+    Recorre n muestras PCM int16 (little-endian) de buf sin asignar memoria.
+    Escribe en out (array('i') de 3): suma de cuadrados en dos palabras de
+    30 bits (bajo, alto) y el pico absoluto. Devuelve n.
+    """
+    p = ptr16(buf)
+    o = ptr32(out)
+    lo = 0
+    hi = 0
+    peak = 0
+    for i in range(n):
+        s = p[i]
+        if s & 0x8000:
+            s = 0x10000 - s           # valor absoluto del complemento a 2
+        if s > peak:
+            peak = s
+        lo += s * s                   # s*s <= 2^30, lo < 2^30: no desborda
+        hi += lo >> 30
+        lo &= 0x3FFFFFFF
+    o[0] = lo
+    o[1] = hi
+    o[2] = peak
+    return n
@@ -0,0 +1,57 @@
+"""
+Ruta rápida (emisor viper) para aura.loudness.
+Mismos enteros que aura.loudness._weight; coef y state son array('i')
+de 2 * 4 + 1 elementos. En CPython falla el import de micropython y
+aura.loudness usa la versión en Python puro.
+"""
+
+import micropython
+
+
+@micropython.viper
+def weight(buf, n: int, coef, state, out) -> int:
+    p = ptr16(buf)
+    c = ptr32(coef)
+    st = ptr32(state)
+    o = ptr32(out)
+    lo = 0
+    hi = 0
+    for i in range(n):
+        s = p[i]
+        if s & 0x8000:
+            s -= 0x10000
+        x = s << 8
+        k = 0
+        while k < 8:
+            v = x - st[k]
+            b = c[k + 1]
+            y1 = st[k + 1]
+            a = c[k]
+            # (v * b + y1 * a) >> 15 en productos de 31 bits
+            y = b * (v >> 15) + ((b * (v & 0x7FFF)) >> 15) \
+                + a * (y1 >> 15) + ((a * (y1 & 0x7FFF)) >> 15)
+            st[k] = x
+            st[k + 1] = y
+            x = y
+            k += 2
+        v = st[8]
+        f = c[8]
+        y = x + f * (v >> 15) + ((f * (v & 0x7FFF)) >> 15)
+        st[8] = x
+        e = (y + 128) >> 8
+        if e < 0:
+            e = 0 - e
+        if e > 46340:
+            if e > 0xFFFF:
+                e = 0xFFFF
+            h = e >> 1
+            q = h * h
+            hi += q >> 28
+            lo += ((q & 0x0FFFFFFF) << 2) + (e & 1) * (2 * e - 1)
+        else:
+            lo += e * e
+        hi += lo >> 30
+        lo &= 0x3FFFFFFF
+    o[0] = lo
+    o[1] = hi
+    return n
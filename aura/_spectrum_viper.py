@@ -0,0 +1,88 @@
+"""
+Ruta rápida (emisor viper) para aura.spectrum.
+Mismas funciones y resultados que el núcleo en Python puro; los arrays
+de trabajo son array('i') / array('I') / array('H') para leerlos con
+ptr32 / ptr16 sin asignar memoria. En CPython falla el import de
+micropython y aura.spectrum usa la versión en Python puro.
+"""
+
+import micropython
+
+
+@micropython.viper
+def load(buf, off: int, re, im, win, rev, n: int, shift: int) -> int:
+    p = ptr16(buf)
+    r = ptr32(re)
+    q = ptr32(im)
+    w = ptr16(win)
+    v = ptr16(rev)
+    for i in range(n):
+        s = p[off + i]
+        if s & 0x8000:
+            s -= 0x10000              # int16 con signo
+        j = v[i]
+        r[j] = ((s << shift) * w[i]) >> 15
+        q[j] = 0
+    return n
+
+
+@micropython.viper
+def fft(re, im, cos_t, sin_t, bits: int) -> int:
+    """|re|, |im| <= 2^15 y giro en Q15: cada producto cabe en 31 bits."""
+    r = ptr32(re)
+    q = ptr32(im)
+    c = ptr32(cos_t)
+    s = ptr32(sin_t)
+    n = 1 << bits
+    half = 1
+    step = n >> 1
+    while half < n:
+        span = half << 1
+        j = 0
+        while j < half:
+            wc = c[j * step]
+            ws = s[j * step]
+            i = j
+            while i < n:
+                m = i + half
+                tr = (r[m] * wc + q[m] * ws) >> 15
+                ti = (q[m] * wc - r[m] * ws) >> 15
+                a = r[i]
+                b = q[i]
+                r[m] = (a - tr) >> 1
+                q[m] = (b - ti) >> 1
+                r[i] = (a + tr) >> 1
+                q[i] = (b + ti) >> 1
+                i += span
+            j += 1
+        half = span
+        step >>= 1
+    return n
+
+
+@micropython.viper
+def power(re, im, acc, n: int) -> int:
+    r = ptr32(re)
+    q = ptr32(im)
+    a = ptr32(acc)
+    for k in range(n):
+        x = r[k]
+        y = q[k]
+        a[k] += (x * x + y * y) >> 8
+    return n
+
+
+@micropython.viper
+def crossings(buf, n: int) -> int:
+    p = ptr8(buf)
+    c = 0
+    prev = p[1] & 0x80
+    i = 3
+    end = 2 * n
+    while i < end:
+        s = p[i] & 0x80
+        if s != prev:
+            c += 1
+            prev = s
+        i += 2
+    return c
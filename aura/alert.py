@@ -0,0 +1,221 @@
+"""
+aura.alert – alertas inmediatas por cruce de umbral, con histéresis
+-------------------------------------------------------------------
+Con un reporte cada 30–60 s, un paso a "Estrés" solo se conoce al cerrar
+la ventana (aura.stats) y llega al dashboard con el siguiente lote.
+EdgeDetector vigila los valores entre reportes y da un evento en cuanto
+la sala entra en un estado de alerta o sale de él:
+
+- sonido: nivel con ponderación Fast (LoudnessMeter.fast) cada pocos
+  cientos de ms, sin tocar la ventana de reporte;
+- temperatura y humedad: cada lectura del DHT (cada muestra).
+
+Los umbrales son las reglas de aura.classify de una sola condición cuyo
+estado está en `states` (por defecto Estrés e Incomodidad), de modo que
+no pueden desincronizarse de la clasificación:
+
+    Estrés       sound > 0.7
+    Incomodidad  temp > 27, temp < 19, hum > 70, hum < 30
+
+Histéresis: un umbral se activa cuando el valor lo rebasa durante
+`hold_ms` seguidos (un golpe o un portazo no bastan) y se desactiva
+cuando pasa `release_ms` más allá del límite menos su banda (las bandas
+muertas de aura.policy: deadbandTemp/Hum/Sound). Ataque rápido y
+liberación lenta: una pausa en una conversación fuerte no cierra la
+alerta y un valor que ronda el límite no da una alerta por muestra. Temperatura y humedad llegan cada
+muestra: para ellas hold_ms equivale a dos lecturas seguidas (un fallo
+suelto del DHT no alerta).
+
+Límite de ritmo: un umbral no se notifica antes de `cooldown` s de su
+notificación anterior y entre todos hay como mucho `burst` por minuto
+(cubo de fichas). Lo retenido no se pierde: cuando vuelve a haber ficha
+se notifica el estado que tenga el umbral en ese momento (si ha vuelto
+al ya notificado, nada) y el evento cuenta en "held" los cambios que se
+quedaron por el camino.
+
+Uso:
+    det = EdgeDetector()
+    det.update(SOUND, nivel)             # TEMP, HUM, SOUND de aura.classify
+    ev = det.take()                      # dict para json.dumps, o None
+"""
+
+import time
+from array import array
+
+from aura.classify import RULES_PICO
+from aura.states import state_index, state_name
+
+ALERT_STATES = ("Estrés", "Incomodidad")
+FIELDS = ("temp", "hum", "sound")        # índices TEMP, HUM, SOUND de aura.classify
+HOLD_MS = 400            # ms por encima del límite antes de activar
+RELEASE_MS = 3000        # ms por debajo de límite - banda antes de desactivar
+COOLDOWN = 10            # s entre notificaciones de un mismo umbral
+BURST = 6                # notificaciones por minuto entre todos los umbrales
+BANDS = (0.5, 2.0, 0.1)  # histéresis por campo (por defecto las de aura.policy)
+
+IDLE = 0
+ARMING = 1               # rebasado, esperando hold_ms
+ACTIVE = 2
+RELEASING = 3            # activo, por debajo de la banda desde `since`
+
+
+def thresholds(rules=RULES_PICO, states=ALERT_STATES):
+    """[(índice de estado, campo, True si es un máximo, límite)] de las reglas."""
+    out = []
+    for name, cond, _ in rules:
+        if name not in states or len(cond) != 1:
+            continue
+        for key, limit in cond.items():
+            field, op = key.rsplit("_", 1)
+            if field in FIELDS:
+                out.append((state_index(name), FIELDS.index(field), op in ("gt", "ge"), limit))
+    return out
+
+
+class EdgeDetector:
+    def __init__(self, rules=RULES_PICO, states=ALERT_STATES, hold_ms=HOLD_MS,
+                 release_ms=RELEASE_MS, cooldown=COOLDOWN, burst=BURST):
+        spec = thresholds(rules, states)
+        n = len(spec)
+        self.n = n
+        self.state = bytearray(s[0] for s in spec)
+        self.field = bytearray(s[1] for s in spec)
+        self.upper = bytearray(1 if s[2] else 0 for s in spec)
+        self.limit = array("d", [s[3] for s in spec])
+        self.bands = array("d", BANDS)
+        self.phase = bytearray(n)                # IDLE, ARMING, ACTIVE, RELEASING
+        self.told = bytearray(n)                 # último estado notificado (1 = activo)
+        self.value = array("d", [0.0] * n)       # valor al cambiar de fase
+        self.since = array("i", [0] * n)         # ticks_ms del inicio de ARMING / RELEASING
+        self.changed = array("i", [0] * n)       # ticks_ms del último cambio de fase
+        # ticks_ms de la última notificación (al crear: fuera de cualquier cooldown)
+        self.last = array("i", [time.ticks_add(time.ticks_ms(), -0x10000000)] * n)
+        self.held = array("H", [0] * n)          # cambios retenidos por el límite de ritmo
+        self.hold_ms = hold_ms
+        self.release_ms = release_ms
+        self.cooldown_ms = cooldown * 1000
+        self.burst = burst
+        self.tokens = burst
+        self.refill_at = time.ticks_ms()
+        self.seq = 0
+        self.sent = 0
+        self._taken = -1
+
+    def configure(self, cfg):
+        """Bandas (deadbandTemp/Hum/Sound) y alertCooldown (s) de la config."""
+        keys = ("deadbandTemp", "deadbandHum", "deadbandSound")
+        for i in range(3):
+            if cfg.get(keys[i]) is not None:
+                self.bands[i] = float(cfg[keys[i]])
+        if cfg.get("alertCooldown") is not None:
+            self.cooldown_ms = max(0, int(cfg["alertCooldown"])) * 1000
+
+    def update(self, field, value):
+        """Nueva lectura de un campo (None o NaN: se ignora). True si hay algo que notificar."""
+        if value is None or value != value:
+            return self.pending()
+        now = time.ticks_ms()
+        for i in range(self.n):
+            if self.field[i] != field:
+                continue
+            limit = self.limit[i]
+            if self.upper[i]:
+                over = value > limit
+                clear = value < limit - self.bands[field]
+            else:
+                over = value < limit
+                clear = value > limit + self.bands[field]
+            phase = self.phase[i]
+            if phase == ACTIVE:
+                if clear:
+                    self.phase[i] = RELEASING
+                    self.since[i] = now
+                    if self.release_ms <= 0:
+                        self._set(i, IDLE, value, now)
+            elif phase == RELEASING:
+                if not clear:
+                    self.phase[i] = ACTIVE
+                elif time.ticks_diff(now, self.since[i]) >= self.release_ms:
+                    self._set(i, IDLE, value, now)
+            elif not over:
+                self.phase[i] = IDLE
+            elif phase == IDLE:
+                self.phase[i] = ARMING
+                self.since[i] = now
+                if self.hold_ms <= 0:
+                    self._set(i, ACTIVE, value, now)
+            elif time.ticks_diff(now, self.since[i]) >= self.hold_ms:
+                self._set(i, ACTIVE, value, now)
+        return self.pending()
+
+    def _set(self, i, phase, value, now):
+        self.phase[i] = phase
+        self.value[i] = value
+        self.changed[i] = self.since[i]
+        if (phase == ACTIVE) == self.told[i]:
+            # Ha vuelto al estado notificado antes de poder notificarse
+            self.held[i] += 1
+
+    def pending(self):
+        """True si algún umbral ha cambiado desde su última notificación."""
+        for i in range(self.n):
+            if (self.phase[i] >= ACTIVE) != self.told[i]:
+                return True
+        return False
+
+    def _refill(self, now):
+        per = 60000 // self.burst
+        if self.tokens >= self.burst:
+            self.refill_at = now
+            return
+        gained = time.ticks_diff(now, self.refill_at) // per
+        if gained > 0:
+            self.tokens = min(self.burst, self.tokens + gained)
+            self.refill_at = time.ticks_add(self.refill_at, gained * per)
+
+    def take(self):
+        """
+        Siguiente evento que notificar, o None si no hay ninguno o el límite
+        de ritmo lo retiene. "age" son los ms desde que empezó el cruce.
+        """
+        if not self.pending():
+            return None
+        now = time.ticks_ms()
+        self._refill(now)
+        if self.tokens <= 0:
+            return None
+        for i in range(self.n):
+            active = 1 if self.phase[i] >= ACTIVE else 0
+            if active == self.told[i]:
+                continue
+            since = time.ticks_diff(now, self.last[i])
+            if 0 <= since < self.cooldown_ms:
+                continue
+            self.tokens -= 1
+            self.told[i] = active
+            self.last[i] = now
+            self.seq += 1
+            self.sent += 1
+            self._taken = i
+            held = self.held[i]
+            self.held[i] = 0
+            return {
+                "state": state_name(self.state[i]),
+                "on": bool(active),
+                "field": FIELDS[self.field[i]],
+                "value": round(self.value[i], 3),
+                "limit": self.limit[i],
+                "age": time.ticks_diff(now, self.changed[i]),
+                "held": held,
+                "seq": self.seq,
+            }
+        return None
+
+    def retry(self):
+        """El último evento de take() no se pudo enviar: vuelve a quedar pendiente."""
+        i = self._taken
+        if i < 0:
+            return
+        self._taken = -1
+        self.told[i] ^= 1
+        self.sent -= 1
@@ -0,0 +1,127 @@
+"""
+aura.audio – micrófono I2S con alternativa por ADC
+--------------------------------------------------
+AudioSensor reúne lo que antes repetía cada firmware: abre el I2S
+(INMP441) y lo lee en segundo plano con aura.capture; si machine.I2S no
+existe o falla al abrirse, mide con un micrófono analógico en el ADC
+(aura.sampler). aura.sampler solo se importa en ese caso, de modo que en
+un arranque normal no ocupa RAM.
+
+level_and_db() devuelve (nivel 0–1, dBA calibrados) de toda la ventana
+desde la lectura anterior (LAeq) si la captura está en marcha, o de un
+bloque / una ráfaga leídos en el momento si no. level_now() da el nivel
+con ponderación Fast de los últimos bloques sin cerrar la ventana, para
+las alertas inmediatas (aura.alert). report() da, una vez por reporte,
+pico, LAmax y LA10/LA50/LA90 de toda la ventana de reporte (solo I2S).
+
+Uso:
+    audio = AudioSensor(11, 10, 12, lr=9)
+    audio.start()                      # dentro del bucle asyncio
+    lvl, db = audio.level_and_db()
+"""
+
+import uasyncio as asyncio
+from machine import Pin, ADC
+
+try:
+    from machine import I2S
+except ImportError:
+    I2S = None
+
+from aura.capture import AudioCapture
+from aura.loudness import level as dba_level
+
+
+class AudioSensor:
+    def __init__(self, ws, sck, sd, lr=None, channel=0, adc_pin=26, dual_core=False):
+        """
+        lr: pin L/R del micrófono y channel el valor que se le da
+        (0 = izquierdo, 1 = derecho); adc_pin: entrada de la alternativa
+        analógica (GP26–GP28); dual_core: captura en el núcleo 1.
+        """
+        self.dual_core = dual_core
+        self.stats = None                # última muestra de AudioCapture.snapshot()
+        self.use_i2s = False
+        if I2S is not None:
+            try:
+                if lr is not None:
+                    Pin(lr, Pin.OUT).value(channel)
+                self.i2s = I2S(0, sck=Pin(sck), ws=Pin(ws), sd=Pin(sd),
+                               mode=I2S.RX, bits=16, format=I2S.MONO,
+                               rate=16000, ibuf=4096)
+                self.buf = bytearray(1600 * 2)       # 100 ms a 16 kHz
+                self.capture = AudioCapture(self.i2s)
+                self.use_i2s = True
+                print("I2S inicializado correctamente")
+            except Exception as e:
+                print("I2S no disponible:", e)
+        if not self.use_i2s:
+            print("Usando ADC como alternativa")
+            from aura.sampler import AdcSampler
+            self.adc = ADC(Pin(adc_pin))
+            self.sampler = AdcSampler(self.adc, channel=adc_pin - 26)
+
+    def start(self):
+        """
+        Captura continua en segundo plano: en el núcleo 1 con dual_core (I2S
+        o ráfagas de ADC), si no como tarea asyncio (solo I2S)
+        """
+        if self.use_i2s:
+            if not (self.dual_core and self.capture.start_core1()):
+                asyncio.create_task(self.capture.run())
+        elif self.dual_core:
+            self.sampler.start_core1()
+
+    def stop(self):
+        (self.capture if self.use_i2s else self.sampler).stop()
+
+    def level_and_db(self):
+        """(nivel 0–1, dBA) de la ventana o de una lectura en el momento"""
+        if self.use_i2s:
+            if self.capture.running:
+                self.stats = self.capture.snapshot()     # ventana completa, O(1)
+                return dba_level(self.stats.laeq), self.stats.laeq
+            n = self.i2s.readinto(self.buf)
+            ld = self.capture.loudness
+            db = ld.dba(ld.process(self.buf, n))
+            return dba_level(db), db
+        # Micro analógico: ráfaga sin continua a ritmo fijo, misma escala dBA
+        if self.sampler.running:
+            db = self.sampler.leq()                      # ráfagas del núcleo 1
+        else:
+            self.sampler.read()
+            db = self.sampler.dba()
+        return dba_level(db), db
+
+    def level_now(self):
+        """
+        (nivel 0–1, dBA) con ponderación Fast del audio en curso, sin cerrar
+        la ventana (aura.alert); None si no hay captura continua
+        """
+        if self.use_i2s:
+            if not self.capture.running:
+                return None
+            ld = self.capture.loudness
+        elif self.sampler.running:
+            ld = self.sampler.loudness
+        else:
+            return None
+        db = ld.dba(ld.fast)
+        return dba_level(db), db
+
+    def report(self):
+        """
+        Pico, LAmax y percentiles de la ventana de reporte (dict para el
+        resumen "stats") y abre otra; None sin captura I2S continua
+        """
+        if self.use_i2s and self.capture.running:
+            return self.capture.report()
+        return None
+
+    def calibrate(self, offset):
+        """Desplazamiento de calibración dB SPL a 0 dBFS (config dbOffset)"""
+        (self.capture if self.use_i2s else self.sampler).loudness.calibrate(offset)
+
+    def features(self):
+        """Rasgos espectrales medios de la última ventana (aura.spectrum) o None"""
+        return self.stats.features if self.stats is not None else None
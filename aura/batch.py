@@ -0,0 +1,149 @@
+"""
+aura.batch – acumulación de mediciones para envío agrupado
+---------------------------------------------------------
+Guarda las lecturas en un anillo preasignado y las envía de una vez a
+POST /api/devices/data/batch cuando se alcanzan `size` lecturas o han
+pasado `interval` segundos desde la más antigua. Ambos valores llegan en
+la respuesta de /api/devices/config (batchSize, flushInterval).
+
+Cada lectura viaja con su antigüedad en ms ("age"); el servidor calcula
+el timestamp restando esa antigüedad a la hora de recepción. El lote
+puede llevar además el bloque "health" de aura.probe.
+
+Con records=True cada add() escribe además el registro binario de la
+lectura (aura.codec: seq, ts, estado, temperatura, humedad, dB y nivel)
+en un bytearray preasignado del mismo anillo, y body() lo añade en base64
+como "records", un registro por item y en el mismo orden.
+"""
+
+import json
+import time
+from array import array
+
+from aura import codec
+from aura.states import state_index
+
+DEFAULT_SIZE = 1          # sin config: una lectura por envío (como antes)
+DEFAULT_INTERVAL = 0      # s
+MAX_SIZE = 60             # límite del anillo en RAM
+
+
+class MeasurementBatch:
+    def __init__(self, size=DEFAULT_SIZE, interval=DEFAULT_INTERVAL, capacity=MAX_SIZE,
+                 records=False):
+        self.capacity = capacity
+        self.values = [0] * capacity
+        self.states = [None] * capacity
+        # Lecturas de origen, para poder guardar el lote en flash (aura.spool)
+        self.temps = [None] * capacity
+        self.hums = [None] * capacity
+        self.levels = [None] * capacity
+        self.dbs = [None] * capacity
+        self.stats = [None] * capacity       # resumen de la ventana (aura.stats)
+        self.ticks = array("I", [0] * capacity)
+        self.suppressed = array("H", [0] * capacity)   # lecturas omitidas antes (aura.policy)
+        self.start = 0
+        self.count = 0
+        self.dropped = 0
+        # Registros binarios (aura.codec); seq cuenta lecturas desde el arranque
+        self.records = bytearray(codec.RECORD_SIZE * capacity) if records else None
+        self.seq = 0
+        self.configure(size, interval)
+
+    def configure(self, size=None, interval=None):
+        """Aplica batchSize / flushInterval recibidos del servidor."""
+        if size is not None:
+            self.size = max(1, min(self.capacity, int(size)))
+        if interval is not None:
+            self.interval_ms = max(0, int(interval)) * 1000
+
+    def add(self, room_state, measurement, temp=None, hum=None, level=None, db=None,
+            suppressed=0, stats=None):
+        """Añade una lectura; si el anillo está lleno descarta la más antigua."""
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+            self.dropped += 1
+        i = (self.start + self.count) % self.capacity
+        self.values[i] = measurement
+        self.states[i] = room_state
+        self.temps[i] = temp
+        self.hums[i] = hum
+        self.levels[i] = level
+        self.dbs[i] = db
+        self.stats[i] = stats
+        self.ticks[i] = time.ticks_ms() & 0xFFFFFFFF
+        self.suppressed[i] = min(suppressed, 0xFFFF)
+        self.count += 1
+        self.seq += 1
+        if self.records is not None:
+            codec.pack_into(self.records, i * codec.RECORD_SIZE, self.seq, codec.unix_now(),
+                            state_index(room_state), temp, hum, db, level)
+
+    def due(self):
+        """True si toca enviar (tamaño alcanzado o lectura más antigua caducada)."""
+        if not self.count:
+            return False
+        if self.count >= self.size:
+            return True
+        oldest = self.ticks[self.start]
+        return time.ticks_diff(time.ticks_ms(), oldest) >= self.interval_ms
+
+    def body(self, code, health=None):
+        """
+        Cuerpo JSON del envío agrupado (se construye solo al enviar).
+        `health`: bloque de tiempos y heap por fase (aura.probe), opcional.
+        """
+        now = time.ticks_ms()
+        items = []
+        for k in range(self.count):
+            i = (self.start + k) % self.capacity
+            item = {"measurement": self.values[i],
+                    "roomState": self.states[i],
+                    "age": time.ticks_diff(now, self.ticks[i])}
+            if self.suppressed[i]:
+                item["suppressed"] = self.suppressed[i]
+            if self.stats[i]:
+                item["stats"] = self.stats[i]
+            items.append(item)
+        out = {"code": code, "items": items}
+        if self.records is not None:
+            out["records"] = self._records_b64()
+        if health:
+            out["health"] = health
+        return json.dumps(out)
+
+    def _records_b64(self):
+        # Anillo en dos trozos si da la vuelta; RECORD_SIZE es múltiplo de 3,
+        # así que el base64 de cada trozo se puede concatenar tal cual
+        size = codec.RECORD_SIZE
+        first = min(self.count, self.capacity - self.start)
+        view = memoryview(self.records)
+        text = codec.b64encode(view[self.start * size:(self.start + first) * size])
+        if first < self.count:
+            text += codec.b64encode(view, (self.count - first) * size)
+        return text
+
+    def state_index(self, i):
+        return state_index(self.states[i])
+
+    def drop(self, n):
+        """Quita las n lecturas más antiguas (p. ej. ya guardadas en flash)."""
+        for _ in range(min(n, self.count)):
+            i = self.start
+            self.states[i] = None
+            self.temps[i] = self.hums[i] = self.levels[i] = self.dbs[i] = None
+            self.stats[i] = None
+            self.start = (i + 1) % self.capacity
+            self.count -= 1
+        if not self.count:
+            self.start = 0
+
+    def clear(self):
+        """Vacía el lote tras un envío confirmado."""
+        for i in range(self.capacity):
+            self.states[i] = None
+            self.temps[i] = self.hums[i] = self.levels[i] = self.dbs[i] = None
+            self.stats[i] = None
+        self.start = 0
+        self.count = 0
@@ -0,0 +1,300 @@
+"""
+aura.capture – captura de audio I2S continua en segundo plano
+-------------------------------------------------------------
+El micrófono se lee sin pausas en un anillo de buffers preasignados usando
+el modo no bloqueante de machine.I2S (I2S.irq + readinto). Una tarea
+asyncio procesa cada bloque de 100 ms con LevelMeter y el filtro A de
+aura.loudness (con estado continuo entre bloques) y acumula dos ventanas:
+
+- la de la muestra: LAeq y rasgos medios de aura.spectrum (uno de cada
+  SPECTRUM_EVERY bloques), que read_sensors()/sensors() recogen con
+  snapshot() en tiempo constante cada SAMPLE_INTERVAL;
+- la de reporte: pico, LAmax e histograma de 1 dB de los niveles de cada
+  bloque, de los que report() saca LA10/LA50/LA90 una vez por reporte
+  para el resumen "stats" del lote.
+
+Modo de doble núcleo (start_core1): la lectura bloqueante y todo el
+cálculo corren en el segundo núcleo del RP2040 con _thread, de modo que
+una petición HTTP lenta en el núcleo 0 no para la captura. Solo la
+actualización de la ventana y snapshot() toman un lock (unas decenas de
+microsegundos); el FFT y el filtro A quedan fuera. Las escrituras en
+flash de aura.spool detienen el núcleo 1 un momento (multicore lockout
+de MicroPython): el ibuf del I2S absorbe la pausa.
+
+La memoria es fija: buffers, medidores e histograma se crean al iniciar.
+"""
+
+import math
+import time
+from array import array
+
+import uasyncio as asyncio
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+from aura.level import LevelMeter, FULL_SCALE
+from aura.spectrum import SpectrumAnalyzer, NFEAT
+from aura.loudness import LoudnessMeter
+
+BLOCK_SAMPLES = 1600     # 100 ms a 16 kHz
+RING_SIZE = 4            # buffers en el anillo
+DB_FLOOR = -96           # dBFS de un bloque en silencio digital (16 bits)
+DB_BINS = -DB_FLOOR + 1  # histograma de 1 dB entre -96 y 0 dBFS (ponderados A)
+SPECTRUM_EVERY = 5       # bloques entre análisis espectrales (500 ms)
+NAN = float("nan")
+
+
+class _NoLock:
+    """Sustituto de lock para el modo de un solo núcleo."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class SoundStats:
+    """Resultado de una muestra (se reutiliza entre snapshots)."""
+
+    def __init__(self):
+        self.blocks = 0
+        self.overruns = 0
+        self.features = array("d", [NAN] * NFEAT)   # medias (aura.spectrum)
+        self.laeq = 0.0          # dBA equivalentes desde la muestra anterior (aura.loudness)
+
+
+class SoundWindow:
+    """Acumulador de la muestra y de la ventana de reporte: O(1) por bloque, memoria fija."""
+
+    def __init__(self):
+        self.hist = array("H", [0] * DB_BINS)
+        self.feat = array("d", [0.0] * NFEAT)
+        self.reset()
+        self.reset_report()
+
+    def reset(self):
+        """Abre una muestra nueva (snapshot)."""
+        self.blocks = 0
+        self.analyzed = 0
+        self.energy_a = 0.0      # suma de medias de cuadrados ponderadas A
+        feat = self.feat
+        for i in range(NFEAT):
+            feat[i] = 0.0
+
+    def reset_report(self):
+        """Abre una ventana de reporte nueva (report)."""
+        self.report_blocks = 0
+        self.peak = 0
+        self.max_a = 0.0
+        hist = self.hist
+        for i in range(DB_BINS):
+            hist[i] = 0
+
+    def add(self, peak, mean_square, dbfs):
+        """
+        Añade un bloque: pico de muestra (LevelMeter.peak), media de cuadrados
+        ponderada A y su nivel en dBFS (LoudnessMeter.dba sin calibración).
+        """
+        self.blocks += 1
+        self.energy_a += mean_square
+        self.report_blocks += 1
+        if peak > self.peak:
+            self.peak = peak
+        if mean_square > self.max_a:
+            self.max_a = mean_square
+        b = int(dbfs - DB_FLOOR)         # dbfs >= DB_FLOOR: trunca hacia abajo
+        if b >= DB_BINS:
+            b = DB_BINS - 1
+        if self.hist[b] < 0xFFFF:
+            self.hist[b] += 1
+
+    def add_features(self, features):
+        """Suma los rasgos de un bloque analizado (ignora silencio digital)."""
+        if features[0] != features[0]:
+            return
+        feat = self.feat
+        for i in range(NFEAT):
+            feat[i] += features[i]
+        self.analyzed += 1
+
+    def percentile(self, exceeded):
+        """Nivel (dBFS) superado durante la fracción `exceeded` de los bloques del reporte."""
+        if not self.report_blocks:
+            return DB_FLOOR
+        target = self.report_blocks * exceeded
+        acc = 0
+        hist = self.hist
+        for b in range(DB_BINS - 1, -1, -1):
+            acc += hist[b]
+            if acc >= target:
+                return b + DB_FLOOR
+        return DB_FLOOR
+
+    def fill(self, out, loudness):
+        """Vuelca la muestra en un SoundStats existente (dBA calibrados con `loudness`)."""
+        out.blocks = self.blocks
+        n = self.analyzed
+        for i in range(NFEAT):
+            out.features[i] = self.feat[i] / n if n else NAN
+        out.laeq = loudness.dba(self.energy_a / self.blocks if self.blocks else 0)
+        return out
+
+    def report(self, loudness):
+        """
+        Resumen de la ventana de reporte en dB calibrados (None si no hubo
+        bloques): pico de muestra, LAmax y LA10/LA50/LA90
+        """
+        if not self.report_blocks:
+            return None
+        offset = loudness.offset
+        peak = 20 * math.log10(self.peak / FULL_SCALE) if self.peak else DB_FLOOR
+        return {"blocks": self.report_blocks,
+                "peak": round(peak + offset, 1),
+                "lamax": round(loudness.dba(self.max_a), 1),
+                "la10": self.percentile(0.1) + offset,
+                "la50": self.percentile(0.5) + offset,
+                "la90": self.percentile(0.9) + offset}
+
+
+class AudioCapture:
+    """
+    Lectura continua del I2S en un anillo de RING_SIZE buffers.
+    El callback de I2S solo encadena la siguiente lectura y avisa a la
+    tarea run(); el cálculo se hace fuera de la interrupción.
+    """
+
+    def __init__(self, i2s, ring=RING_SIZE, block=BLOCK_SAMPLES,
+                 spectrum_every=SPECTRUM_EVERY):
+        self.i2s = i2s
+        self.bufs = [bytearray(2 * block) for _ in range(ring)]
+        self.meters = [LevelMeter(b) for b in self.bufs]
+        self.ring = ring
+        self.spectrum = SpectrumAnalyzer() if spectrum_every else None
+        self.spectrum_every = spectrum_every
+        self.loudness = LoudnessMeter()
+        self.blocks = 0        # bloques medidos (para elegir cuáles analizar)
+        # Cada contador lo escribe un solo lado: produced el callback,
+        # consumed y overruns la tarea (sin carreras entre ambos)
+        self.produced = 0      # bloques completados por el I2S
+        self.consumed = 0      # bloques procesados o descartados
+        self.overruns = 0      # bloques descartados por no procesarse a tiempo
+        self.running = False
+        self.window = SoundWindow()
+        self.stats = SoundStats()
+        self._lock = _NoLock()
+        self.core1 = False     # captura en el segundo núcleo (start_core1)
+        self.busy_us = 0       # tiempo de cálculo acumulado en el núcleo 1
+        try:
+            self._flag = asyncio.ThreadSafeFlag()
+        except AttributeError:
+            self._flag = None
+
+    # -------- Callback I2S (contexto de interrupción programada) ---------
+    def _on_block(self, _):
+        self.produced += 1
+        self.i2s.readinto(self.bufs[self.produced % self.ring])
+        if self._flag is not None:
+            self._flag.set()
+
+    def _process_pending(self):
+        lag = self.produced - self.consumed
+        if lag > self.ring - 1:
+            # El I2S ya ha sobrescrito los bloques más antiguos
+            self.overruns += lag - (self.ring - 1)
+            self.consumed = self.produced - (self.ring - 1)
+        while self.consumed < self.produced:
+            meter = self.meters[self.consumed % self.ring]
+            meter.measure(len(meter.buf))
+            self._add(meter, len(meter.buf))
+            self.consumed += 1
+
+    def _add(self, meter, nbytes):
+        if not meter.count:
+            return                       # lectura vacía: no es un bloque de silencio
+        # Cálculo pesado fuera del lock; la ventana se actualiza dentro
+        ms = self.loudness.process(meter.buf, nbytes)
+        self.blocks += 1
+        feats = None
+        if self.spectrum is not None and self.blocks % self.spectrum_every == 0:
+            feats = self.spectrum.analyze(meter.buf, nbytes, meter.peak)
+        dbfs = self.loudness.dba(ms) - self.loudness.offset
+        with self._lock:
+            window = self.window
+            window.add(meter.peak, ms, dbfs)
+            if feats is not None:
+                window.add_features(feats)
+
+    async def run(self):
+        """Tarea de fondo: arranca la lectura encadenada y procesa bloques."""
+        self.running = True
+        if self._flag is not None and hasattr(self.i2s, "irq"):
+            self.i2s.irq(self._on_block)
+            self.i2s.readinto(self.bufs[self.produced % self.ring])
+            while self.running:
+                await self._flag.wait()
+                self._process_pending()
+        else:
+            # Firmware sin I2S.irq: lectura bloqueante bloque a bloque
+            while self.running:
+                self.read_block()
+                await asyncio.sleep_ms(0)
+
+    def read_block(self):
+        """
+        Lee un bloque del I2S (bloqueante) y lo procesa; devuelve los bytes
+        leídos. También sirve para réplicas de trazas (tools/bench_trace.py).
+        """
+        meter = self.meters[0]
+        n = self.i2s.readinto(meter.buf)
+        meter.measure(n)
+        self._add(meter, n)
+        return n
+
+    def start_core1(self):
+        """Arranca la captura en el segundo núcleo; False si no hay _thread."""
+        if _thread is None:
+            return False
+        self._lock = _thread.allocate_lock()
+        self.running = True
+        self.core1 = True
+        _thread.start_new_thread(self._core1_loop, ())
+        return True
+
+    def _core1_loop(self):
+        """Núcleo 1: lectura bloqueante del I2S y cálculo, sin asyncio."""
+        meter = self.meters[0]
+        ticks_us = time.ticks_us
+        ticks_diff = time.ticks_diff
+        while self.running:
+            n = self.i2s.readinto(meter.buf)
+            t0 = ticks_us()
+            meter.measure(n)
+            self._add(meter, n)
+            self.busy_us += ticks_diff(ticks_us(), t0)
+        self.core1 = False
+
+    def stop(self):
+        self.running = False
+        if hasattr(self.i2s, "irq"):
+            self.i2s.irq(None)
+
+    def snapshot(self):
+        """Estadísticas de la muestra cerrada; abre una muestra nueva."""
+        self._process_pending()
+        with self._lock:
+            self.window.fill(self.stats, self.loudness)
+            self.window.reset()
+        self.stats.overruns = self.overruns
+        self.overruns = 0
+        return self.stats
+
+    def report(self):
+        """Pico, LAmax y percentiles de la ventana de reporte (dict o None); abre otra."""
+        with self._lock:
+            out = self.window.report(self.loudness)
+            self.window.reset_report()
+        return out
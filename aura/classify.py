@@ -0,0 +1,352 @@
+"""
+aura.classify – clasificador de estados por tabla de reglas
+-----------------------------------------------------------
+Sustituye las cadenas de if de AuraDevice.determine_state (raspberry.py)
+y AuraDevice.state (raspberry_defsim.py). Cada perfil es una lista
+ordenada de reglas; gana la primera cuyas condiciones se cumplen:
+
+    (estado, {"sound_gt": 0.7}, (F_SOUND,))
+
+Condiciones: temp_/hum_/sound_ + gt, ge, lt, le; sobre los rasgos de
+aura.spectrum (low_, speech_, high_, flat_, zcr_) solo gt y lt. Las
+reglas con rasgos no aplican si classify() no los recibe. Fórmulas:
+
+    F_CONST   (F_CONST, c)                   -> c
+    F_SOUND   (F_SOUND,)                     -> s
+    F_RATIO   (F_RATIO, campo, a, b)         -> min(1.0, (x - a) / b)
+    F_INV     (F_INV,)                       -> 1.0 - s
+    F_ENERGY  (F_ENERGY, a, b)               -> s + (1 - abs(t - a) / b)
+    F_COMFORT (F_COMFORT, a, b, c, d, lo, hi) -> max(lo, min(hi, 1.0 - |t-a|/b - |h-c|/d - s))
+
+Al importar, cada perfil se compila a un array('d') plano de límites y
+parámetros y un array('H') de estado/condiciones/fórmula/rasgos: clasificar es
+recorrer números, sin diccionarios ni cadenas; solo se comparan los
+límites que la regla usa. El estado se devuelve como índice de
+aura.states (STATES[i] / STATES_ASCII[i] para el nombre).
+
+Un campo NaN no cumple ninguna condición sobre él; la regla final (sin
+condiciones) exige las tres lecturas válidas, así que si no aplica otra
+regla el resultado es UNKNOWN. Las lecturas ausentes (None) las resuelve
+quien llama.
+
+Recorrer la tabla es 3–6 veces más lento que las cadenas de if en el
+host (tools/bench_classify.py) y no hay medida en la Pico, así que los
+dos perfiles de los firmwares (PICO y DEFSIM) se evalúan con su cadena
+de if equivalente, _pico y _defsim; la tabla compilada se usa para
+cualquier otro perfil. bench_classify.py comprueba que ambas rutas dan
+el mismo estado y valor, con y sin rasgos. Al cambiar RULES_PICO o
+RULES_DEFSIM hay que cambiar también su cadena.
+"""
+
+from array import array
+
+from aura.spectrum import FEATURES, NFEAT
+from aura.states import state_index, UNKNOWN
+
+F_CONST = 0
+F_SOUND = 1
+F_RATIO = 2
+F_INV = 3
+F_ENERGY = 4
+F_COMFORT = 5
+
+TEMP = 0
+HUM = 1
+SOUND = 2
+
+INF = float("inf")
+
+# Reglas de raspberry.py (determine_state), en orden de prioridad
+RULES_PICO = (
+    ("Estrés", {"sound_gt": 0.7}, (F_SOUND,)),
+    ("Incomodidad", {"temp_gt": 27}, (F_RATIO, TEMP, 22, 8)),
+    ("Incomodidad", {"temp_lt": 19}, (F_RATIO, TEMP, 20, -5)),
+    ("Incomodidad", {"hum_gt": 70}, (F_RATIO, HUM, 60, 20)),
+    ("Incomodidad", {"hum_lt": 30}, (F_RATIO, HUM, 40, -15)),
+    ("Conflicto", {"sound_gt": 0.45, "speech_gt": 0.6}, (F_SOUND,)),
+    ("Distracción", {"sound_gt": 0.2, "flat_gt": 0.45}, (F_SOUND,)),
+    ("Confort", {"temp_ge": 22, "temp_le": 26, "hum_ge": 40, "hum_le": 60,
+                 "sound_lt": 0.2}, (F_INV,)),
+    ("Expectativa", {"sound_lt": 0.1}, (F_INV,)),
+    ("Monotonía", {"sound_lt": 0.3, "low_gt": 0.5}, (F_INV,)),
+    ("Energía", {"sound_gt": 0.3, "sound_lt": 0.6, "temp_ge": 20, "temp_le": 27},
+     (F_ENERGY, 23.5, 6)),
+    ("Calma", {}, (F_COMFORT, 23, 8, 50, 30, 0.1, 1.0)),
+)
+
+# Reglas de raspberry_defsim.py (state)
+RULES_DEFSIM = (
+    ("Estrés", {"sound_gt": 0.7}, (F_SOUND,)),
+    ("Incomodidad", {"temp_gt": 27}, (F_CONST, 0.8)),
+    ("Incomodidad", {"temp_lt": 19}, (F_CONST, 0.8)),
+    ("Incomodidad", {"hum_gt": 70}, (F_CONST, 0.8)),
+    ("Incomodidad", {"hum_lt": 30}, (F_CONST, 0.8)),
+    ("Conflicto", {"sound_gt": 0.45, "speech_gt": 0.6}, (F_SOUND,)),
+    ("Distracción", {"sound_gt": 0.2, "flat_gt": 0.45}, (F_SOUND,)),
+    ("Confort", {"temp_ge": 22, "temp_le": 26, "hum_ge": 40, "hum_le": 60,
+                 "sound_lt": 0.2}, (F_INV,)),
+    ("Expectativa", {"sound_lt": 0.1}, (F_INV,)),
+    ("Monotonía", {"sound_lt": 0.3, "low_gt": 0.5}, (F_INV,)),
+    ("Energía", {"sound_gt": 0.3, "sound_lt": 0.6}, (F_SOUND,)),
+    ("Calma", {}, (F_COMFORT, 23, 8, 50, 30, 0.1, INF)),
+)
+
+# Disposición de cada regla en la tabla compilada
+NUM_STRIDE = 12 + 2 * NFEAT   # t_lo, t_hi, h_lo, h_hi, s_lo, s_hi, p0..p5, rasgos lo/hi
+META_STRIDE = 4      # estado, bits de condición, fórmula, bits de rasgos
+FEAT_BASE = 12
+_FIELDS = ("temp", "hum", "sound")
+# 4 bits por campo (temp, hum, sound): gt, ge, lt, le; 2 por rasgo: gt, lt
+_OPS = ("gt", "ge", "lt", "le")
+_FEAT_OPS = ("gt", "lt")
+ANY = 0x1000
+
+
+def compile_rules(rules):
+    """Convierte una lista de reglas en (array('d'), array('H'))."""
+    nums = array("d")
+    meta = array("H")
+    for name, cond, formula in rules:
+        flags = 0
+        for f in range(3):
+            lo, hi = -INF, INF
+            for key, value in cond.items():
+                field, op = key.rsplit("_", 1)
+                if field != _FIELDS[f]:
+                    continue
+                if op not in _OPS:
+                    raise ValueError("condición desconocida: " + key)
+                bit = _OPS.index(op)
+                flags |= 1 << (4 * f + bit)
+                if bit < 2:
+                    lo = value
+                else:
+                    hi = value
+            nums.append(lo)
+            nums.append(hi)
+        fflags = 0
+        bounds = [-INF, INF] * NFEAT
+        for key, value in cond.items():
+            field, op = key.rsplit("_", 1)
+            if field not in FEATURES:
+                if field not in _FIELDS:
+                    raise ValueError("condición desconocida: " + key)
+                continue
+            if op not in _FEAT_OPS:
+                raise ValueError("condición desconocida: " + key)
+            bit = 2 * FEATURES.index(field) + _FEAT_OPS.index(op)
+            fflags |= 1 << bit
+            bounds[bit] = value
+        if not flags and not fflags:
+            flags = ANY       # regla final: solo exige lecturas válidas
+        params = list(formula[1:]) + [0] * (6 - len(formula) + 1)
+        for p in params + bounds:
+            nums.append(p)
+        index = state_index(name)
+        if index == UNKNOWN:
+            raise ValueError("estado desconocido: " + name)
+        meta.append(index)
+        meta.append(flags)
+        meta.append(formula[0])
+        meta.append(fflags)
+    return nums, meta
+
+
+PICO = compile_rules(RULES_PICO)
+DEFSIM = compile_rules(RULES_DEFSIM)
+
+_STRESS = state_index("Estrés")
+_DISCOMFORT = state_index("Incomodidad")
+_CONFLICT = state_index("Conflicto")
+_DISTRACTION = state_index("Distracción")
+_COMFORT = state_index("Confort")
+_EXPECTATION = state_index("Expectativa")
+_MONOTONY = state_index("Monotonía")
+_ENERGY = state_index("Energía")
+_CALM = state_index("Calma")
+_LOW = FEATURES.index("low")
+_SPEECH = FEATURES.index("speech")
+_FLAT = FEATURES.index("flat")
+
+
+def _features_ok(nums, b, ff, f):
+    """Condiciones de rasgos (b = inicio de los límites); NaN no cumple."""
+    for i in range(NFEAT):
+        if ff & (1 << 2 * i) and not f[i] > nums[b + 2 * i]:
+            return False
+        if ff & (2 << 2 * i) and not f[i] < nums[b + 2 * i + 1]:
+            return False
+    return True
+
+
+def _match(nums, meta, n, t, h, s, f=None):
+    """Índice de la primera regla que cumple la lectura, o -1."""
+    for r in range(n):
+        fl = meta[r * META_STRIDE + 1]
+        if fl & 0xFF:
+            b = r * NUM_STRIDE
+            if fl & 0x03:
+                if fl & 1 and not t > nums[b] or fl & 2 and not t >= nums[b]:
+                    continue
+            if fl & 0x0C:
+                if fl & 4 and not t < nums[b + 1] or fl & 8 and not t <= nums[b + 1]:
+                    continue
+            if fl & 0x30:
+                if fl & 16 and not h > nums[b + 2] or fl & 32 and not h >= nums[b + 2]:
+                    continue
+            if fl & 0xC0:
+                if fl & 64 and not h < nums[b + 3] or fl & 128 and not h <= nums[b + 3]:
+                    continue
+        if fl & 0xF00:
+            b = r * NUM_STRIDE
+            if fl & 0x300:
+                if fl & 256 and not s > nums[b + 4] or fl & 512 and not s >= nums[b + 4]:
+                    continue
+            if fl & 0xC00:
+                if fl & 1024 and not s < nums[b + 5] or fl & 2048 and not s <= nums[b + 5]:
+                    continue
+        elif fl & 0x1000 and not (t == t and h == h and s == s):
+            continue
+        ff = meta[r * META_STRIDE + 3]
+        if ff and (f is None or not _features_ok(nums, r * NUM_STRIDE + FEAT_BASE, ff, f)):
+            continue
+        return r
+    return -1
+
+
+def _value(nums, kind, b, t, h, s):
+    """Valor de la medición según la fórmula de la regla (b = inicio de p0)."""
+    if kind == F_SOUND:
+        return s
+    if kind == F_INV:
+        return 1.0 - s
+    if kind == F_RATIO:
+        field = nums[b]
+        x = t if field == TEMP else h if field == HUM else s
+        return min(1.0, (x - nums[b + 1]) / nums[b + 2])
+    if kind == F_COMFORT:
+        v = 1.0 - (abs(t - nums[b]) / nums[b + 1]) - (abs(h - nums[b + 2]) / nums[b + 3]) - s
+        return max(nums[b + 4], min(nums[b + 5], v))
+    if kind == F_ENERGY:
+        return s + (1 - abs(t - nums[b]) / nums[b + 1])
+    return nums[b]
+
+
+class Classifier:
+    def __init__(self, table=PICO):
+        self.nums, self.meta = table
+        self.n = len(self.meta) // META_STRIDE
+        self.value = 0.0
+        # Cadena de if de los perfiles de los firmwares; None: recorrer la tabla
+        self._fast = self._pico if table is PICO else self._defsim if table is DEFSIM else None
+
+    def _pico(self, t, h, s, f):
+        """RULES_PICO como cadena de if."""
+        if s > 0.7:
+            self.value = s
+            return _STRESS
+        if t > 27:
+            self.value = min(1.0, (t - 22) / 8)
+            return _DISCOMFORT
+        if t < 19:
+            self.value = min(1.0, (20 - t) / 5)
+            return _DISCOMFORT
+        if h > 70:
+            self.value = min(1.0, (h - 60) / 20)
+            return _DISCOMFORT
+        if h < 30:
+            self.value = min(1.0, (40 - h) / 15)
+            return _DISCOMFORT
+        return self._common(t, h, s, f, True)
+
+    def _defsim(self, t, h, s, f):
+        """RULES_DEFSIM como cadena de if."""
+        if s > 0.7:
+            self.value = s
+            return _STRESS
+        if t > 27 or t < 19 or h > 70 or h < 30:
+            self.value = 0.8
+            return _DISCOMFORT
+        return self._common(t, h, s, f, False)
+
+    def _common(self, t, h, s, f, pico):
+        """De Conflicto a Calma; solo Energía y el tope de Calma cambian con el perfil."""
+        if f is not None:
+            if s > 0.45 and f[_SPEECH] > 0.6:
+                self.value = s
+                return _CONFLICT
+            if s > 0.2 and f[_FLAT] > 0.45:
+                self.value = s
+                return _DISTRACTION
+        if 22 <= t <= 26 and 40 <= h <= 60 and s < 0.2:
+            self.value = 1.0 - s
+            return _COMFORT
+        if s < 0.1:
+            self.value = 1.0 - s
+            return _EXPECTATION
+        if f is not None and s < 0.3 and f[_LOW] > 0.5:
+            self.value = 1.0 - s
+            return _MONOTONY
+        if 0.3 < s < 0.6:
+            if not pico:
+                self.value = s
+                return _ENERGY
+            if 20 <= t <= 27:
+                self.value = s + (1 - abs(t - 23.5) / 6)
+                return _ENERGY
+        if t == t and h == h and s == s:
+            v = 1.0 - abs(t - 23) / 8 - abs(h - 50) / 30 - s
+            self.value = max(0.1, min(1.0, v) if pico else v)
+            return _CALM
+        self.value = float("nan")
+        return UNKNOWN
+
+    def classify(self, t, h, s, f=None):
+        """
+        Índice del estado para una lectura; el valor queda en self.value.
+        f: rasgos de aura.spectrum (SpectrumAnalyzer.features) o None.
+        """
+        if self._fast is not None:
+            return self._fast(t, h, s, f)
+        r = _match(self.nums, self.meta, self.n, t, h, s, f)
+        if r < 0:
+            self.value = float("nan")
+            return UNKNOWN
+        m = r * META_STRIDE
+        self.value = _value(self.nums, self.meta[m + 2], r * NUM_STRIDE + 6, t, h, s)
+        return self.meta[m]
+
+    def classify_many(self, temps, hums, sounds, states=None, values=None):
+        """
+        Clasifica arrays de lecturas en una pasada (backfills en el servidor,
+        reproducción de trazas). Devuelve (bytearray de estados, array('d')
+        de valores); pueden pasarse ya creados para reutilizarlos.
+        """
+        count = len(temps)
+        if states is None:
+            states = bytearray(count)
+        if values is None:
+            values = array("d", [0.0] * count)
+        fast = self._fast
+        if fast is not None:
+            for i in range(count):
+                states[i] = fast(temps[i], hums[i], sounds[i], None)
+                values[i] = self.value
+            return states, values
+        nums = self.nums
+        meta = self.meta
+        n = self.n
+        nan = float("nan")
+        for i in range(count):
+            t = temps[i]
+            h = hums[i]
+            s = sounds[i]
+            r = _match(nums, meta, n, t, h, s)
+            if r < 0:
+                states[i] = UNKNOWN
+                values[i] = nan
+                continue
+            m = r * META_STRIDE
+            states[i] = meta[m]
+            values[i] = _value(nums, meta[m + 2], r * NUM_STRIDE + 6, t, h, s)
+        return states, values
@@ -0,0 +1,164 @@
+"""
+aura.codec – codificación compacta de lecturas
+----------------------------------------------
+Registro binario (versión 1): 18 bytes de formato fijo, little-endian,
+que cabe exacto en 24 caracteres base64 (18 es múltiplo de 3, así que
+los registros consecutivos se pueden codificar por trozos y concatenar):
+
+    off  tipo  campo
+     0   u8    versión (VERSION)
+     1   u8    estado (índice de aura.states; UNKNOWN = 255)
+     2   u32   seq, número de lectura del dispositivo
+     6   u32   ts, segundos Unix (0 si el reloj no está en hora)
+    10   i16   temperatura x100 (°C)
+    12   u16   humedad x100 (%)
+    14   i16   dB x100
+    16   u16   nivel sonoro 0–1 x10000
+
+Sin dato: NONE_I16 / NONE_U16. Los valores se saturan en lugar de dar la
+vuelta, y la resolución (0,01 °C, 0,01 %, 0,01 dB) está por debajo de la
+de los sensores: el viaje es sin pérdidas a efectos prácticos.
+
+En el dispositivo pack_into() escribe en un bytearray preasignado (no
+crea bytes); b64encode() convierte un trozo para el JSON del envío
+(campo "records" de /api/devices/data/batch, ver aura.batch). En el host
+unpack_many() decodifica miles de registros de una vez: cada campo sale
+en un array por columnas con cortes de paso fijo, sin un bucle Python
+por registro.
+
+encode()/decode() son el empaquetado decimal anterior, XXXYYYZZZ (una
+décima por valor, tres dígitos, módulo 100.0), que aún entienden los
+backends antiguos.
+"""
+
+import binascii
+import struct
+import sys
+import time
+from array import array
+
+VERSION = 1
+RECORD = "<BBIIhHhH"
+RECORD_SIZE = struct.calcsize(RECORD)   # 18
+
+# (nombre, desplazamiento, tipo de array, bytes, escala) de cada campo
+FIELDS = (
+    ("version", 0, "B", 1, 1),
+    ("state", 1, "B", 1, 1),
+    ("seq", 2, "I", 4, 1),
+    ("ts", 6, "I", 4, 1),
+    ("temp", 10, "h", 2, 100),
+    ("hum", 12, "H", 2, 100),
+    ("db", 14, "h", 2, 100),
+    ("level", 16, "H", 2, 10000),
+)
+
+NONE_I16 = -32768
+NONE_U16 = 0xFFFF
+
+# Segundos entre 1970 y el epoch del puerto (2000 en la mayoría de MicroPython)
+EPOCH_OFFSET = 946684800 if time.gmtime(0)[0] == 2000 else 0
+MIN_TS = 1704067200      # 2024-01-01: antes, el RTC no está en hora
+
+
+def unix_now():
+    """Segundos Unix, o 0 si el reloj aún no se ha puesto en hora (NTP)."""
+    ts = int(time.time()) + EPOCH_OFFSET
+    return ts if ts >= MIN_TS else 0
+
+
+def _i16(value, scale):
+    if value is None:
+        return NONE_I16
+    return max(-32767, min(32767, int(round(value * scale))))
+
+
+def _u16(value, scale):
+    if value is None:
+        return NONE_U16
+    return max(0, min(0xFFFE, int(round(value * scale))))
+
+
+# -------- Registro binario ----------------------------------------------
+def pack_into(buf, offset, seq, ts, state, t, h, db, level):
+    """Escribe un registro en buf[offset:]; devuelve el desplazamiento siguiente."""
+    struct.pack_into(RECORD, buf, offset, VERSION, state, seq & 0xFFFFFFFF, ts,
+                     _i16(t, 100), _u16(h, 100), _i16(db, 100), _u16(level, 10000))
+    return offset + RECORD_SIZE
+
+
+def unpack_from(buf, offset=0):
+    """(seq, ts, state, t, h, db, level) de un registro; None donde no hay dato."""
+    ver, st, seq, ts, t, h, db, lvl = struct.unpack_from(RECORD, buf, offset)
+    if ver != VERSION:
+        raise ValueError("codec: versión %d desconocida" % ver)
+    return (seq, ts, st,
+            None if t == NONE_I16 else t / 100,
+            None if h == NONE_U16 else h / 100,
+            None if db == NONE_I16 else db / 100,
+            None if lvl == NONE_U16 else lvl / 10000)
+
+
+def decode_many(data):
+    """Lista de tuplas de unpack_from() para todos los registros de data."""
+    if len(data) % RECORD_SIZE:
+        raise ValueError("codec: %d bytes no son registros enteros" % len(data))
+    return [unpack_from(data, off) for off in range(0, len(data), RECORD_SIZE)]
+
+
+def unpack_many(data):
+    """
+    Decodifica por columnas todos los registros de data (host, CPython):
+    {campo: array} con los enteros tal como van en el registro (dividir
+    por la escala de FIELDS; NONE_I16 / NONE_U16 = sin dato). Cada campo
+    se reúne con cortes data[off::RECORD_SIZE], uno por byte.
+    """
+    data = bytes(data)
+    if len(data) % RECORD_SIZE:
+        raise ValueError("codec: %d bytes no son registros enteros" % len(data))
+    n = len(data) // RECORD_SIZE
+    if data[0::RECORD_SIZE].strip(bytes((VERSION,))):
+        raise ValueError("codec: registros con otra versión")
+    out = {}
+    for name, off, code, width, _ in FIELDS[1:]:
+        if code == "I" and array("I").itemsize != 4:
+            code = "L"
+        if width == 1:
+            out[name] = array(code, data[off::RECORD_SIZE])
+            continue
+        raw = bytearray(n * width)
+        for b in range(width):
+            raw[b::width] = data[off + b::RECORD_SIZE]
+        col = array(code, bytes(raw))
+        if sys.byteorder == "big":
+            col.byteswap()
+        out[name] = col
+    return out
+
+
+def b64encode(buf, nbytes=None):
+    """Texto base64 (sin salto de línea) de los primeros nbytes de buf."""
+    view = memoryview(buf)
+    if nbytes is not None:
+        view = view[:nbytes]
+    return binascii.b2a_base64(view)[:-1].decode()
+
+
+def b64decode(text):
+    return binascii.a2b_base64(text)
+
+
+# -------- Empaquetado decimal anterior ----------------------------------
+def _part(x):
+    return int(round(x * 10)) % 1000
+
+
+def encode(t, h, db):
+    """XXXYYYZZZ: p. ej. (22.3, 41.5, 37.2) -> 223415372."""
+    return _part(t) * 1000000 + _part(h) * 1000 + _part(db)
+
+
+def decode(value):
+    """Inverso de encode() (módulo 100.0): devuelve (t, h, db)."""
+    return (value // 1000000 % 1000 / 10, value // 1000 % 1000 / 10,
+            value % 1000 / 10)
@@ -0,0 +1,92 @@
+"""
+aura.config – configuración del dispositivo en caché (flash) con ETag
+---------------------------------------------------------------------
+Antes la config se pedía una sola vez al arrancar, bloqueando el inicio,
+y si fallaba el dispositivo se quedaba con los valores por defecto para
+siempre. ConfigStore guarda en flash la última config recibida junto con
+su ETag y su versión:
+
+- al arrancar, load() la devuelve al instante, sin red;
+- refresh() la revalida en segundo plano con un GET condicional
+  (If-None-Match): 304 si no ha cambiado (sin cuerpo), 200 con la nueva;
+- las respuestas de envío traen "configVersion"; si no coincide con la
+  guardada (outdated), el firmware adelanta la revalidación.
+
+El fichero se reescribe con un temporal y os.rename para que un corte de
+corriente no deje una config a medias.
+"""
+
+import json
+import os
+
+CONFIG_PATH = "/api/devices/config"
+FILE = "config.json"
+
+
+class ConfigStore:
+    def __init__(self, path=FILE):
+        self.path = path
+        self.config = None       # dict de la última config válida
+        self.etag = None         # bytes, tal como llegó en la cabecera ETag
+        self.version = None      # "version" del cuerpo (= configVersion de los envíos)
+        self.checks = 0          # revalidaciones hechas
+        self.not_modified = 0    # de ellas, respondidas con 304
+
+    def load(self):
+        """Config guardada en flash o None (no hay o está dañada)."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.config = data["config"]
+            self.version = data.get("version")
+            etag = data.get("etag")
+            self.etag = etag.encode() if etag else None
+        except (OSError, ValueError, KeyError, TypeError):
+            self.config = None
+        return self.config
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"config": self.config, "version": self.version,
+                       "etag": self.etag.decode() if self.etag else None}, f)
+        os.rename(tmp, self.path)
+
+    def headers(self, base=b""):
+        """Cabeceras de la petición: `base` más If-None-Match si hay ETag."""
+        if self.etag is None:
+            return base
+        return base + b"If-None-Match: " + self.etag + b"\r\n"
+
+    def outdated(self, version):
+        """True si `version` (configVersion de una respuesta) no es la guardada."""
+        return version is not None and version != self.version
+
+    async def refresh(self, http, headers=b""):
+        """
+        GET condicional con un AsyncHttpClient. True si la config ha
+        cambiado (ya guardada en flash), False si sigue vigente (304);
+        OSError con cualquier otro código.
+        """
+        status = await http.request("GET", CONFIG_PATH, headers=self.headers(headers))
+        self.checks += 1
+        if status == 304 and self.config is not None:
+            self.not_modified += 1
+            return False
+        if status != 200:
+            raise OSError("config: HTTP %d" % status)
+        data = http.json()
+        config = data.get("config")
+        if not isinstance(config, dict):
+            raise ValueError("config: respuesta sin 'config'")
+        version = data.get("version")
+        changed = config != self.config or version != self.version
+        if changed or http.etag != self.etag:
+            self.config = config
+            self.version = version
+            self.etag = http.etag
+            try:
+                self.save()
+            except OSError as e:
+                print("config: no se pudo guardar en flash:", e)
+        return changed
@@ -0,0 +1,373 @@
+"""
+aura.http – cliente HTTP/1.1 persistente (keep-alive)
+-----------------------------------------------------
+Sustituye a urequests en el dispositivo: resuelve el DNS una sola vez,
+mantiene un socket abierto entre peticiones, escribe las cabeceras en un
+buffer preasignado y lee la respuesta en otro buffer fijo. Si el servidor
+ha cerrado la conexión reutilizada sin responder (keep-alive caducado),
+reconecta y reintenta una vez; si ya había llegado parte de la respuesta
+no se reintenta, porque el servidor la procesó y un POST se duplicaría.
+
+AsyncHttpClient hace lo mismo sobre streams de uasyncio
+(asyncio.open_connection) con un timeout por petición, para que una
+respuesta lenta no bloquee el resto de tareas del bucle principal.
+Varias tareas pueden compartirlo (envío de lotes y revalidación de la
+config): un asyncio.Lock hace que cada petición, de las cabeceras a la
+respuesta, vaya entera antes de la siguiente. status, data y etag son
+los de la última petición: se leen justo después, sin otro await.
+
+Funciona igual en MicroPython (usocket) y en CPython (socket), de modo
+que puede probarse en el host contra tools/fake_backend.py.
+
+Uso:
+    http = HttpClient("http://192.168.1.10:4000")
+    status = http.request("GET", "/api/devices/config", headers=b"x-device-code: AURA-ABC001\\r\\n")
+    cfg = http.json()
+    print(http.latency_ms)
+"""
+
+import json
+import time
+
+try:
+    import usocket as socket
+except ImportError:
+    import socket
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+try:
+    from time import ticks_ms, ticks_diff
+except ImportError:
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+JSON = b"application/json"
+
+
+def _put(buf, pos, data):
+    """Copia bytes en buf a partir de pos; devuelve la nueva posición."""
+    end = pos + len(data)
+    if end > len(buf):
+        raise ValueError("buffer HTTP insuficiente")
+    buf[pos:end] = data
+    return end
+
+
+def _find_blank_line(buf, end):
+    """Posición de \\r\\n\\r\\n en buf[:end] o -1 (bytearray.find no existe en todos los puertos)."""
+    for i in range(end - 3):
+        if buf[i] == 13 and buf[i + 1] == 10 and buf[i + 2] == 13 and buf[i + 3] == 10:
+            return i
+    return -1
+
+
+def _parse_url(url):
+    if not url.startswith("http://"):
+        raise ValueError("solo se admite http://")
+    hostport = url[7:].split("/", 1)[0]
+    if ":" in hostport:
+        host, port = hostport.split(":", 1)
+        return host, int(port)
+    return hostport, 80
+
+
+class MeasurementPayload:
+    """
+    Cuerpo {"code","measurement","roomState"} escrito en un buffer reutilizable.
+    El prefijo con el código del dispositivo se codifica una sola vez.
+    """
+
+    def __init__(self, code, size=128):
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self._prefix = b'{"code":"' + code.encode() + b'","measurement":'
+        self._states = {}
+        self.length = 0
+
+    def fill(self, measurement, room_state):
+        state = self._states.get(room_state)
+        if state is None:
+            state = b',"roomState":"' + room_state.encode() + b'"}'
+            self._states[room_state] = state
+        pos = _put(self.buf, 0, self._prefix)
+        pos = _put(self.buf, pos, repr(measurement).encode())
+        self.length = _put(self.buf, pos, state)
+        return self.view[:self.length]
+
+
+class HttpClient:
+    def __init__(self, base_url, timeout=10, header_size=1024, response_size=1024):
+        self.host, self.port = _parse_url(base_url)
+        self.timeout = timeout
+        self.sock = None
+        self.addr = None
+        self.head = bytearray(header_size)      # cabeceras + cuerpo si cabe
+        self.resp = bytearray(response_size)
+        self._resp_view = memoryview(self.resp)
+        self._host_line = b"Host: " + ("%s:%d" % (self.host, self.port)).encode() + b"\r\n"
+        self._readinto = None
+        self._write = None
+        self.status = 0
+        self.data = b""
+        self.answered = False      # ha llegado algo de la respuesta en curso
+        self.etag = None           # cabecera ETag de la última respuesta (bytes) o None
+        self.latency_ms = 0        # duración de la última petición
+        self.requests = 0
+        self.connects = 0          # conexiones TCP abiertas (reutilización = requests/connects)
+
+    # -------- Conexión -------------------------------------------------
+    def connect(self):
+        if self.addr is None:
+            self.addr = socket.getaddrinfo(self.host, self.port)[0][-1]
+        s = socket.socket()
+        try:
+            s.settimeout(self.timeout)
+            s.connect(self.addr)
+        except OSError:
+            s.close()
+            self.addr = None          # se vuelve a resolver en el siguiente intento
+            raise
+        self.sock = s
+        self._readinto = getattr(s, "recv_into", None) or s.readinto
+        self._write = getattr(s, "sendall", None) or s.write
+        self.connects += 1
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+
+    # -------- Petición -------------------------------------------------
+    def _build_head(self, method, path, length, content_type, headers):
+        h = self.head
+        pos = _put(h, 0, method if isinstance(method, bytes) else method.encode())
+        pos = _put(h, pos, b" ")
+        pos = _put(h, pos, path if isinstance(path, bytes) else path.encode())
+        pos = _put(h, pos, b" HTTP/1.1\r\n")
+        pos = _put(h, pos, self._host_line)
+        if length:
+            pos = _put(h, pos, b"Content-Type: ")
+            pos = _put(h, pos, content_type)
+            pos = _put(h, pos, b"\r\nContent-Length: ")
+            pos = _put(h, pos, str(length).encode())
+            pos = _put(h, pos, b"\r\n")
+        if headers:
+            pos = _put(h, pos, headers)
+        return _put(h, pos, b"\r\n")
+
+    def _pack(self, head_len, body):
+        """
+        Copia el cuerpo tras las cabeceras si cabe, para enviar la petición
+        en un solo segmento (dos escrituras seguidas chocan con Nagle y el
+        ACK retardado del servidor: ~40 ms extra por petición).
+        """
+        if body and head_len + len(body) <= len(self.head):
+            self.head[head_len:head_len + len(body)] = body
+            return head_len + len(body), None
+        return head_len, body
+
+    def _send(self, head_len, body):
+        head_len, body = self._pack(head_len, body)
+        self._write(memoryview(self.head)[:head_len])
+        if body:
+            self._write(body)
+
+    def _fill(self, pos):
+        n = self._readinto(self._resp_view[pos:])
+        if not n:
+            raise OSError("conexión cerrada por el servidor")
+        self.answered = True
+        return pos + n
+
+    def _receive(self):
+        """Lee cabeceras y cuerpo en self.resp; devuelve True si hay que cerrar."""
+        pos = 0
+        end = -1
+        while end < 0:
+            if pos == len(self.resp):
+                raise ValueError("cabeceras HTTP demasiado largas")
+            pos = self._fill(pos)
+            end = _find_blank_line(self.resp, pos)
+        raw = bytes(self._resp_view[:end])
+        head = raw.lower()
+        self.status = int(head[9:12])
+        self.etag = None
+        length = 0
+        close = False
+        lines = head.split(b"\r\n")
+        for i in range(1, len(lines)):
+            line = lines[i]
+            if line.startswith(b"etag:"):
+                # El valor del ETag distingue mayúsculas: se toma de la cabecera original
+                self.etag = raw.split(b"\r\n")[i][5:].strip()
+            elif line.startswith(b"content-length:"):
+                length = int(line[15:])
+            elif line.startswith(b"connection:") and b"close" in line:
+                close = True
+            elif line.startswith(b"transfer-encoding:"):
+                raise ValueError("transfer-encoding no soportado")
+        start = end + 4
+        if start + length > len(self.resp):
+            raise ValueError("respuesta demasiado grande")
+        while pos < start + length:
+            pos = self._fill(pos)
+        self.data = self._resp_view[start:start + length]
+        return close
+
+    def request(self, method, path, body=None, headers=None, content_type=JSON):
+        """
+        Envía la petición y devuelve el código de estado.
+        El cuerpo de la respuesta queda en self.data (válido hasta la siguiente).
+        """
+        if isinstance(body, str):
+            body = body.encode()
+        t0 = ticks_ms()
+        head_len = self._build_head(method, path, len(body) if body else 0,
+                                    content_type, headers)
+        for attempt in (0, 1):
+            reused = self.sock is not None
+            if not reused:
+                self.connect()
+            self.answered = False
+            try:
+                self._send(head_len, body)
+                close = self._receive()
+                break
+            except OSError:
+                self.close()
+                # Solo reintentamos si el fallo fue sobre una conexión reutilizada
+                # y sin respuesta alguna (con parte de ella, un POST se duplicaría)
+                if attempt or not reused or self.answered:
+                    raise
+            except Exception:
+                self.close()
+                raise
+        if close:
+            self.close()
+        self.requests += 1
+        self.latency_ms = ticks_diff(ticks_ms(), t0)
+        return self.status
+
+    def json(self):
+        return json.loads(bytes(self.data)) if len(self.data) else {}
+
+
+class AsyncHttpClient(HttpClient):
+    """Variante asyncio: misma API que HttpClient pero request() es una corrutina."""
+
+    def __init__(self, base_url, timeout=10, header_size=1024):
+        super().__init__(base_url, timeout, header_size, 0)
+        self.lock = asyncio.Lock()       # una petición en curso a la vez
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        self.sock = self.writer
+        self.connects += 1
+
+    async def aclose(self):
+        w = self.writer
+        self.sock = self.reader = self.writer = None
+        if w is not None:
+            try:
+                w.close()
+                await w.wait_closed()
+            except Exception:
+                pass
+
+    def close(self):
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except Exception:
+                pass
+        self.sock = self.reader = self.writer = None
+
+    async def _exchange(self, head_len, body):
+        head_len, body = self._pack(head_len, body)
+        self.writer.write(memoryview(self.head)[:head_len])
+        if body:
+            self.writer.write(body)
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise OSError("conexión cerrada por el servidor")
+        self.answered = True
+        self.status = int(line[9:12])
+        self.etag = None
+        length = 0
+        close = False
+        while True:
+            raw = await self.reader.readline()
+            if not raw.endswith(b"\n"):
+                # Cortada a media cabecera: no es el final de las cabeceras
+                raise OSError("conexión cerrada por el servidor")
+            line = raw.lower()
+            if line == b"\r\n":
+                break
+            if line.startswith(b"etag:"):
+                self.etag = raw[5:].strip()
+            elif line.startswith(b"content-length:"):
+                length = int(line[15:])
+            elif line.startswith(b"connection:") and b"close" in line:
+                close = True
+            elif line.startswith(b"transfer-encoding:"):
+                raise ValueError("transfer-encoding no soportado")
+        self.data = await self.reader.readexactly(length) if length else b""
+        return close
+
+    async def request(self, method, path, body=None, headers=None, content_type=JSON,
+                      timeout=None):
+        """
+        Como HttpClient.request; lanza asyncio.TimeoutError tras `timeout` s
+        (por defecto self.timeout; más para las consultas long-poll).
+        Si otra tarea tiene una petición en curso, espera a que acabe.
+        """
+        async with self.lock:
+            return await self._request(method, path, body, headers, content_type, timeout)
+
+    async def _request(self, method, path, body, headers, content_type, timeout):
+        if timeout is None:
+            timeout = self.timeout
+        if isinstance(body, str):
+            body = body.encode()
+        t0 = ticks_ms()
+        head_len = self._build_head(method, path, len(body) if body else 0,
+                                    content_type, headers)
+        for attempt in (0, 1):
+            reused = self.writer is not None
+            if not reused:
+                await self.connect()
+            self.answered = False
+            try:
+                close = await asyncio.wait_for(self._exchange(head_len, body), timeout)
+                break
+            except asyncio.TimeoutError:
+                # En CPython TimeoutError hereda de OSError: no se reintenta
+                self.close()
+                raise
+            except OSError:
+                self.close()
+                if attempt or not reused or self.answered:
+                    raise
+            except Exception:
+                # Timeout o respuesta inválida: el socket queda en estado desconocido
+                self.close()
+                raise
+        if close:
+            await self.aclose()
+        self.requests += 1
+        self.latency_ms = ticks_diff(ticks_ms(), t0)
+        return self.status
@@ -0,0 +1,115 @@
+"""
+aura.level – cálculo de nivel (RMS / pico) sin asignaciones por muestra
+----------------------------------------------------------------------
+Trabaja directamente sobre el buffer PCM de 16 bits que rellena
+I2S.readinto(), sin copiarlo (buf[:n]) ni desempaquetarlo con struct.
+
+Se elige la implementación al importar:
+1. viper (aura._level_viper) en MicroPython con emisor nativo
+2. memoryview.cast('h') en CPython (herramientas de host y emulador)
+3. bucle byte a byte en MicroPython sin viper
+
+Solo la ruta viper se espera más rápida que el cálculo original
+(struct.unpack + generador) en el dispositivo; aún no hay medida en la
+Pico. En el host las otras dos son más lentas: tools/bench_level.py, 40
+ventanas de 1600 muestras, CPython 3.11 en un núcleo, dos ejecuciones:
+
+    original (struct)     83–121 us/ventana   pico heap 67420 B
+    LevelMeter (view)    173–249 us/ventana   pico heap  4168 B
+    LevelMeter (bytes)   398–467 us/ventana   pico heap  3960 B
+
+Lo que ganan en el host es memoria (no copian ni desempaquetan el
+buffer); la ruta de bytes solo existe para MicroPython sin viper.
+"""
+
+import math
+from array import array
+
+try:
+    from operator import mul as _mul
+except ImportError:
+    _mul = None
+
+try:
+    from aura._level_viper import accumulate as _accumulate_viper
+except (ImportError, SyntaxError):
+    _accumulate_viper = None
+
+FULL_SCALE = 32768
+
+
+def _accumulate_bytes(buf, n, out):
+    """Fallback portable: combina los dos bytes de cada muestra a mano."""
+    acc = 0
+    peak = 0
+    for i in range(0, 2 * n, 2):
+        s = buf[i] | (buf[i + 1] << 8)
+        if s & 0x8000:
+            s = 0x10000 - s
+        if s > peak:
+            peak = s
+        acc += s * s
+    out[0] = acc & 0x3FFFFFFF
+    out[1] = acc >> 30
+    out[2] = peak
+    return n
+
+
+class LevelMeter:
+    """
+    Medidor de nivel ligado a un buffer PCM int16 preasignado.
+    Tras measure() quedan disponibles rms, peak, count y sum_squares.
+    """
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.rms = 0.0
+        self.peak = 0
+        self.count = 0
+        self.sum_squares = 0
+        self._out = array("i", (0, 0, 0))
+        self._view = None
+        if _accumulate_viper is not None:
+            self._accumulate = _accumulate_viper
+        else:
+            try:
+                self._view = memoryview(buf).cast("h")
+            except (AttributeError, TypeError):
+                self._view = None
+            if self._view is not None:
+                self._accumulate = self._accumulate_view
+            else:
+                self._accumulate = _accumulate_bytes
+
+    def _accumulate_view(self, buf, n, out):
+        samples = self._view[:n]
+        acc = sum(map(_mul, samples, samples))
+        peak = max(map(abs, samples))
+        out[0] = acc & 0x3FFFFFFF
+        out[1] = acc >> 30
+        out[2] = peak
+        return n
+
+    def measure(self, nbytes):
+        """
+        Procesa los primeros nbytes del buffer y devuelve el RMS
+        (en unidades de muestra, 0..32768).
+        """
+        n = nbytes >> 1
+        if n <= 0:
+            self.rms = 0.0
+            self.peak = 0
+            self.count = 0
+            self.sum_squares = 0
+            return 0.0
+        out = self._out
+        self._accumulate(self.buf, n, out)
+        self.sum_squares = (out[1] << 30) + out[0]
+        self.peak = out[2]
+        self.count = n
+        self.rms = math.sqrt(self.sum_squares / n)
+        return self.rms
+
+    def level(self, scale=10000):
+        """Nivel normalizado 0.0–1.0 del último measure() (rms / scale)."""
+        return min(1.0, self.rms / scale)
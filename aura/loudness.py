@@ -0,0 +1,189 @@
+"""
+aura.loudness – nivel sonoro calibrado con ponderación A (dBA, LAeq)
+--------------------------------------------------------------------
+El RMS / 10000 de antes dependía de la ganancia de cada micrófono y no
+era comparable entre dispositivos. LoudnessMeter filtra cada bloque PCM
+int16 con la ponderación A y devuelve su media de cuadrados; dba() la
+convierte en dB(A) con el desplazamiento de calibración del dispositivo
+(`dbOffset` de /api/devices/config: dB SPL a 0 dBFS). `fast` sigue la
+misma media con ponderación temporal Fast (125 ms) bloque a bloque: es
+el nivel "de ahora" que vigila aura.alert entre ventanas de reporte.
+
+Filtro a 16 kHz, en coma fija y con estado entre bloques:
+- cuatro paso-alto de primer orden (transformación bilineal de los polos
+  a 20,6 Hz (x2), 107,7 Hz y 737,9 Hz de la curva A);
+- un cero FIR y = x + 0,15·x[-1] en lugar de los polos a 12,2 kHz, que
+  caen por encima de Nyquist.
+Error frente a la curva IEC 61672 < 0,3 dB entre 31,5 Hz y 7,5 kHz
+(tools/bench_loudness.py lo comprueba con tonos). La ganancia a 1 kHz
+se normaliza a 0 dB al crear el medidor.
+
+Muestras en Q8 (x << 8) y coeficientes en Q15; los productos se parten
+en dos para no pasar de 31 bits (válido también en viper). Como
+aura.level, usa aura._loudness_viper si el firmware tiene emisor nativo.
+"""
+
+import math
+from array import array
+
+from aura.level import FULL_SCALE
+
+try:
+    from aura._loudness_viper import weight as _weight_viper
+except (ImportError, SyntaxError):
+    _weight_viper = None
+
+RATE = 16000
+HP_POLES = (20.598997, 20.598997, 107.65265, 737.86223)   # Hz
+FIR_ZERO = 0.15
+DB_OFFSET = 120.0        # INMP441: -26 dBFS a 94 dB SPL
+DBFS_FLOOR = -96.0       # suelo de un bloque en silencio digital (16 bits)
+FAST_TAU = 0.125         # s: ponderación temporal Fast (IEC 61672) de `fast`
+
+# Nivel 0–1 del clasificador a partir de dBA (aura.classify)
+LEVEL_QUIET = 35.0       # dBA -> 0.0
+LEVEL_SPAN = 50.0        # 85 dBA -> 1.0
+
+NSECT = len(HP_POLES)
+STATE_SIZE = 2 * NSECT + 1     # (x1, y1) por sección + x1 del FIR
+
+
+def _weight(buf, n, coef, state, out):
+    """
+    Filtra n muestras de buf con la ponderación A continuando desde state.
+    out (array('i') de 2): suma de cuadrados de la salida (en unidades
+    int16) en dos palabras de 30 bits (bajo, alto). Devuelve n.
+    Secciones desenrolladas y estado en locales: es la ruta sin viper.
+    """
+    a0, b0, a1, b1, a2, b2, a3, b3, f = coef
+    x0, y0, x1, y1, x2, y2, x3, y3, xf = state
+    lo = 0
+    hi = 0
+    for i in range(0, 2 * n, 2):
+        s = buf[i] | (buf[i + 1] << 8)
+        if s & 0x8000:
+            s -= 0x10000
+        x = s << 8
+        # y = (b·(x - x1) + a·y1) >> 15, cada producto partido en dos
+        v = x - x0
+        x0 = x
+        y0 = b0 * (v >> 15) + ((b0 * (v & 0x7FFF)) >> 15) + a0 * (y0 >> 15) + ((a0 * (y0 & 0x7FFF)) >> 15)
+        v = y0 - x1
+        x1 = y0
+        y1 = b1 * (v >> 15) + ((b1 * (v & 0x7FFF)) >> 15) + a1 * (y1 >> 15) + ((a1 * (y1 & 0x7FFF)) >> 15)
+        v = y1 - x2
+        x2 = y1
+        y2 = b2 * (v >> 15) + ((b2 * (v & 0x7FFF)) >> 15) + a2 * (y2 >> 15) + ((a2 * (y2 & 0x7FFF)) >> 15)
+        v = y2 - x3
+        x3 = y2
+        y3 = b3 * (v >> 15) + ((b3 * (v & 0x7FFF)) >> 15) + a3 * (y3 >> 15) + ((a3 * (y3 & 0x7FFF)) >> 15)
+        y = y3 + f * (xf >> 15) + ((f * (xf & 0x7FFF)) >> 15)
+        xf = y3
+        e = (y + 128) >> 8               # redondeo a unidades int16
+        if e < 0:
+            e = -e
+        if e > 46340:
+            # e*e no cabe en 31 bits: 4*(e >> 1)^2 + (e & 1)*(2*e - 1)
+            if e > 0xFFFF:
+                e = 0xFFFF
+            h = e >> 1
+            q = h * h
+            hi += q >> 28
+            lo += ((q & 0x0FFFFFFF) << 2) + (e & 1) * (2 * e - 1)
+        else:
+            lo += e * e
+        hi += lo >> 30
+        lo &= 0x3FFFFFFF
+    state[0] = x0
+    state[1] = y0
+    state[2] = x1
+    state[3] = y1
+    state[4] = x2
+    state[5] = y2
+    state[6] = x3
+    state[7] = y3
+    state[8] = xf
+    out[0] = lo
+    out[1] = hi
+    return n
+
+
+if _weight_viper is not None:
+    _weight = _weight_viper
+
+
+def level(dba):
+    """Nivel 0.0–1.0 para el clasificador: 35 dBA -> 0, 85 dBA -> 1."""
+    v = (dba - LEVEL_QUIET) / LEVEL_SPAN
+    return 0.0 if v < 0 else 1.0 if v > 1 else v
+
+
+class LoudnessMeter:
+    """Ponderación A en streaming; el estado del filtro pasa de un bloque al siguiente."""
+
+    def __init__(self, offset=DB_OFFSET, rate=RATE):
+        k = 2.0 * rate
+        self.coef = array("i", [0] * STATE_SIZE)
+        self.state = array("i", [0] * STATE_SIZE)
+        self._out = array("i", (0, 0))
+        # Sección j: y = b·(x - x1) + a·y1, con a = (K - w)/(K + w), b = K/(K + w)
+        w1k = 2 * math.pi * 1000 / rate
+        gain = 1.0
+        for j in range(NSECT):
+            w = 2 * math.pi * HP_POLES[j]
+            a = int((k - w) / (k + w) * 32768 + 0.5)
+            b = int(k / (k + w) * 32768 + 0.5)
+            self.coef[2 * j] = a
+            self.coef[2 * j + 1] = b
+            # |H(1 kHz)| con los coeficientes ya cuantificados
+            a /= 32768
+            b /= 32768
+            gain *= b * math.sqrt((2 - 2 * math.cos(w1k)) / (1 - 2 * a * math.cos(w1k) + a * a))
+        c = int(FIR_ZERO * 32768 + 0.5)
+        self.coef[2 * NSECT] = c
+        c /= 32768
+        gain *= math.sqrt(1 + 2 * c * math.cos(w1k) + c * c)
+        # Media de cuadrados -> fracción del fondo de escala, 0 dB a 1 kHz
+        self._norm = 1.0 / (gain * gain * FULL_SCALE * FULL_SCALE)
+        self.offset = offset
+        self.rate = rate
+        self.mean_square = 0.0
+        self.fast = 0.0          # media de cuadrados con ponderación Fast
+        self._fast_n = 0
+        self._fast_k = 0.0
+
+    def calibrate(self, offset):
+        """Desplazamiento dB SPL a 0 dBFS (config dbOffset); None lo deja igual."""
+        if offset is not None:
+            self.offset = float(offset)
+
+    def reset(self):
+        state = self.state
+        for i in range(STATE_SIZE):
+            state[i] = 0
+
+    def process(self, buf, nbytes):
+        """Filtra los primeros nbytes de buf; devuelve la media de cuadrados ponderada."""
+        n = nbytes >> 1
+        if n <= 0:
+            self.mean_square = 0.0
+            return 0.0
+        out = self._out
+        _weight(buf, n, self.coef, self.state, out)
+        self.mean_square = ((out[1] << 30) + out[0]) / n
+        if n != self._fast_n:
+            # Peso de un bloque de n muestras: 1 - e^(-duración / FAST_TAU)
+            self._fast_n = n
+            self._fast_k = 1.0 - math.exp(-n / (self.rate * FAST_TAU))
+        self.fast += self._fast_k * (self.mean_square - self.fast)
+        return self.mean_square
+
+    def dba(self, mean_square=None):
+        """dB(A) calibrados de una media de cuadrados (por defecto la del último bloque)."""
+        if mean_square is None:
+            mean_square = self.mean_square
+        floor = DBFS_FLOOR + self.offset
+        if mean_square <= 0:
+            return floor
+        db = 10 * math.log10(mean_square * self._norm) + self.offset
+        return db if db > floor else floor
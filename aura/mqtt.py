@@ -0,0 +1,233 @@
+"""
+aura.mqtt – cliente MQTT 3.1.1 mínimo sobre uasyncio (solo publicar)
+--------------------------------------------------------------------
+Como umqtt.simple, pero con streams de uasyncio para no bloquear el
+bucle principal: una sola sesión persistente (clean session = 0 por
+defecto) abierta mientras haya red, publicaciones QoS 0 o 1 y PINGREQ
+para que el broker no la dé por muerta.
+
+- QoS 0: se escribe y listo (sin respuesta del broker).
+- QoS 1: se espera el PUBACK con el mismo id de paquete; si la conexión
+  se cae, se reconecta y se reenvía una vez con el bit DUP.
+
+La cabecera fija, el tema y el id se escriben en un buffer preasignado;
+el mensaje se escribe aparte tal cual (bytes, bytearray o memoryview).
+
+Varias tareas pueden compartir el cliente (lotes, alertas y el PINGREQ
+del keepalive) con dos asyncio.Lock:
+
+- `lock` (escritura): connect y cada paquete escrito, para que no se
+  pisen el buffer de cabecera ni los bytes en el socket. Se suelta en
+  cuanto el paquete sale.
+- `rx` (lectura): una publicación QoS 1 o un ping lo toman antes de
+  escribir y lo sueltan al llegar su PUBACK o PINGRESP, así que solo
+  hay una respuesta pendiente y una tarea leyendo el socket.
+
+Una publicación QoS 0 solo toma `lock`: sale mientras un lote espera su
+PUBACK, como mucho detrás de la escritura en curso.
+
+Uso:
+    mq = MqttClient("192.168.1.10", client_id="AURA-ABC001")
+    await mq.publish(b"aura/AURA-ABC001/batch", body, qos=1)
+"""
+
+import struct
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from aura.http import ticks_ms, ticks_diff
+
+CONNECT = 0x10
+CONNACK = 0x20
+PUBLISH = 0x30
+PUBACK = 0x40
+PINGREQ = 0xC0
+PINGRESP = 0xD0
+DISCONNECT = 0xE0
+
+KEEPALIVE = 60           # s; el broker corta tras 1,5 x sin paquetes
+
+
+class MqttError(OSError):
+    pass
+
+
+def _varlen(buf, pos, n):
+    """Longitud restante MQTT (1–4 bytes) en buf[pos:]; devuelve la posición siguiente."""
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        buf[pos] = b | 0x80 if n else b
+        pos += 1
+        if not n:
+            return pos
+
+
+class MqttClient:
+    def __init__(self, host, port=1883, client_id="aura", keepalive=KEEPALIVE,
+                 clean=False, timeout=10, header_size=128):
+        self.host = host
+        self.port = port
+        self.client_id = client_id.encode() if isinstance(client_id, str) else client_id
+        self.keepalive = keepalive
+        self.clean = clean
+        self.timeout = timeout
+        self.head = bytearray(header_size)
+        self.lock = asyncio.Lock()       # escritura: connect y un paquete a la vez
+        self.rx = asyncio.Lock()         # lectura: un PUBACK o PINGRESP pendiente
+        self.reader = None
+        self.writer = None
+        self.pid = 0
+        self.last_tx = 0             # ticks_ms del último paquete enviado
+        self.latency_ms = 0          # última publicación (con PUBACK si QoS 1)
+        self.connects = 0
+        self.publishes = 0
+        self.bytes_out = 0
+
+    # -------- Conexión -------------------------------------------------
+    async def connect(self):
+        async with self.lock:
+            await self._connect()
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        cid = self.client_id
+        head = self.head
+        head[0] = CONNECT
+        pos = _varlen(head, 1, 12 + len(cid))
+        struct.pack_into("!H4sBBHH", head, pos, 4, b"MQTT", 4,
+                         0x02 if self.clean else 0, self.keepalive, len(cid))
+        pos += 12
+        head[pos:pos + len(cid)] = cid
+        await self._write(memoryview(head)[:pos + len(cid)])
+        typ, body = await asyncio.wait_for(self._read_packet(), self.timeout)
+        if typ != CONNACK or body[1] != 0:
+            self.close()
+            raise MqttError("mqtt: CONNACK %r" % (bytes(body),))
+        self.connects += 1
+
+    def close(self):
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+
+    async def disconnect(self):
+        async with self.lock:
+            if self.writer is not None:
+                try:
+                    await self._write(bytes((DISCONNECT, 0)))
+                except OSError:
+                    pass
+            self.close()
+
+    # -------- E/S ------------------------------------------------------
+    async def _write(self, data, payload=None):
+        writer = self.writer         # otra tarea puede cerrar a media escritura
+        writer.write(data)
+        n = len(data)
+        if payload:
+            writer.write(payload)
+            n += len(payload)
+        await writer.drain()
+        self.bytes_out += n
+        self.last_tx = ticks_ms()
+
+    async def _read_packet(self):
+        """(tipo, cuerpo) del siguiente paquete del broker."""
+        reader = self.reader
+        first = await reader.readexactly(1)
+        n = 0
+        shift = 0
+        while True:
+            b = (await reader.readexactly(1))[0]
+            n |= (b & 0x7F) << shift
+            if not b & 0x80:
+                break
+            shift += 7
+        body = await reader.readexactly(n) if n else b""
+        return first[0] & 0xF0, body
+
+    async def _wait_puback(self, pid):
+        while True:
+            typ, body = await self._read_packet()
+            if typ == PUBACK and struct.unpack("!H", body)[0] == pid:
+                return
+            # PINGRESP u otros: se ignoran
+
+    # -------- Publicar ---------------------------------------------------
+    async def publish(self, topic, msg, qos=0, retain=False):
+        """Publica msg en topic; con QoS 1 vuelve cuando el broker lo confirma."""
+        if not qos:
+            await self._publish(topic, msg, qos, retain)
+            return
+        async with self.rx:
+            await self._publish(topic, msg, qos, retain)
+
+    async def _publish(self, topic, msg, qos, retain):
+        t0 = ticks_ms()
+        if qos:
+            self.pid = self.pid % 0xFFFF + 1
+        for attempt in (0, 1):
+            async with self.lock:
+                reused = self.writer is not None
+                if not reused:
+                    await self._connect()
+                head = self.head
+                head[0] = PUBLISH | (qos << 1) | retain | (0x08 if attempt and qos else 0)
+                pos = _varlen(head, 1, 2 + len(topic) + (2 if qos else 0) + len(msg))
+                struct.pack_into("!H", head, pos, len(topic))
+                pos += 2
+                head[pos:pos + len(topic)] = topic
+                pos += len(topic)
+                if qos:
+                    struct.pack_into("!H", head, pos, self.pid)
+                    pos += 2
+                ok = await self._try(self._write(memoryview(head)[:pos], msg), attempt, reused)
+            # El PUBACK se espera fuera de `lock`: las QoS 0 siguen saliendo
+            if ok and qos:
+                ok = await self._try(self._wait_puback(self.pid), attempt, reused)
+            if ok:
+                break
+        self.publishes += 1
+        self.latency_ms = ticks_diff(ticks_ms(), t0)
+
+    async def _try(self, coro, attempt, reused):
+        """Espera coro; False si la conexión cayó y toca reenviar."""
+        try:
+            await asyncio.wait_for(coro, self.timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.close()
+            raise
+        except (OSError, EOFError):
+            # Conexión caída (EOFError: el broker la cerró a media respuesta)
+            self.close()
+            if attempt or not reused:
+                raise MqttError("mqtt: conexión perdida")
+            return False
+
+    async def ping(self):
+        """PINGREQ si no se ha enviado nada en medio keepalive (mantiene la sesión)."""
+        async with self.rx:
+            async with self.lock:
+                if self.writer is None:
+                    return
+                if ticks_diff(ticks_ms(), self.last_tx) < self.keepalive * 500:
+                    return
+                try:
+                    await self._write(bytes((PINGREQ, 0)))
+                except OSError:
+                    self.close()
+                    return
+            try:
+                while (await asyncio.wait_for(self._read_packet(), self.timeout))[0] != PINGRESP:
+                    pass
+            except (OSError, EOFError, asyncio.TimeoutError):
+                self.close()
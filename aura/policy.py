@@ -0,0 +1,80 @@
+"""
+aura.policy – envío por cambios (banda muerta) con latido
+---------------------------------------------------------
+Se muestrea a ritmo completo, pero una lectura solo se envía si:
+  - cambia el estado de la sala,
+  - temperatura, humedad o sonido se alejan de la última lectura enviada
+    más que su banda muerta,
+  - o ha pasado `heartbeat` s desde el último envío (latido).
+
+Las lecturas no enviadas se cuentan; el contador viaja con la siguiente
+lectura ("suppressed") para que el dashboard distinga una sala tranquila
+de un dispositivo desconectado.
+
+Los umbrales llegan en /api/devices/config (deadbandTemp, deadbandHum,
+deadbandSound, heartbeat). Sin config, heartbeat = 0 y se envía todo.
+"""
+
+import time
+
+
+class ReportPolicy:
+    def __init__(self, temp_band=0.5, hum_band=2.0, sound_band=0.1, heartbeat=0):
+        self.temp_band = temp_band
+        self.hum_band = hum_band
+        self.sound_band = sound_band
+        self.heartbeat_ms = heartbeat * 1000
+        self.state = None
+        self.temp = None
+        self.hum = None
+        self.sound = None
+        self.last_ms = 0
+        self.pending = 0         # suprimidas desde el último envío
+        self.suppressed = 0      # total suprimidas
+        self.sent = 0
+
+    def configure(self, cfg):
+        """Aplica los umbrales recibidos del servidor (claves ausentes: sin cambios)."""
+        if cfg.get("deadbandTemp") is not None:
+            self.temp_band = float(cfg["deadbandTemp"])
+        if cfg.get("deadbandHum") is not None:
+            self.hum_band = float(cfg["deadbandHum"])
+        if cfg.get("deadbandSound") is not None:
+            self.sound_band = float(cfg["deadbandSound"])
+        if cfg.get("heartbeat") is not None:
+            self.heartbeat_ms = max(0, int(cfg["heartbeat"])) * 1000
+
+    def _moved(self, value, last, band):
+        if value is None:
+            return False
+        return last is None or abs(value - last) > band
+
+    def should_send(self, state, temp, hum, sound):
+        """
+        Decide si la lectura se envía. Si devuelve True, take_suppressed()
+        da el número de lecturas omitidas que hay que adjuntar.
+        """
+        now = time.ticks_ms()
+        if (not self.heartbeat_ms or state != self.state
+                or time.ticks_diff(now, self.last_ms) >= self.heartbeat_ms
+                or self._moved(temp, self.temp, self.temp_band)
+                or self._moved(hum, self.hum, self.hum_band)
+                or self._moved(sound, self.sound, self.sound_band)):
+            self.state = state
+            if temp is not None:
+                self.temp = temp
+            if hum is not None:
+                self.hum = hum
+            if sound is not None:
+                self.sound = sound
+            self.last_ms = now
+            self.sent += 1
+            return True
+        self.pending += 1
+        self.suppressed += 1
+        return False
+
+    def take_suppressed(self):
+        n = self.pending
+        self.pending = 0
+        return n
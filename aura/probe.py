@@ -0,0 +1,123 @@
+"""
+aura.probe – tiempos y memoria por fase del bucle principal
+-----------------------------------------------------------
+Cada fase (lectura de sensores, audio, clasificación, pantalla, montaje
+del cuerpo y HTTP) se envuelve en begin()/end(): se mide su duración con
+ticks_us y los bytes que reserva con gc.mem_alloc(). Por fase se guardan
+recuento, mínimo, media y máximo en array('i') de tamaño fijo: nada se
+reserva al medir.
+
+La media es móvil: al llegar a ROLLING muestras se parten a la mitad el
+recuento y las sumas, así pesa más lo reciente y las sumas no desbordan.
+Mínimo y máximo son desde el último report().
+
+report() devuelve un bloque compacto para añadir al envío por lotes
+(campo "health" de /api/devices/data/batch) y empieza una ventana nueva;
+dump() lo imprime por la consola serie sin reiniciar nada.
+
+Notas:
+- begin()/end() de una fase que cruza un await (HTTP) incluyen el tiempo
+  y las reservas de las otras tareas que corren mientras tanto.
+- Si el recolector pasa dentro de la fase, mem_alloc() baja; esa muestra
+  cuenta 0 bytes.
+"""
+
+import gc
+import time
+from array import array
+
+PHASES = ("read", "audio", "classify", "display", "payload", "http")
+READ, AUDIO, CLASSIFY, DISPLAY, PAYLOAD, HTTP = range(6)
+ROLLING = 64             # muestras antes de partir las sumas a la mitad
+INT_MAX = 0x7FFFFFFF
+
+
+class Probe:
+    def __init__(self, phases=PHASES):
+        n = len(phases)
+        self.phases = phases
+        self.count = array("i", [0] * n)
+        self.total_us = array("i", [0] * n)
+        self.min_us = array("i", [0] * n)
+        self.max_us = array("i", [0] * n)
+        self.alloc = array("i", [0] * n)      # bytes reservados (suma móvil)
+        self.alloc_max = array("i", [0] * n)
+        self._t0 = array("i", [0] * n)
+        self._a0 = array("i", [0] * n)
+        self.boot = time.ticks_ms()
+        self.free_min = INT_MAX               # menor mem_free() al cerrar una fase
+        self.reset()
+
+    def reset(self):
+        """Empieza una ventana nueva (mínimos, máximos y medias)."""
+        for i in range(len(self.phases)):
+            self.count[i] = 0
+            self.total_us[i] = 0
+            self.min_us[i] = INT_MAX
+            self.max_us[i] = 0
+            self.alloc[i] = 0
+            self.alloc_max[i] = 0
+        self.free_min = INT_MAX
+
+    # -------- Medida ------------------------------------------------------
+    def begin(self, phase):
+        self._a0[phase] = gc.mem_alloc()
+        self._t0[phase] = time.ticks_us()
+
+    def end(self, phase):
+        us = time.ticks_diff(time.ticks_us(), self._t0[phase])
+        used = gc.mem_alloc() - self._a0[phase]
+        if used < 0:
+            used = 0                          # ha pasado el recolector
+        n = self.count[phase] + 1
+        total = self.total_us[phase] + us
+        alloc = self.alloc[phase] + used
+        if n >= ROLLING or total > INT_MAX >> 1:
+            n >>= 1
+            total >>= 1
+            alloc >>= 1
+        self.count[phase] = n
+        self.total_us[phase] = total
+        self.alloc[phase] = alloc
+        if us < self.min_us[phase]:
+            self.min_us[phase] = us
+        if us > self.max_us[phase]:
+            self.max_us[phase] = us
+        if used > self.alloc_max[phase]:
+            self.alloc_max[phase] = used
+        free = gc.mem_free()
+        if free < self.free_min:
+            self.free_min = free
+
+    # -------- Salida ------------------------------------------------------
+    def summary(self):
+        """{"up": s, "free": B, "freeMin": B, "ph": {fase: [n, mín, media, máx us, media B]}}."""
+        ph = {}
+        for i in range(len(self.phases)):
+            n = self.count[i]
+            if n:
+                ph[self.phases[i]] = [n, self.min_us[i], self.total_us[i] // n,
+                                      self.max_us[i], self.alloc[i] // n]
+        free = gc.mem_free()
+        return {"up": time.ticks_diff(time.ticks_ms(), self.boot) // 1000,
+                "free": free,
+                "freeMin": self.free_min if self.free_min != INT_MAX else free,
+                "ph": ph}
+
+    def report(self):
+        """Bloque de salud para el envío; abre una ventana nueva."""
+        out = self.summary()
+        self.reset()
+        return out
+
+    def dump(self):
+        """Tabla por la consola serie (no reinicia la ventana)."""
+        print("fase         n    min us  media us    max us  media B   max B")
+        for i in range(len(self.phases)):
+            n = self.count[i]
+            if n:
+                print("%-8s %5d %9d %9d %9d %8d %7d" % (
+                    self.phases[i], n, self.min_us[i], self.total_us[i] // n,
+                    self.max_us[i], self.alloc[i] // n, self.alloc_max[i]))
+        print("heap libre %d B (mín. %d B)" % (gc.mem_free(),
+              self.free_min if self.free_min != INT_MAX else gc.mem_free()))
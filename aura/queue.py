@@ -0,0 +1,47 @@
+"""
+aura.queue – cola acotada entre tareas asyncio
+----------------------------------------------
+Anillo de tamaño fijo: put_nowait() nunca bloquea al productor (la tarea
+de sensores); si la cola está llena se descarta el elemento más antiguo y
+se cuenta en `dropped`. get() espera hasta que haya un elemento.
+"""
+
+import uasyncio as asyncio
+
+
+class BoundedQueue:
+    def __init__(self, size):
+        self.items = [None] * size
+        self.size = size
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+        self._event = asyncio.Event()
+
+    def __len__(self):
+        return self.count
+
+    def put_nowait(self, item):
+        if self.count == self.size:
+            self.items[self.head] = None
+            self.head = (self.head + 1) % self.size
+            self.count -= 1
+            self.dropped += 1
+        self.items[(self.head + self.count) % self.size] = item
+        self.count += 1
+        self._event.set()
+
+    def get_nowait(self):
+        if not self.count:
+            raise IndexError("cola vacía")
+        item = self.items[self.head]
+        self.items[self.head] = None
+        self.head = (self.head + 1) % self.size
+        self.count -= 1
+        return item
+
+    async def get(self):
+        while not self.count:
+            self._event.clear()
+            await self._event.wait()
+        return self.get_nowait()
@@ -0,0 +1,112 @@
+"""
+aura.register – espera a que el dispositivo sea reclamado
+---------------------------------------------------------
+Antes, sin registrar, el dispositivo enviaba una medición completa a
+/api/devices/data cada segundo hasta que alguien lo reclamaba: una caja
+de cien equipos sin reclamar en una estantería eran ~100 peticiones/s
+de escrituras inútiles.
+
+Registration.poll() consulta GET /api/devices/registration?wait=N, que
+no escribe nada y que el servidor retiene (long-poll) hasta que el
+dispositivo se reclama o pasan N s; la respuesta trae "wait" con los s
+retenidos. pause() da la espera hasta la siguiente consulta:
+
+- 0 si el servidor ha retenido la petición (él marca el ritmo);
+- si no (backend antiguo, error de red, respuesta inmediata), un
+  retroceso exponencial con jitter (Backoff): 1, 2, 4... hasta BACKOFF_CAP
+  s, cada espera al azar entre la mitad y el total para que una flota
+  encendida a la vez no consulte sincronizada.
+
+Con un backend sin la ruta (404), poll() devuelve "unsupported" y el
+firmware recurre al envío de antes, también con pause().
+
+show_code() es la pantalla de registro (el código en grande para
+reclamarlo). El módulo solo hace falta hasta que el dispositivo está
+reclamado: el firmware lo importa al entrar en la espera y lo saca de
+sys.modules al salir, y el recolector recupera su RAM.
+"""
+
+import random
+
+REGISTRATION_PATH = "/api/devices/registration"
+LONG_POLL = 25           # s que se pide al servidor retener la consulta
+MARGIN = 5               # s de más para el timeout de la petición
+BACKOFF_BASE = 1         # s
+BACKOFF_CAP = 60         # s: un equipo recién reclamado tarda como mucho esto
+
+
+class Backoff:
+    """Retroceso exponencial con jitter ("equal jitter"): [d/2, d], d = base·2^n ≤ cap."""
+
+    def __init__(self, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+        self.base = base
+        self.cap = cap
+        self.attempt = 0
+
+    def reset(self):
+        self.attempt = 0
+
+    def next(self):
+        """Segundos de la siguiente espera (y la siguiente será el doble)."""
+        d = min(self.cap, self.base << self.attempt)
+        if d < self.cap:
+            self.attempt += 1
+        return d / 2 + d / 2 * random.getrandbits(16) / 65536
+
+
+class Registration:
+    def __init__(self, http, headers=b"", wait=LONG_POLL, backoff=None):
+        self.http = http
+        self.headers = headers
+        self.wait = wait
+        self.backoff = backoff or Backoff()
+        self.path = "%s?wait=%d" % (REGISTRATION_PATH, wait)
+        self.held = False        # la última consulta fue retenida por el servidor
+        self.polls = 0
+
+    async def poll(self):
+        """
+        "ok" si el dispositivo ya está reclamado, "no_registrado",
+        "unsupported" (backend sin la ruta), "http_<código>" o "net_err".
+        """
+        self.held = False
+        self.polls += 1
+        try:
+            code = await self.http.request("GET", self.path, headers=self.headers,
+                                           timeout=self.wait + MARGIN)
+        except Exception:                # red caída, timeout o respuesta inválida
+            return "net_err"
+        if code == 404:
+            return "unsupported"
+        if code != 200:
+            return "http_%d" % code
+        try:
+            body = self.http.json()
+        except ValueError:
+            return "http_200"
+        status = body.get("status", "unknown")
+        if status == "ok":
+            self.backoff.reset()
+        self.held = (body.get("wait") or 0) > 0
+        return status
+
+    def pause(self, status):
+        """Segundos a esperar antes de la siguiente consulta tras `status`."""
+        if status == "no_registrado" and self.held:
+            self.backoff.reset()
+            return 0
+        return self.backoff.next()
+
+
+_code_layout = None
+
+
+def show_code(screen, code, width=128):
+    """Código del dispositivo en dos líneas centradas (aura.screen)"""
+    global _code_layout
+    half = len(code) // 2
+    if _code_layout is None:     # el mismo layout siempre: sin borrar la pantalla
+        x = (width - half * 4) // 2
+        _code_layout = (("c0", x, 18, half), ("c1", x, 34, len(code) - half))
+    screen.lines(_code_layout, (code[:half], code[half:]))
+    screen.flush()
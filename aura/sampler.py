@@ -0,0 +1,207 @@
+"""
+aura.sampler – ráfagas de ADC a ritmo fijo para micrófonos analógicos
+---------------------------------------------------------------------
+Plan B cuando no hay micrófono I2S (MAX4466, MAX9814... en GP26). Antes
+se promediaban 10 read_u16(): eso mide la tensión de reposo, no sonido.
+AdcSampler captura una ráfaga de BURST muestras a ritmo fijo en un
+array('H') preasignado:
+
+- con rp2.DMA (MicroPython >= 1.21 en RP2040): el ADC en modo libre
+  llena su FIFO al ritmo de su divisor de reloj y un canal DMA la vacía
+  en el array, sin CPU ni fluctuación de tiempo;
+- si no, un bucle con espera activa sobre ticks_us (ritmo menor).
+
+process() quita la continua con una media móvil exponencial (Q8, se
+conserva entre ráfagas) y deja el resultado como PCM int16 en un
+bytearray: así pasa por el mismo LevelMeter y LoudnessMeter que el I2S
+y da RMS, pico a pico y dBA comparables (la escala es la del ADC:
+0–3,3 V -> ±32768).
+
+Con start_core1() las ráfagas se capturan sin pausa en el segundo núcleo
+(_thread) y leq() devuelve los dBA equivalentes de todas las ráfagas
+desde la llamada anterior, como AudioCapture.snapshot() con el I2S.
+"""
+
+import time
+from array import array
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+from aura.level import LevelMeter
+from aura.loudness import LoudnessMeter
+
+try:
+    import rp2
+    from machine import mem32
+    _DMA = rp2.DMA
+except (ImportError, AttributeError):
+    _DMA = None
+
+BURST = 2048             # muestras por ráfaga
+RATE_DMA = 16000         # Hz con DMA (el filtro A está diseñado a 16 kHz)
+RATE_LOOP = 8000         # Hz con el bucle temporizado
+MEAN_SHIFT = 10          # constante de la media móvil: 2^10 muestras
+
+# Registros del ADC del RP2040 (datasheet §4.9.6)
+ADC_BASE = 0x4004C000
+ADC_CS = ADC_BASE + 0x00
+ADC_FCS = ADC_BASE + 0x08
+ADC_FIFO = ADC_BASE + 0x0C
+ADC_DIV = ADC_BASE + 0x10
+CS_EN = 1
+CS_START_MANY = 1 << 3
+FCS_EN = 1
+FCS_DREQ_EN = 1 << 3
+FCS_EMPTY = 1 << 8
+FCS_THRESH_1 = 1 << 24
+DREQ_ADC = 36
+ADC_CLOCK = 48000000
+
+
+class AdcSampler:
+    def __init__(self, adc, channel=0, n=BURST, use_dma=True):
+        self.adc = adc
+        self.channel = channel           # AINSEL: GP26 = 0, GP27 = 1, GP28 = 2
+        self.raw = array("H", [0] * n)
+        self.pcm = bytearray(2 * n)
+        self.meter = LevelMeter(self.pcm)
+        self.dma = None
+        if use_dma and _DMA is not None:
+            try:
+                self.dma = _DMA()
+            except Exception:            # sin canales DMA libres
+                self.dma = None
+        self.rate = RATE_DMA if self.dma is not None else RATE_LOOP
+        self.loudness = LoudnessMeter(rate=self.rate)
+        self.mean = -1                   # continua en Q8 (u16); -1 = sin estimar
+        self.p2p = 0                     # pico a pico de la última ráfaga (int16)
+        self.actual_rate = 0             # Hz medidos en la última ráfaga
+        self.running = False             # ráfagas continuas en el núcleo 1
+        self._lock = None
+        self._energy = 0.0               # suma de medias de cuadrados A (núcleo 1)
+        self._bursts = 0
+
+    # -------- Captura ----------------------------------------------------
+    def _capture_dma(self):
+        n = len(self.raw)
+        mem32[ADC_DIV] = (ADC_CLOCK // self.rate - 1) << 8      # parte entera del divisor
+        mem32[ADC_FCS] = FCS_EN | FCS_DREQ_EN | FCS_THRESH_1
+        mem32[ADC_CS] = CS_EN | (self.channel << 12)
+        dma = self.dma
+        dma.config(read=ADC_FIFO, write=self.raw, count=n,
+                   ctrl=dma.pack_ctrl(size=1, inc_read=False, treq_sel=DREQ_ADC),
+                   trigger=True)
+        t0 = time.ticks_us()
+        mem32[ADC_CS] = CS_EN | (self.channel << 12) | CS_START_MANY
+        while dma.active():
+            pass
+        mem32[ADC_CS] = CS_EN | (self.channel << 12)
+        elapsed = time.ticks_diff(time.ticks_us(), t0)
+        while not mem32[ADC_FCS] & FCS_EMPTY:
+            mem32[ADC_FIFO]              # vaciar la FIFO
+        mem32[ADC_FCS] = 0
+        # La FIFO da 12 bits: a la escala de read_u16
+        raw = self.raw
+        for i in range(n):
+            raw[i] <<= 4
+        return elapsed
+
+    def _capture_loop(self):
+        raw = self.raw
+        read = self.adc.read_u16
+        ticks_us = time.ticks_us
+        ticks_diff = time.ticks_diff
+        period = 1000000 // self.rate
+        t0 = ticks_us()
+        due = t0
+        for i in range(len(raw)):
+            while ticks_diff(ticks_us(), due) < 0:
+                pass
+            raw[i] = read()
+            due += period
+        return ticks_diff(ticks_us(), t0)
+
+    def capture(self):
+        """Captura una ráfaga en self.raw; devuelve el número de muestras."""
+        elapsed = self._capture_dma() if self.dma is not None else self._capture_loop()
+        n = len(self.raw)
+        self.actual_rate = n * 1000000 // elapsed if elapsed > 0 else self.rate
+        return n
+
+    # -------- Procesado --------------------------------------------------
+    def process(self):
+        """
+        Quita la continua y escribe PCM int16 en self.pcm; mide RMS y
+        pico a pico. Devuelve el RMS (unidades int16, como LevelMeter).
+        """
+        raw = self.raw
+        pcm = self.pcm
+        n = len(raw)
+        m = self.mean
+        if m < 0:
+            acc = 0
+            for i in range(n):
+                acc += raw[i]
+            m = (acc << 8) // n
+        lo = 32767
+        hi = -32768
+        for i in range(n):
+            x = raw[i]
+            m += ((x << 8) - m) >> MEAN_SHIFT
+            d = x - (m >> 8)
+            if d > 32767:
+                d = 32767
+            elif d < -32768:
+                d = -32768
+            if d > hi:
+                hi = d
+            if d < lo:
+                lo = d
+            pcm[2 * i] = d & 0xFF
+            pcm[2 * i + 1] = (d >> 8) & 0xFF
+        self.mean = m
+        self.p2p = hi - lo
+        self.loudness.reset()            # ráfagas no contiguas: sin estado previo
+        self.loudness.process(pcm, 2 * n)
+        return self.meter.measure(2 * n)
+
+    def read(self):
+        """Captura y procesa una ráfaga; devuelve el RMS."""
+        self.capture()
+        return self.process()
+
+    def dba(self):
+        """dBA calibrados de la última ráfaga (aura.loudness)."""
+        return self.loudness.dba()
+
+    # -------- Segundo núcleo ---------------------------------------------
+    def start_core1(self):
+        """Ráfagas continuas en el segundo núcleo; False si no hay _thread."""
+        if _thread is None:
+            return False
+        self._lock = _thread.allocate_lock()
+        self.running = True
+        _thread.start_new_thread(self._core1_loop, ())
+        return True
+
+    def _core1_loop(self):
+        while self.running:
+            self.read()
+            ms = self.loudness.mean_square
+            with self._lock:
+                self._energy += ms
+                self._bursts += 1
+
+    def stop(self):
+        self.running = False
+
+    def leq(self):
+        """dBA equivalentes de las ráfagas desde la última llamada (núcleo 1)."""
+        with self._lock:
+            energy, n = self._energy, self._bursts
+            self._energy = 0.0
+            self._bursts = 0
+        return self.loudness.dba(energy / n) if n else self.loudness.dba()
@@ -0,0 +1,126 @@
+"""
+aura.sched – trabajos periódicos con plazos absolutos en ticks_ms
+-----------------------------------------------------------------
+`await asyncio.sleep(periodo)` tras el trabajo hace que cada ciclo dure
+el periodo más lo que tarde el trabajo: las muestras se retrasan y los
+timestamps derivan. Scheduler guarda para cada trabajo su próximo plazo
+absoluto y lo adelanta un periodo exacto (ticks_add) tras ejecutarlo, de
+modo que el ritmo no depende de la duración del trabajo.
+
+Un solo bucle (run) atiende todos los trabajos, cada uno a su ritmo
+(muestreo, LED, gc, envío, config). Los trabajos síncronos se ejecutan
+en el bucle; los asíncronos (red) se lanzan como tarea y no retienen a
+los demás; si al vencer el siguiente plazo la tarea anterior sigue en
+curso, no se relanza.
+
+Retrasos: si un trabajo se ejecuta un periodo completo o más tarde de su
+plazo (o su tarea sigue en curso), cuenta como overrun y los periodos
+perdidos se saltan en lugar de encadenarse; take_overruns() los entrega
+para el bloque de salud del envío (aura.probe).
+"""
+
+import time
+from array import array
+
+import uasyncio as asyncio
+
+
+class Scheduler:
+    def __init__(self):
+        self.names = []
+        self.funcs = []
+        self.tasks = []              # tarea en curso (trabajos asíncronos) o None
+        self.is_async = []
+        self.period = array("i")     # ms
+        self.due = array("i")        # ticks_ms del próximo plazo
+        self.overruns = array("i")   # periodos perdidos o relanzamientos omitidos
+        self.late_max = array("i")   # mayor retraso (ms) sobre el plazo
+        self.running = False
+
+    def every(self, ms, func, name, is_async=False, delay=None):
+        """
+        Ejecuta func() cada `ms`; el primer plazo es dentro de `delay` ms
+        (por defecto un periodo). Con is_async, func() devuelve una
+        corrutina que se lanza como tarea. Devuelve el índice del trabajo.
+        """
+        self.names.append(name)
+        self.funcs.append(func)
+        self.tasks.append(None)
+        self.is_async.append(is_async)
+        self.period.append(ms)
+        self.due.append(time.ticks_add(time.ticks_ms(), ms if delay is None else delay))
+        self.overruns.append(0)
+        self.late_max.append(0)
+        return len(self.names) - 1
+
+    def set_period(self, job, ms):
+        """Cambia el periodo de un trabajo a partir de su próximo plazo."""
+        self.period[job] = ms
+
+    def trigger(self, job, delay=0):
+        """
+        Pone el plazo de un trabajo dentro de `delay` ms (por defecto ahora:
+        corre en la próxima vuelta del bucle); después sigue su periodo.
+        """
+        self.due[job] = time.ticks_add(time.ticks_ms(), delay)
+
+    def _fire(self, i):
+        period = self.period[i]
+        late = time.ticks_diff(time.ticks_ms(), self.due[i])
+        if late > self.late_max[i]:
+            self.late_max[i] = late
+        if late >= period:
+            # Se ha perdido al menos un plazo: saltarlo, no encadenar ciclos
+            missed = late // period
+            self.overruns[i] += missed
+            self.due[i] = time.ticks_add(self.due[i], (missed + 1) * period)
+            print("sched:", self.names[i], "con", late, "ms de retraso")
+        else:
+            self.due[i] = time.ticks_add(self.due[i], period)
+        if self.is_async[i]:
+            task = self.tasks[i]
+            if task is not None and not task.done():
+                self.overruns[i] += 1          # la ejecución anterior sigue en curso
+                return
+            self.tasks[i] = asyncio.create_task(self.funcs[i]())
+            return
+        try:
+            self.funcs[i]()
+        except Exception as e:
+            print("sched:", self.names[i], "error:", e)
+
+    async def run(self):
+        """Bucle de plazos: duerme hasta el más próximo y lo ejecuta."""
+        self.running = True
+        due = self.due
+        while self.running:
+            now = time.ticks_ms()
+            nxt = -1
+            wait = 0
+            for i in range(len(due)):
+                d = time.ticks_diff(due[i], now)
+                if nxt < 0 or d < wait:
+                    nxt = i
+                    wait = d
+            if nxt < 0:
+                await asyncio.sleep_ms(1000)
+            elif wait > 0:
+                await asyncio.sleep_ms(wait)
+            else:
+                self._fire(nxt)
+                await asyncio.sleep_ms(0)      # ceder entre trabajos vencidos
+
+    def stop(self):
+        self.running = False
+
+    def take_overruns(self):
+        """{trabajo: [overruns, retraso máx. ms]} desde la llamada anterior, o None."""
+        out = None
+        for i in range(len(self.names)):
+            if self.overruns[i]:
+                if out is None:
+                    out = {}
+                out[self.names[i]] = [self.overruns[i], self.late_max[i]]
+            self.overruns[i] = 0
+            self.late_max[i] = 0
+        return out
@@ -0,0 +1,142 @@
+"""
+aura.screen – refresco parcial de la OLED SSD1306
+-------------------------------------------------
+En vez de fill(0) + show() (1 KB por I2C en cada cambio), la pantalla se
+describe como un layout de campos de texto. set() solo redibuja un campo
+si su texto cambia y marca las páginas de 8 px que toca; flush() envía
+por I2C únicamente esas páginas, y solo las columnas de los caracteres
+que han cambiado. La ventana de direcciones de cada página se envía en
+una sola transacción I2C (el driver manda un comando por transacción).
+
+flush() aplica además un límite de refrescos por segundo: si se llama
+demasiado pronto no transfiere nada y los cambios se acumulan hasta el
+siguiente flush() (run() lo hace en segundo plano), de modo que una
+ráfaga de mensajes de estado se convierte en un único refresco.
+"""
+
+import time
+from array import array
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+SET_COL_ADDR = 0x21
+SET_PAGE_ADDR = 0x22
+CHAR_W = 8
+
+
+class Screen:
+    def __init__(self, display, min_interval_ms=200):
+        self.d = display
+        self.pages = display.height // 8
+        self.col_offset = (128 - display.width) // 2 if display.width != 128 else 0
+        self.min_interval_ms = min_interval_ms
+        self.layout_spec = None
+        self.fields = {}                  # nombre -> [x, y, ancho_px, texto]
+        self.x0 = array("B", [255] * self.pages)   # columnas sucias por página
+        self.x1 = array("B", [0] * self.pages)
+        self.dirty = False
+        self.last_ms = time.ticks_add(time.ticks_ms(), -min_interval_ms)
+        # Ventana col/página en un solo envío (byte de control 0x00 = comandos)
+        self.window = bytearray((0x00, SET_COL_ADDR, 0, 0, SET_PAGE_ADDR, 0, 0))
+        self.i2c = getattr(display, "i2c", None)
+        self.frames = 0
+        self.page_writes = 0
+
+    # -------- Layout y campos -------------------------------------------
+    def layout(self, spec):
+        """
+        Activa un layout: tupla de (nombre, x, y, caracteres). Si ya es el
+        layout actual no hace nada; si cambia, borra la pantalla entera.
+        """
+        if spec is self.layout_spec:
+            return
+        self.layout_spec = spec
+        self.fields = {}
+        for name, x, y, chars in spec:
+            self.fields[name] = [x, y, chars * CHAR_W, ""]
+        self.d.fill(0)
+        self._mark(0, 0, self.d.width, self.d.height)
+
+    def set(self, name, text):
+        """Actualiza el texto de un campo; no hace nada si no ha cambiado."""
+        f = self.fields[name]
+        if f[3] == text:
+            return
+        x, y, w = f[0], f[1], f[2]
+        old = f[3]
+        self.d.fill_rect(x, y, w, 8, 0)
+        self.d.text(text if len(text) * CHAR_W <= w else text[:w // CHAR_W], x, y)
+        f[3] = text
+        # Solo se marcan las columnas entre el primer y el último carácter distinto
+        n = min(len(old), len(text))
+        a = 0
+        while a < n and old[a] == text[a]:
+            a += 1
+        b = max(len(old), len(text))
+        if len(old) == len(text):
+            while b > a and old[b - 1] == text[b - 1]:
+                b -= 1
+        self._mark(x + a * CHAR_W, y, min(w - a * CHAR_W, (b - a) * CHAR_W), 8)
+
+    def lines(self, spec, texts):
+        """Rellena en orden los campos de un layout con una lista de textos."""
+        self.layout(spec)
+        for i in range(len(spec)):
+            self.set(spec[i][0], texts[i] if i < len(texts) else "")
+
+    def _mark(self, x, y, w, h):
+        x_end = min(self.d.width, x + w) - 1
+        if x_end < x:
+            return
+        for p in range(y // 8, min(self.pages, (y + h + 7) // 8)):
+            if x < self.x0[p]:
+                self.x0[p] = x
+            if x_end > self.x1[p]:
+                self.x1[p] = x_end
+        self.dirty = True
+
+    # -------- Transferencia ---------------------------------------------
+    def flush(self, force=False):
+        """Envía las páginas modificadas. Devuelve True si ha transferido algo."""
+        if not self.dirty:
+            return False
+        now = time.ticks_ms()
+        if not force and time.ticks_diff(now, self.last_ms) < self.min_interval_ms:
+            return False
+        d = self.d
+        buf = memoryview(d.buffer)
+        w = d.width
+        for p in range(self.pages):
+            x0 = self.x0[p]
+            if x0 == 255:
+                continue
+            x1 = self.x1[p]
+            self._window(x0 + self.col_offset, x1 + self.col_offset, p)
+            d.write_data(buf[p * w + x0:p * w + x1 + 1])
+            self.x0[p] = 255
+            self.x1[p] = 0
+            self.page_writes += 1
+        self.dirty = False
+        self.last_ms = now
+        self.frames += 1
+        return True
+
+    def _window(self, x0, x1, page):
+        if self.i2c is None:
+            for c in (SET_COL_ADDR, x0, x1, SET_PAGE_ADDR, page, page):
+                self.d.write_cmd(c)
+            return
+        win = self.window
+        win[2] = x0
+        win[3] = x1
+        win[5] = win[6] = page
+        self.i2c.writeto(self.d.addr, win)
+
+    async def run(self):
+        """Tarea de fondo: envía los cambios pendientes respetando el límite."""
+        while True:
+            self.flush()
+            await asyncio.sleep_ms(self.min_interval_ms)
@@ -0,0 +1,33 @@
+"""
+aura.sim – modelo de sensores simulados (paseo aleatorio)
+---------------------------------------------------------
+El mismo modelo que usa raspberry_defsim.py con SIMULATE = True y que
+tools/loadgen.py instancia miles de veces: temperatura, humedad y dB
+se mueven un paso aleatorio acotado en cada lectura.
+"""
+
+try:
+    import random
+except ImportError:
+    import urandom as random
+
+T_RANGE = (22.30, 22.40)
+H_RANGE = (39.0, 45.0)
+DB_RANGE = (30.0, 45.0)
+
+
+class SensorWalk:
+    def __init__(self, t=22.35, h=42.0, db=37.0, rng=random):
+        self.t = t
+        self.h = h
+        self.db = db
+        self.rng = rng
+
+    def step(self):
+        """Devuelve (t, h, db, nivel) redondeados como los da el dispositivo."""
+        u = self.rng.uniform
+        self.t = max(T_RANGE[0], min(T_RANGE[1], self.t + u(-0.02, 0.02)))
+        self.h = max(H_RANGE[0], min(H_RANGE[1], self.h + u(-0.4, 0.4)))
+        self.db = max(DB_RANGE[0], min(DB_RANGE[1], self.db + u(-1, 1)))
+        lvl = (self.db - 30) / 15
+        return round(self.t, 1), round(self.h, 1), round(self.db, 1), lvl
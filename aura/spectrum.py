@@ -0,0 +1,214 @@
+"""
+aura.spectrum – rasgos espectrales en coma fija sobre el buffer I2S
+-------------------------------------------------------------------
+El RMS de banda ancha no distingue una discusión de un proyector que
+zumba. SpectrumAnalyzer calcula, sobre el mismo bloque PCM int16 de
+100 ms que mide aura.level:
+
+    low     fracción de energía 50–250 Hz (zumbido, climatización)
+    speech  fracción de energía 300–3400 Hz (voz)
+    high    fracción de energía 4–8 kHz (ruido, golpes, sibilantes)
+    flat    planitud espectral (media geométrica / aritmética): ~1 ruido,
+            ~0 tonal
+    zcr     cruces por cero por muestra
+
+FFT radix 2 de 256 puntos (62,5 Hz por bin) en coma fija: entrada con
+ventana de Hann en Q15, factores de giro en Q15 y escalado >> 1 por etapa,
+así ningún producto pasa de 31 bits (válido también en viper). Se
+analizan `frames` tramos repartidos por el bloque y se suman las
+potencias; todo el estado (tablas, re/im, potencias, rasgos) se crea en
+__init__. La planitud usa log2 entero (Q8); solo las cinco divisiones
+finales son de coma flotante.
+
+Como aura.level, se elige la implementación al importar: viper
+(aura._spectrum_viper) en MicroPython con emisor nativo o Python puro.
+"""
+
+import math
+from array import array
+
+try:
+    from aura._spectrum_viper import load as _load_viper, fft as _fft_viper, \
+        power as _power_viper, crossings as _crossings_viper
+except (ImportError, SyntaxError):
+    _load_viper = None
+
+RATE = 16000
+FFT_BITS = 8
+FRAMES = 2               # tramos de FFT por bloque
+
+# Índices de los rasgos en SpectrumAnalyzer.features
+LOW, SPEECH, HIGH, FLAT, ZCR = range(5)
+NFEAT = 5
+FEATURES = ("low", "speech", "high", "flat", "zcr")
+
+# Bandas [desde, hasta) en Hz de LOW, SPEECH y HIGH
+BANDS = ((50, 250), (300, 3400), (4000, 8000))
+
+NAN = float("nan")
+
+# log2(1 + (i + 0.5) / 16) en Q8
+_LOG_FRAC = bytes(int(256 * math.log(1 + (i + 0.5) / 16) / math.log(2) + 0.5)
+                  for i in range(16))
+
+
+def _log2_q8(x):
+    """log2(x) en Q8 para x entero > 0 (error < 0,05)."""
+    e = 8
+    while x >= 512:
+        x >>= 1
+        e += 1
+    while x < 256:
+        x <<= 1
+        e -= 1
+    return (e << 8) + _LOG_FRAC[(x - 256) >> 4]
+
+
+# -------- Núcleo en Python puro (mismos resultados que la versión viper) --
+def _load(buf, off, re, im, win, rev, n, shift):
+    """Copia n muestras desde off con ventana, en orden de bits invertido."""
+    for i in range(n):
+        k = 2 * (off + i)
+        s = buf[k] | (buf[k + 1] << 8)
+        if s & 0x8000:
+            s -= 0x10000
+        j = rev[i]
+        re[j] = ((s << shift) * win[i]) >> 15
+        im[j] = 0
+    return n
+
+
+def _fft(re, im, cos_t, sin_t, bits):
+    """FFT in situ (diezmado en tiempo), escalada por 1/n."""
+    n = 1 << bits
+    half = 1
+    step = n >> 1
+    while half < n:
+        span = half << 1
+        for j in range(half):
+            wc = cos_t[j * step]
+            ws = sin_t[j * step]
+            for i in range(j, n, span):
+                m = i + half
+                tr = (re[m] * wc + im[m] * ws) >> 15
+                ti = (im[m] * wc - re[m] * ws) >> 15
+                a = re[i]
+                b = im[i]
+                re[m] = (a - tr) >> 1
+                im[m] = (b - ti) >> 1
+                re[i] = (a + tr) >> 1
+                im[i] = (b + ti) >> 1
+        half = span
+        step >>= 1
+    return n
+
+
+def _power(re, im, acc, n):
+    """acc[k] += |X[k]|^2 >> 8 para k < n."""
+    for k in range(n):
+        r = re[k]
+        q = im[k]
+        acc[k] += (r * r + q * q) >> 8
+    return n
+
+
+def _crossings(buf, n):
+    """Cambios de signo entre muestras consecutivas de las n primeras."""
+    c = 0
+    prev = buf[1] & 0x80
+    for i in range(3, 2 * n, 2):
+        s = buf[i] & 0x80
+        if s != prev:
+            c += 1
+            prev = s
+    return c
+
+
+if _load_viper is not None:
+    _load, _fft, _power, _crossings = _load_viper, _fft_viper, _power_viper, _crossings_viper
+
+
+class SpectrumAnalyzer:
+    """
+    Rasgos espectrales de un bloque PCM int16. Tras analyze() quedan en
+    self.features (array('d') indexado por LOW, SPEECH, HIGH, FLAT, ZCR);
+    NaN si el bloque es silencio digital.
+    """
+
+    def __init__(self, frames=FRAMES, bits=FFT_BITS, rate=RATE):
+        n = 1 << bits
+        self.n = n
+        self.bits = bits
+        self.frames = frames
+        self.re = array("i", [0] * n)
+        self.im = array("i", [0] * n)
+        self.acc = array("I", [0] * (n >> 1))
+        self.features = array("d", [NAN] * NFEAT)
+        # Tablas: giro e^{-2πik/n} y ventana de Hann en Q15, bits invertidos
+        self.cos = array("i", [int(round(32767 * math.cos(2 * math.pi * k / n)))
+                               for k in range(n >> 1)])
+        self.sin = array("i", [int(round(32767 * math.sin(2 * math.pi * k / n)))
+                               for k in range(n >> 1)])
+        self.win = array("H", [int(round(32767 * (0.5 - 0.5 * math.cos(2 * math.pi * i / n))))
+                               for i in range(n)])
+        self.rev = array("H", [0] * n)
+        for i in range(n):
+            r = 0
+            for b in range(bits):
+                r |= ((i >> b) & 1) << (bits - 1 - b)
+            self.rev[i] = r
+        # Bins [desde, hasta) de cada banda; el bin 0 (continua) no cuenta
+        self.bands = array("H")
+        for lo, hi in BANDS:
+            self.bands.append(max(1, (lo * n + rate - 1) // rate))
+            self.bands.append(min(n >> 1, hi * n // rate))
+
+    def analyze(self, buf, nbytes, peak=0):
+        """
+        Calcula los rasgos de los primeros nbytes de buf. `peak` (el
+        LevelMeter.peak del mismo bloque) permite normalizar la entrada al
+        rango completo antes de la FFT; sin él se usa tal cual.
+        """
+        feats = self.features
+        count = nbytes >> 1
+        n = self.n
+        if count < n:
+            return feats
+        shift = 0
+        if peak:
+            while (peak << (shift + 1)) < 32768 and shift < 15:
+                shift += 1
+        acc = self.acc
+        half = n >> 1
+        for k in range(half):
+            acc[k] = 0
+        frames = self.frames
+        for f in range(frames):
+            off = f * (count - n) // (frames - 1) if frames > 1 else 0
+            _load(buf, off, self.re, self.im, self.win, self.rev, n, shift)
+            _fft(self.re, self.im, self.cos, self.sin, self.bits)
+            _power(self.re, self.im, acc, half)
+
+        total = 0
+        logsum = 0
+        for k in range(1, half):
+            p = acc[k]
+            total += p
+            logsum += _log2_q8(p + 1)
+        zcr = _crossings(buf, count) / (count - 1)
+        if not total:
+            for i in range(NFEAT):
+                feats[i] = NAN
+            feats[ZCR] = zcr
+            return feats
+        bands = self.bands
+        for b in range(3):
+            e = 0
+            for k in range(bands[2 * b], bands[2 * b + 1]):
+                e += acc[k]
+            feats[b] = e / total
+        bins = half - 1
+        # log2(geo) - log2(arit) = media de log2(p) - log2(total / bins)
+        feats[FLAT] = min(1.0, 2 ** ((logsum / bins - _log2_q8(total // bins + 1)) / 256))
+        feats[ZCR] = zcr
+        return feats
@@ -0,0 +1,229 @@
+"""
+aura.spool – cola persistente en flash (store-and-forward)
+----------------------------------------------------------
+Cuando un envío falla, las lecturas se guardan en flash como registros
+binarios de tamaño fijo y se reenvían en lotes, de la más antigua a la
+más reciente, cuando vuelve la conexión. Sobrevive a machine.reset().
+
+Almacenamiento: BLOCKS ficheros spool/b<i>.bin usados en anillo. Se
+escribe siempre al final del bloque actual; al llenarse se pasa al
+siguiente (repartiendo el desgaste de la flash) y, si el anillo está
+completo, se borra el bloque más antiguo. El último número de secuencia
+confirmado por el servidor se guarda en spool/ack (4 bytes).
+
+Cada registro es el de aura.codec (seq, ts, estado, temperatura,
+humedad, dB y nivel, empaquetados con codec.pack_into) seguido de TAIL:
+flags, lecturas omitidas antes (suppressed) y la medición. El ts sale
+de codec.unix_now(): 0 si el reloj aún no está en hora, y entonces el
+reenvío va sin "ts" y el backend le pone la hora de llegada. El resumen
+de la ventana (stats) no se guarda: es de tamaño variable y solo viaja
+con el envío en directo.
+
+La RAM usada es fija (un buffer de `batch` registros y dos arrays de
+BLOCKS elementos) sea cual sea el tamaño del atasco.
+"""
+
+import os
+import struct
+import time
+from array import array
+
+from aura import codec
+from aura.states import state_name
+
+# Tras el registro de aura.codec: flags, suppressed, medición
+TAIL = "<BHi"
+RECORD_SIZE = codec.RECORD_SIZE + struct.calcsize(TAIL)   # 25 bytes
+
+FLAG_INT = 0x01          # medición entera (sin escalar)
+SCALE = 10000            # mediciones reales: fijo con 4 decimales
+
+
+class Spool:
+    def __init__(self, path="spool", blocks=8, block_records=256, batch=16):
+        self.path = path
+        self.blocks = blocks
+        self.per_block = block_records
+        self.batch = batch
+        self.buf = bytearray(RECORD_SIZE * batch)
+        self.view = memoryview(self.buf)
+        self.first = array("I", [0] * blocks)    # seq del primer registro de cada bloque
+        self.counts = array("H", [0] * blocks)   # registros completos por bloque
+        self.head = 0
+        self.next_seq = 1
+        self.acked = 0
+        self.loaded = 0          # registros en self.buf tras read_batch()
+        self.dropped = 0         # registros perdidos por rotación con el anillo lleno
+        try:
+            os.mkdir(path)
+        except OSError:
+            pass
+        self._scan()
+
+    # -------- Ficheros -------------------------------------------------
+    def _block(self, i):
+        return "%s/b%d.bin" % (self.path, i)
+
+    def _remove(self, i):
+        try:
+            os.remove(self._block(i))
+        except OSError:
+            pass
+        self.counts[i] = 0
+
+    def _scan(self):
+        """Reconstruye el estado a partir de los ficheros tras un reinicio."""
+        try:
+            with open(self.path + "/ack", "rb") as f:
+                self.acked = struct.unpack("<I", f.read(4))[0]
+        except (OSError, struct.error):
+            self.acked = 0
+        best = -1
+        partial = False
+        for i in range(self.blocks):
+            try:
+                size = os.stat(self._block(i))[6]
+            except OSError:
+                continue
+            n = min(size // RECORD_SIZE, self.per_block)
+            if not n:
+                self._remove(i)
+                continue
+            with open(self._block(i), "rb") as f:
+                f.readinto(self.view[:RECORD_SIZE])
+            if self.buf[0] != codec.VERSION:
+                self._remove(i)          # otro formato de registro
+                continue
+            self.counts[i] = n
+            self.first[i] = codec.unpack_from(self.buf)[0]
+            if self.first[i] > best:
+                best = self.first[i]
+                self.head = i
+                partial = size != n * RECORD_SIZE
+        if best >= 0:
+            self.next_seq = best + self.counts[self.head]
+            if partial:
+                # Escritura cortada por un reinicio: no se añade tras bytes sueltos
+                self._rotate()
+        # Con todo confirmado y borrado, la secuencia sigue tras el último ack
+        if self.next_seq <= self.acked:
+            self.next_seq = self.acked + 1
+
+    def _rotate(self):
+        self.head = (self.head + 1) % self.blocks
+        if self.counts[self.head]:
+            last = self.first[self.head] + self.counts[self.head] - 1
+            if last > self.acked:
+                self.dropped += last - max(self.acked, self.first[self.head] - 1)
+            self._remove(self.head)
+
+    # -------- Escritura ------------------------------------------------
+    def append(self, ts, temp, hum, level, db, state, measurement, suppressed=0):
+        """Guarda una lectura (ts en segundos Unix, 0 si no se conoce)."""
+        if self.counts[self.head] >= self.per_block:
+            self._rotate()
+        if isinstance(measurement, int):
+            flags, value = FLAG_INT, measurement
+        else:
+            flags, value = 0, int(round(measurement * SCALE))
+        pos = codec.pack_into(self.buf, 0, self.next_seq, ts, state, temp, hum, db, level)
+        struct.pack_into(TAIL, self.buf, pos, flags, min(suppressed, 0xFFFF), value)
+        with open(self._block(self.head), "ab") as f:
+            f.write(self.view[:RECORD_SIZE])
+        if not self.counts[self.head]:
+            self.first[self.head] = self.next_seq
+        self.counts[self.head] += 1
+        self.next_seq += 1
+
+    def store_batch(self, batch):
+        """
+        Pasa a flash las lecturas de un MeasurementBatch, quitándolas del lote
+        a medida que se guardan: si una escritura falla (OSError) en el lote
+        quedan solo las que faltan, y reintentarlo no duplica las ya guardadas.
+        Sin el reloj en hora se guardan con ts 0; stats no se guarda.
+        """
+        now_ms = time.ticks_ms()
+        now_s = codec.unix_now()
+        while batch.count:
+            i = batch.start
+            ts = 0
+            if now_s:
+                ts = now_s - time.ticks_diff(now_ms, batch.ticks[i]) // 1000
+            self.append(ts, batch.temps[i], batch.hums[i], batch.levels[i],
+                        batch.dbs[i], batch.state_index(i), batch.values[i],
+                        batch.suppressed[i])
+            batch.drop(1)
+
+    # -------- Reenvío --------------------------------------------------
+    def pending(self):
+        """Registros guardados aún no confirmados."""
+        oldest = self.next_seq
+        for i in range(self.blocks):
+            if self.counts[i] and self.first[i] < oldest:
+                oldest = self.first[i]
+        return self.next_seq - max(oldest, self.acked + 1)
+
+    def read_batch(self):
+        """Carga en self.buf hasta `batch` registros sin confirmar; devuelve cuántos."""
+        n = 0
+        want = self.acked + 1
+        for k in range(1, self.blocks + 1):
+            i = (self.head + k) % self.blocks
+            c = self.counts[i]
+            if not c or self.first[i] + c <= want:
+                continue
+            skip = want - self.first[i] if want > self.first[i] else 0
+            take = min(c - skip, self.batch - n)
+            with open(self._block(i), "rb") as f:
+                f.seek(skip * RECORD_SIZE)
+                f.readinto(self.view[n * RECORD_SIZE:(n + take) * RECORD_SIZE])
+            n += take
+            want = self.first[i] + skip + take
+            if n == self.batch:
+                break
+        self.loaded = n
+        return n
+
+    def record(self, k):
+        """
+        Decodifica el registro k del último read_batch(): la tupla de
+        codec.unpack_from (seq, ts, estado, t, h, dB, nivel; None sin dato)
+        más flags, suppressed y la medición.
+        """
+        off = k * RECORD_SIZE
+        return (codec.unpack_from(self.buf, off)
+                + struct.unpack_from(TAIL, self.buf, off + codec.RECORD_SIZE))
+
+    def items(self):
+        """Lecturas cargadas como dicts para el envío agrupado (campo ts)."""
+        out = []
+        for k in range(self.loaded):
+            seq, ts, st, t, h, db, lvl, flags, suppressed, value = self.record(k)
+            item = {"measurement": value if flags & FLAG_INT else value / SCALE,
+                    "roomState": state_name(st)}
+            if ts:
+                item["ts"] = ts
+            if suppressed:
+                item["suppressed"] = suppressed
+            if t is not None:
+                item["temperature"] = t
+            if h is not None:
+                item["humidity"] = h
+            if lvl is not None:
+                item["sound"] = lvl
+            if db is not None:
+                item["db"] = db
+            out.append(item)
+        return out
+
+    def ack(self):
+        """Confirma el último read_batch() y libera los bloques ya enviados."""
+        if not self.loaded:
+            return
+        self.acked = self.record(self.loaded - 1)[0]
+        self.loaded = 0
+        with open(self.path + "/ack", "wb") as f:
+            f.write(struct.pack("<I", self.acked))
+        for i in range(self.blocks):
+            if self.counts[i] and self.first[i] + self.counts[i] - 1 <= self.acked:
+                self._remove(i)
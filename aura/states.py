@@ -0,0 +1,47 @@
+"""
+aura.states – índices de los estados emocionales
+------------------------------------------------
+Los registros binarios (spool, códec) guardan el estado como un índice
+pequeño (también aura.classify). El orden no debe cambiar: solo se
+añaden estados nuevos al final.
+"""
+
+STATES = (
+    "Confort",
+    "Incomodidad",
+    "Calma",
+    "Estrés",
+    "Expectativa",
+    "Energía",
+    "Distracción",
+    "Monotonía",
+    "Conflicto",
+)
+
+# Mismos estados sin tildes (pantalla OLED y raspberry_defsim.py)
+STATES_ASCII = (
+    "Confort",
+    "Incomodidad",
+    "Calma",
+    "Estres",
+    "Expectativa",
+    "Energia",
+    "Distraccion",
+    "Monotonia",
+    "Conflicto",
+)
+
+UNKNOWN = 255
+
+
+def state_index(name):
+    """Índice de un estado, con o sin tildes; UNKNOWN si no existe."""
+    for i in range(len(STATES)):
+        if STATES[i] == name or STATES_ASCII[i] == name:
+            return i
+    return UNKNOWN
+
+
+def state_name(index, ascii=False):
+    names = STATES_ASCII if ascii else STATES
+    return names[index] if index < len(names) else "Calma"
@@ -0,0 +1,159 @@
+"""
+aura.stats – agregados en streaming por ventana de reporte
+----------------------------------------------------------
+Los sensores se muestrean más a menudo de lo que se reporta. Cada lectura
+se pliega en un RunningStats (recuento, media y varianza de Welford,
+mínimo, máximo y último valor) con estado fijo en un array('d'): memoria
+O(1) sin listas ni objetos nuevos por muestra. Al cerrar la ventana se
+clasifica con las medias y se envía el resumen como un solo registro.
+
+Las lecturas fallidas (None) no se pliegan; `missed` las cuenta.
+ReportWindow también promedia, si se le piden, los rasgos de sonido de
+aura.spectrum para que el clasificador trabaje con toda la ventana, y
+los niveles equivalentes (dB) de cada muestra: en media energética, no
+aritmética, de modo que leq() es el LAeq de la ventana entera.
+"""
+
+import math
+from array import array
+
+# Posiciones en el array de estado
+N, MEAN, M2, MIN, MAX, LAST = range(6)
+
+
+class RunningStats:
+    def __init__(self):
+        self.s = array("d", [0.0] * 6)
+        self.missed = 0
+        self.reset()
+
+    def reset(self):
+        s = self.s
+        s[N] = 0.0
+        s[MEAN] = 0.0
+        s[M2] = 0.0
+        s[MIN] = math.inf
+        s[MAX] = -math.inf
+        s[LAST] = math.nan
+        self.missed = 0
+
+    def add(self, x):
+        """Pliega una lectura (Welford); None cuenta como lectura perdida."""
+        if x is None:
+            self.missed += 1
+            return
+        s = self.s
+        n = s[N] + 1.0
+        s[N] = n
+        d = x - s[MEAN]
+        s[MEAN] += d / n
+        s[M2] += d * (x - s[MEAN])
+        if x < s[MIN]:
+            s[MIN] = x
+        if x > s[MAX]:
+            s[MAX] = x
+        s[LAST] = x
+
+    @property
+    def count(self):
+        return int(self.s[N])
+
+    @property
+    def mean(self):
+        return self.s[MEAN] if self.s[N] else None
+
+    def variance(self):
+        """Varianza muestral (n - 1); 0 con menos de dos lecturas."""
+        n = self.s[N]
+        return self.s[M2] / (n - 1) if n > 1 else 0.0
+
+    def std(self):
+        return math.sqrt(self.variance())
+
+    def summary(self, ndigits=2):
+        """Dict {n, mean, std, min, max, last} para el envío (None si vacío)."""
+        s = self.s
+        if not s[N]:
+            return None
+        return {"n": int(s[N]), "mean": round(s[MEAN], ndigits),
+                "std": round(self.std(), ndigits), "min": round(s[MIN], ndigits),
+                "max": round(s[MAX], ndigits), "last": round(s[LAST], ndigits)}
+
+
+class ReportWindow:
+    """Temperatura, humedad y sonido de la ventana de reporte actual."""
+
+    def __init__(self, features=0):
+        self.temp = RunningStats()
+        self.hum = RunningStats()
+        self.sound = RunningStats()
+        self.feat = array("d", [0.0] * features)      # sumas de rasgos
+        self.feat_mean = array("d", [0.0] * features)
+        self.feat_n = 0
+        self.energy = 0.0        # suma de 10^(dB/10) de add_level()
+        self.energy_n = 0
+
+    def add(self, temp, hum, sound):
+        self.temp.add(temp)
+        self.hum.add(hum)
+        self.sound.add(sound)
+
+    def add_features(self, features):
+        """Suma un vector de rasgos; None o NaN (sin análisis) no cuentan."""
+        if features is None or features[0] != features[0]:
+            return
+        feat = self.feat
+        for i in range(len(feat)):
+            feat[i] += features[i]
+        self.feat_n += 1
+
+    def add_level(self, db):
+        """Pliega el nivel equivalente (dB) de una muestra; None o NaN no cuentan."""
+        if db is None or db != db:
+            return
+        self.energy += 10 ** (db / 10)
+        self.energy_n += 1
+
+    def reset(self):
+        self.temp.reset()
+        self.hum.reset()
+        self.sound.reset()
+        feat = self.feat
+        for i in range(len(feat)):
+            feat[i] = 0.0
+        self.feat_n = 0
+        self.energy = 0.0
+        self.energy_n = 0
+
+    def means(self):
+        return self.temp.mean, self.hum.mean, self.sound.mean
+
+    def leq(self):
+        """
+        Nivel equivalente de la ventana (dB) o None: media energética de los
+        de cada muestra, que cubren intervalos iguales (SAMPLE_INTERVAL).
+        """
+        if not self.energy_n:
+            return None
+        return 10 * math.log10(self.energy / self.energy_n)
+
+    def feature_means(self):
+        """Medias de los rasgos (array reutilizado) o None si no hubo ninguno."""
+        n = self.feat_n
+        if not n:
+            return None
+        out = self.feat_mean
+        for i in range(len(out)):
+            out[i] = self.feat[i] / n
+        return out
+
+    def summary(self):
+        """Resumen para el campo "stats" del envío agrupado."""
+        out = {}
+        for name, st in (("temp", self.temp), ("hum", self.hum), ("sound", self.sound)):
+            s = st.summary(4 if name == "sound" else 2)
+            if s is not None:
+                if st.missed:
+                    s["missed"] = st.missed
+                out[name] = s
+        return out
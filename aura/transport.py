@@ -0,0 +1,92 @@
+"""
+aura.transport – envío de lotes por HTTP o por MQTT
+---------------------------------------------------
+Los firmwares envían cada lote (aura.batch) y cada reenvío desde flash
+(aura.spool) con transport.send_batch(body), sin saber por dónde va:
+
+- HttpTransport: POST /api/devices/data/batch por la conexión keep-alive
+  de aura.http. Cada envío lleva ~200 B de cabeceras y espera la
+  respuesta del backend (status, configVersion).
+- MqttTransport: publica el mismo cuerpo JSON en aura/<código>/batch por
+  una sesión MQTT persistente (aura.mqtt): 2–5 B de cabecera más el
+  tema; con QoS 1 vuelve al recibir el PUBACK del broker. El backend
+  está suscrito a aura/+/batch (aura-backend/src/mqtt.ts) y no responde
+  por MQTT: la config se sigue revalidando por HTTP (aura.config).
+
+send_batch() devuelve un código al estilo HTTP (200 = aceptado, 0 si no
+hay respuesta) y deja en `reply` el cuerpo de la respuesta como dict y
+en `latency_ms` lo que ha tardado. Los fallos de red se propagan como
+excepciones, igual que con aura.http.
+
+send_alert(body) envía una alerta inmediata (aura.alert) fuera del lote
+y sin esperar a que termine un envío en curso:
+
+- HttpTransport: POST /api/devices/alert por una segunda conexión
+  keep-alive (`alerts`), para no quedar detrás de un lote lento en la
+  misma conexión (HTTP/1.1 no intercala peticiones).
+- MqttTransport: PUBLISH QoS 0 en aura/<código>/alert por la misma
+  sesión. No espera respuesta y aura.mqtt no la hace esperar al PUBACK
+  de un lote en curso, solo a que termine de escribirse el paquete que
+  esté saliendo. Si se pierde, el cambio de estado llega igualmente con
+  el siguiente lote.
+"""
+
+BATCH_PATH = "/api/devices/data/batch"
+ALERT_PATH = "/api/devices/alert"
+
+
+class HttpTransport:
+    name = "http"
+
+    def __init__(self, http, headers=b"", alerts=None):
+        self.http = http
+        self.headers = headers
+        self.alerts = alerts or http     # cliente de las alertas (aura.http)
+        self.reply = {}
+
+    @property
+    def latency_ms(self):
+        return self.http.latency_ms
+
+    async def send_batch(self, body):
+        code = await self.http.request("POST", BATCH_PATH, body=body, headers=self.headers)
+        self.reply = self.http.json() if code == 200 else {}
+        return code
+
+    async def send_alert(self, body):
+        return await self.alerts.request("POST", ALERT_PATH, body=body, headers=self.headers)
+
+    async def keepalive(self):
+        pass
+
+
+class MqttTransport:
+    name = "mqtt"
+
+    def __init__(self, client, code, qos=1):
+        self.client = client
+        self.topic = b"aura/" + code.encode() + b"/batch"
+        self.alert_topic = b"aura/" + code.encode() + b"/alert"
+        self.qos = qos
+        # El broker no contesta como el backend: aceptado = guardado
+        self.reply = {"status": "ok"}
+
+    @property
+    def latency_ms(self):
+        return self.client.latency_ms
+
+    async def send_batch(self, body):
+        if isinstance(body, str):
+            body = body.encode()
+        await self.client.publish(self.topic, body, self.qos)
+        return 200
+
+    async def send_alert(self, body):
+        if isinstance(body, str):
+            body = body.encode()
+        await self.client.publish(self.alert_topic, body, 0)
+        return 200
+
+    async def keepalive(self):
+        """PINGREQ periódico para que el broker no cierre la sesión."""
+        await self.client.ping()
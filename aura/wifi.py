@@ -0,0 +1,35 @@
+"""
+aura.wifi – conexión WiFi sin bloquear y hora por NTP
+-----------------------------------------------------
+connect() activa la interfaz y espera la conexión con asyncio.sleep, de
+modo que la pantalla (aura.screen) y el LED siguen vivos mientras tanto;
+on_wait(intento, máximo) se llama tras cada segundo de espera.
+
+sync_clock() pone en hora el RTC (timestamps de aura.spool y aura.codec);
+ntptime solo se importa aquí.
+"""
+
+import uasyncio as asyncio
+
+
+async def connect(wlan, ssid, password, attempts=20, on_wait=None):
+    """True si hay conexión antes de `attempts` segundos"""
+    wlan.active(True)
+    wlan.connect(ssid, password)
+    for i in range(1, attempts + 1):
+        if wlan.isconnected():
+            return True
+        await asyncio.sleep(1)
+        if on_wait is not None:
+            on_wait(i, attempts)
+    return wlan.isconnected()
+
+
+def sync_clock():
+    try:
+        import ntptime
+        ntptime.settime()
+        return True
+    except Exception as e:
+        print("NTP no disponible:", e)
+        return False
@@ -12,7 +12,10 @@ Librerías necesarias:
 Instrucciones de instalación:
 1. Instalar MicroPython en la Raspberry Pi Pico W
 2. Descargar ssd1306.py y copiarla a la Pico W
-3. Copiar este archivo como main.py en la Pico W
+3. Compilar a bytecode con `python tools/build_mpy.py raspberry` y copiar
+   el contenido de build/raspberry/ (main.py, raspberry.mpy y aura/*.mpy)
+   a la Pico W; sin compilar: copiar el directorio aura/ y este archivo
+   como main.py (la Pico lo compila en cada arranque, más lento y más RAM)
 4. Reiniciar la Pico W
 
 Conexiones de hardware:
@@ -22,16 +25,30 @@ Conexiones de hardware:
 """
 
 import network
-import urequests
 import json
 import time
 import uasyncio as asyncio
-from machine import Pin, I2C, I2S, ADC
+from machine import Pin, I2C
 import dht
 from ssd1306 import SSD1306_I2C  # Importar librería SSD1306
-import struct
-import math
 import gc
+from aura import wifi
+from aura.audio import AudioSensor  # I2S, o ADC si no hay I2S
+from aura.batch import MeasurementBatch
+from aura.http import AsyncHttpClient
+from aura.queue import BoundedQueue
+from aura.spool import Spool
+from aura.screen import Screen
+from aura.classify import Classifier, TEMP, HUM, SOUND
+from aura.alert import EdgeDetector
+from aura.states import state_name
+from aura.policy import ReportPolicy
+from aura.stats import ReportWindow
+from aura.spectrum import NFEAT
+from aura.probe import Probe, READ, AUDIO, CLASSIFY, DISPLAY, PAYLOAD, HTTP
+from aura.sched import Scheduler
+from aura.config import ConfigStore
+from aura.transport import HttpTransport
 
 # ------------------------------------------------------------------------
 # Configuración general
@@ -41,6 +58,23 @@ WIFI_PASSWORD = "HolaHoal"
 SERVER_URL = "http://172.20.10.3:4000"  # Ajusta a la IP de tu servidor
 DEVICE_CODE = "AURA-ABC001"               # Código único del dispositivo
 UPDATE_INTERVAL = 30                      # Segundos entre mediciones
+SAMPLE_INTERVAL = 5                       # Segundos entre muestras agregadas (DHT11: >= 1 s)
+HTTP_TIMEOUT = 10                         # Segundos máximos por petición
+QUEUE_SIZE = 16                           # Mediciones en espera de envío
+DUAL_CORE = False                         # Captura de audio en el segundo núcleo (_thread)
+REPORT_HEALTH = True                      # Tiempos y heap por fase (aura.probe) en cada lote
+PROBE_DUMP = False                        # Imprimir la tabla de aura.probe en cada envío
+CONFIG_REFRESH = 600                      # Segundos entre revalidaciones de la config (sin configRefresh)
+CONFIG_RETRY = 30                         # Segundos hasta reintentar una revalidación fallida
+BINARY_RECORDS = True                     # Temperatura, humedad, dB y nivel en registros binarios (aura.codec)
+TRANSPORT = "http"                        # Envío de lotes: "http" o "mqtt" (aura.transport)
+MQTT_BROKER = "172.20.10.3"               # Broker MQTT (con TRANSPORT = "mqtt")
+MQTT_PORT = 1883
+MQTT_QOS = 1                              # 0: sin confirmación; 1: espera el PUBACK del broker
+MQTT_KEEPALIVE = 60                       # Segundos; se envía PINGREQ cada mitad
+ALERTS = True                             # Alertas inmediatas de Estrés/Incomodidad entre reportes (aura.alert)
+ALERT_POLL = 100                          # ms entre lecturas del nivel de sonido para las alertas
+ALERT_TIMEOUT = 3                         # Segundos máximos por alerta (conexión aparte del lote)
 
 # Pines para sensores
 DHT_PIN = 2        # GP2 para sensor DHT11
@@ -56,142 +90,18 @@ OLED_WIDTH = 128
 OLED_HEIGHT = 64
 OLED_ADDR = 0x3C   # Dirección I2C típica para SSD1306
 
-# Estados emocionales y umbrales
-EMOTION_STATES = {
-    "Confort": {
-        "temp_min": 21, 
-        "temp_max": 26, 
-        "hum_min": 40, 
-        "hum_max": 60,
-        "sound_max": 0.3
-    },
-    "Incomodidad": {
-        "temp_min": None, 
-        "temp_max": None, 
-        "hum_min": None, 
-        "hum_max": None,
-        "sound_max": None
-    },
-    "Calma": {
-        "temp_min": 19, 
-        "temp_max": 28, 
-        "hum_min": 30, 
-        "hum_max": 70,
-        "sound_max": 0.5
-    },
-    "Estrés": {
-        "temp_min": None, 
-        "temp_max": None, 
-        "hum_min": None, 
-        "hum_max": None,
-        "sound_max": 0.8  # Por encima de este nivel
-    },
-    "Expectativa": {
-        "temp_min": None, 
-        "temp_max": None, 
-        "hum_min": None, 
-        "hum_max": None,
-        "sound_max": 0.1  # Muy silencioso
-    },
-    "Energía": {
-        "temp_min": None, 
-        "temp_max": None, 
-        "hum_min": None, 
-        "hum_max": None,
-        "sound_max": None
-    },
-    "Distracción": {
-        "temp_min": None, 
-        "temp_max": None, 
-        "hum_min": None, 
-        "hum_max": None,
-        "sound_max": None
-    },
-    "Monotonía": {
-        "temp_min": None, 
-        "temp_max": None, 
-        "hum_min": None, 
-        "hum_max": None,
-        "sound_max": None
-    },
-    "Conflicto": {
-        "temp_min": None, 
-        "temp_max": None, 
-        "hum_min": None, 
-        "hum_max": None,
-        "sound_max": None
-    }
-}
+# Layouts de pantalla para aura.screen: (campo, x, y, caracteres)
+MESSAGE_LAYOUT = (
+    ("l0", 0, 0, 16), ("l1", 0, 10, 16), ("l2", 0, 20, 16),
+    ("l3", 0, 30, 16), ("l4", 0, 40, 16), ("foot", 0, 54, 16),
+)
+SENSOR_LAYOUT = (
+    ("th", 0, 0, 16), ("sound", 0, 10, 16), ("label", 0, 25, 16),
+    ("state", 20, 35, 13), ("value", 0, 45, 16), ("foot", 0, 54, 16),
+)
 
-# ------------------------------------------------------------------------
-# Clase para manejar el micrófono I2S
-# ------------------------------------------------------------------------
-class AudioSensor:
-    def __init__(self, ws_pin, sck_pin, sd_pin, lr_pin=None):
-        """
-        Inicializa el sensor de audio I2S
-        """
-        # Configurar pin LR si se proporciona
-        if lr_pin is not None:
-            self.lr = Pin(lr_pin, Pin.OUT)
-            self.lr.value(0)  # 0=Left, 1=Right
-        
-        try:
-            # Usar machine.I2S para el micrófono
-            self.audio = I2S(
-                0,                  # Instancia I2S 0
-                sck=Pin(sck_pin),   # Bit Clock
-                ws=Pin(ws_pin),     # Word Select
-                sd=Pin(sd_pin),     # Serial Data
-                mode=I2S.RX,        # Modo de recepción
-                bits=16,            # 16 bits por muestra
-                format=I2S.MONO,    # Formato MONO
-                rate=16000,         # Frecuencia de muestreo 16kHz
-                ibuf=4096           # Buffer interno
-            )
-            self.buffer = bytearray(1600 * 2)  # Buffer para 100ms de audio a 16kHz
-            self.use_i2s = True
-            print("I2S inicializado correctamente")
-        except (ImportError, AttributeError):
-            # Fallback a ADC si I2S no está disponible
-            print("I2S no disponible, usando ADC como fallback")
-            self.adc = ADC(Pin(26))  # Usamos ADC en GPIO26 como fallback
-            self.use_i2s = False
-
-    def read_level(self):
-        """
-        Lee el nivel de audio y devuelve un valor normalizado entre 0.0 y 1.0
-        """
-        if self.use_i2s:
-            # Usando I2S
-            try:
-                bytes_read = self.audio.readinto(self.buffer)
-                if bytes_read > 0:
-                    # Convertir a muestras de 16 bits
-                    samples = struct.unpack("<{}h".format(bytes_read // 2), self.buffer[:bytes_read])
-                    
-                    # Calcular RMS (Root Mean Square)
-                    sum_squares = sum(sample * sample for sample in samples)
-                    rms = math.sqrt(sum_squares / len(samples))
-                    
-                    # Normalizar a 0-1 (ajustar según sensibilidad del micrófono)
-                    level = min(1.0, rms / 10000)
-                    return level
-                return 0.0
-            except Exception as e:
-                print("Error leyendo I2S:", e)
-                return 0.0
-        else:
-            # Usando ADC como fallback
-            try:
-                # Tomamos varias muestras y promediamos
-                samples = [self.adc.read_u16() for _ in range(10)]
-                avg = sum(samples) / len(samples)
-                # Normalizar a 0-1
-                return avg / 65535
-            except Exception as e:
-                print("Error leyendo ADC:", e)
-                return 0.0
+# Estados emocionales y umbrales: tabla de reglas en aura/classify.py
+# (RULES_PICO) e índices de estado en aura/states.py
 
 # ------------------------------------------------------------------------
 # Clase principal del dispositivo AURA
@@ -201,18 +111,42 @@ class AuraDevice:
         # Inicializar componentes
         self.i2c = I2C(0, sda=Pin(OLED_SDA_PIN), scl=Pin(OLED_SCL_PIN), freq=400000)
         self.display = SSD1306_I2C(OLED_WIDTH, OLED_HEIGHT, self.i2c, addr=OLED_ADDR)
+        self.screen = Screen(self.display)  # Refresco parcial de la OLED
         self.temp_sensor = dht.DHT11(Pin(DHT_PIN))
-        self.audio = AudioSensor(MIC_WS_PIN, MIC_SCK_PIN, MIC_SD_PIN, MIC_LR_PIN)
+        self.audio = AudioSensor(MIC_WS_PIN, MIC_SCK_PIN, MIC_SD_PIN, MIC_LR_PIN,
+                                 dual_core=DUAL_CORE)  # Canal izquierdo (L/R a 0)
         self.led = Pin("LED", Pin.OUT)  # LED integrado
         
         # Estado de conexión WiFi
         self.wlan = network.WLAN(network.STA_IF)
         self.connected = False
+        self.http = AsyncHttpClient(SERVER_URL, timeout=HTTP_TIMEOUT)  # Conexión keep-alive
+        self.device_header = b"x-device-code: " + DEVICE_CODE.encode() + b"\r\n"
+        self.transport = self.make_transport()  # Por dónde van los lotes (aura.transport)
         self.config = None
+        self.store = ConfigStore()  # Config en flash con ETag (aura.config)
+        self.config_job = None
         self.last_temp = None
         self.last_hum = None
         self.last_sound = None
+        self.last_db = None
         self.last_state = None
+        self.classifier = Classifier()
+        self.policy = ReportPolicy()     # envío por cambios + latido
+        self.window = ReportWindow(NFEAT)  # agregados de la ventana de reporte
+        self.batch = MeasurementBatch(records=BINARY_RECORDS)  # Lote de mediciones pendientes de envío
+        self.queue = BoundedQueue(QUEUE_SIZE)  # Mediciones de la tarea de sensores
+        self.spool = Spool()  # Mediciones no enviadas, guardadas en flash
+        self.link_ok = True  # Resultado del último envío
+        self.latest = None  # Última lectura pendiente de mostrar
+        self.new_reading = asyncio.Event()
+        self.alerts = EdgeDetector() if ALERTS else None  # Cruces de umbral entre reportes
+        self.alert_ready = asyncio.Event()
+        self.probe = Probe()  # Tiempos y memoria por fase
+        self.sched = Scheduler()  # Trabajos periódicos con plazos absolutos
+        self.sample_job = None
+        self.interval = UPDATE_INTERVAL  # Segundos entre reportes
+        self.report_at = time.ticks_ms()
         
         # Inicializar pantalla
         self.display.fill(0)
@@ -221,95 +155,168 @@ class AuraDevice:
         self.display.text("Iniciando...", 0, 30)
         self.display.show()
 
-    def connect_wifi(self):
-        """Establece conexión WiFi"""
+    async def connect_wifi(self):
+        """Establece conexión WiFi sin bloquear el bucle asyncio"""
         self.display_message("Conectando WiFi...")
         
-        # Activar WiFi y conectar
-        self.wlan.active(True)
-        self.wlan.connect(WIFI_SSID, WIFI_PASSWORD)
-        
-        attempts = 0
-        max_attempts = 20
-        while not self.wlan.isconnected() and attempts < max_attempts:
-            self.led.toggle()
-            time.sleep(1)
-            attempts += 1
-            self.display.text(f"Intento {attempts}/{max_attempts}", 0, 20)
-            self.display.show()
-        
-        if self.wlan.isconnected():
+        # Activar WiFi y conectar (aura.wifi); un intento por segundo en pantalla
+        if await wifi.connect(self.wlan, WIFI_SSID, WIFI_PASSWORD,
+                              on_wait=self.show_attempt):
             self.connected = True
             ip = self.wlan.ifconfig()[0]
             self.display_message(f"Conectado!\nIP: {ip}")
             self.led.on()
+            wifi.sync_clock()  # RTC en hora (timestamps de las mediciones en flash)
             return True
         else:
             self.display_message("Error WiFi\nVerifica credenciales")
             self.led.off()
             return False
     
-    def get_config(self):
-        """Obtiene configuración del servidor AURA"""
+    def show_attempt(self, attempt, max_attempts):
+        """Parpadeo y contador de intentos mientras se conecta la WiFi"""
+        self.led.toggle()
+        self.screen.set("l2", f"Intento {attempt}/{max_attempts}")
+        self.screen.flush()
+    
+    def apply_config(self, config):
+        """Aplica una config (recién recibida o de la caché en flash)"""
+        if not config:
+            return
+        self.config = config
+        self.batch.configure(config.get('batchSize'), config.get('flushInterval'))
+        self.policy.configure(config)
+        if self.alerts is not None:
+            self.alerts.configure(config)
+        self.audio.calibrate(config.get('dbOffset'))
+        refresh = config.get('configRefresh')
+        if refresh and self.config_job is not None:
+            self.sched.set_period(self.config_job, refresh * 1000)
+        self.apply_interval()
+
+    async def get_config(self, quiet=False):
+        """
+        Revalida la configuración con el servidor (GET condicional, aura.config)
+        y la aplica si ha cambiado (quiet: sin mensajes en pantalla).
+        True si ha cambiado, False si sigue vigente, None si no se pudo revalidar
+        """
         if not self.connected:
-            return False
+            return None
         
         try:
-            self.display_message("Obteniendo config...")
-            response = urequests.get(
-                f"{SERVER_URL}/api/devices/config",
-                headers={"x-device-code": DEVICE_CODE}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.config = data.get('config', {})
-                self.display_message(f"Config OK\nIntervalo: {self.config.get('samplingInterval', UPDATE_INTERVAL)}s")
-                response.close()
-                return True
-            else:
-                self.display_message(f"Error config: {response.status_code}")
-                response.close()
-                return False
+            changed = await self.store.refresh(self.http, self.device_header)
         except Exception as e:
-            self.display_message(f"Error: {str(e)}")
-            return False
+            if not quiet:
+                self.display_message(f"Error config:\n{str(e)}")
+            else:
+                print("Error releyendo config:", e)
+            return None
+        if changed:
+            self.apply_config(self.store.config)
+            if not quiet:
+                self.display_message(f"Config OK\nIntervalo: {self.interval}s")
+        return changed
+    
+    def send_measurement(self, room_state, measurement, temp=None, hum=None, sound=None,
+                         db=None, suppressed=0, stats=None):
+        """Encola la medición para la tarea de envío (nunca bloquea)"""
+        self.queue.put_nowait((room_state, measurement, temp, hum, sound, db, suppressed, stats))
     
-    def send_measurement(self, room_state, measurement):
-        """Envía mediciones al servidor AURA"""
+    async def flush_measurements(self):
+        """Envía todas las mediciones acumuladas en una sola petición"""
         if not self.connected:
+            self.spool_batch()
             return False
         
         try:
-            self.display_message(f"Enviando datos...\n{room_state}: {measurement:.2f}")
+            self.display_message(f"Enviando datos...\n{self.batch.count} mediciones")
+            probe = self.probe
+            if PROBE_DUMP:
+                probe.dump()
             
-            # Preparar payload
-            data = {
-                "code": DEVICE_CODE,
-                "measurement": measurement,
-                "roomState": room_state
-            }
+            # Montar el cuerpo (con el bloque de salud) y enviarlo por HTTP POST
+            probe.begin(PAYLOAD)
+            health = None
+            if REPORT_HEALTH:
+                health = probe.report()
+                late = self.sched.take_overruns()  # plazos perdidos (aura.sched)
+                if late:
+                    health["late"] = late
+            body = self.batch.body(DEVICE_CODE, health)
+            probe.end(PAYLOAD)
+            probe.begin(HTTP)
+            code = await self.transport.send_batch(body)
+            probe.end(HTTP)
             
-            # Enviar datos mediante HTTP POST
-            response = urequests.post(
-                f"{SERVER_URL}/api/devices/data",
-                json=data,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            status = "OK" if response.status_code == 200 else f"ERR:{response.status_code}"
-            self.display_message(f"Envío: {status}")
-            response.close()
+            ok = code == 200
+            status = "OK" if ok else f"ERR:{code}"
+            self.display_message(f"Envío: {status}\n{self.transport.latency_ms} ms")
+            self.link_ok = ok
+            if ok:
+                self.batch.clear()
+                # El servidor tiene otra versión de la config: revalidar ya
+                if self.store.outdated(self.transport.reply.get('configVersion')):
+                    self.sched.trigger(self.config_job)
+            else:
+                self.spool_batch()
             gc.collect()  # Liberamos memoria
-            return response.status_code == 200
+            return ok
         except Exception as e:
+            self.link_ok = False
             self.display_message(f"Error: {str(e)}")
+            self.spool_batch()
             gc.collect()  # Liberamos memoria en caso de error
             return False
     
+    def make_transport(self):
+        """HTTP por la conexión keep-alive o MQTT con sesión persistente (TRANSPORT)"""
+        if TRANSPORT == "mqtt":
+            from aura.mqtt import MqttClient
+            from aura.transport import MqttTransport
+            client = MqttClient(MQTT_BROKER, MQTT_PORT, client_id=DEVICE_CODE,
+                                keepalive=MQTT_KEEPALIVE, timeout=HTTP_TIMEOUT)
+            return MqttTransport(client, DEVICE_CODE, MQTT_QOS)
+        # Las alertas van por su propia conexión: no esperan a un lote en curso
+        alerts = AsyncHttpClient(SERVER_URL, timeout=ALERT_TIMEOUT, header_size=512) if ALERTS else None
+        return HttpTransport(self.http, self.device_header, alerts)
+
+    def spool_batch(self):
+        """
+        Guarda en flash el lote que no se ha podido enviar (si falla a medias,
+        en el lote quedan solo las lecturas que faltan por guardar)
+        """
+        try:
+            self.spool.store_batch(self.batch)
+        except OSError as e:
+            print("Error guardando en flash:", e)
+    
+    async def replay_spool(self):
+        """Reenvía un lote de mediciones guardadas en flash (las más antiguas primero)"""
+        if not self.spool.read_batch():
+            return True
+        probe = self.probe
+        try:
+            probe.begin(PAYLOAD)
+            body = json.dumps({"code": DEVICE_CODE, "items": self.spool.items()})
+            probe.end(PAYLOAD)
+            probe.begin(HTTP)
+            code = await self.transport.send_batch(body)
+            probe.end(HTTP)
+        except Exception as e:
+            print("Error reenviando desde flash:", e)
+            code = 0
+        self.link_ok = code == 200
+        if self.link_ok:
+            self.spool.ack()
+            print(f"Reenviadas desde flash, pendientes: {self.spool.pending()}")
+        gc.collect()
+        return self.link_ok
+    
     def read_sensors(self):
-        """Lee todos los sensores y devuelve los valores normalizados"""
+        """Lee todos los sensores (temp, hum, nivel 0–1, dBA); None en los que fallan"""
+        probe = self.probe
         # Leer sensor DHT11 (temperatura y humedad)
+        probe.begin(READ)
         try:
             self.temp_sensor.measure()
             temp = self.temp_sensor.temperature()
@@ -317,21 +324,24 @@ class AuraDevice:
             self.last_temp = temp
             self.last_hum = hum
         except Exception as e:
-            temp = self.last_temp
-            hum = self.last_hum
+            temp = hum = None  # La ventana no pliega lecturas fallidas
             print(f"Error leyendo DHT11: {e}")
+        probe.end(READ)
         
         # Leer nivel de sonido
+        probe.begin(AUDIO)
         try:
-            sound_level = self.audio.read_level()
+            sound_level, db = self.audio.level_and_db()
             self.last_sound = sound_level
+            self.last_db = db
         except Exception as e:
-            sound_level = self.last_sound
+            sound_level = db = None
             print(f"Error leyendo audio: {e}")
+        probe.end(AUDIO)
         
-        return temp, hum, sound_level
+        return temp, hum, sound_level, db
     
-    def determine_state(self, temp, hum, sound_level):
+    def determine_state(self, temp, hum, sound_level, features=None):
         """
         Determina el estado del ambiente basado en las lecturas de sensores
         según las reglas definidas en el componente Monitor del frontend
@@ -341,114 +351,202 @@ class AuraDevice:
                 return self.last_state, 0.5  # Usamos el último estado conocido
             return "Calma", 0.5  # Estado por defecto si no hay lecturas
         
-        # Algoritmo para determinar el estado emocional
-        
-        # 1. Estrés por sonido alto
-        if sound_level > 0.7:
-            self.last_state = "Estrés"
-            return "Estrés", sound_level
-        
-        # 2. Incomodidad por temperatura o humedad extremas
-        if temp > 27:
-            self.last_state = "Incomodidad"
-            return "Incomodidad", min(1.0, (temp - 22) / 8)
-            
-        if temp < 19:
-            self.last_state = "Incomodidad"
-            return "Incomodidad", min(1.0, (20 - temp) / 5)
-            
-        if hum > 70:
-            self.last_state = "Incomodidad"
-            return "Incomodidad", min(1.0, (hum - 60) / 20)
-            
-        if hum < 30:
-            self.last_state = "Incomodidad"
-            return "Incomodidad", min(1.0, (40 - hum) / 15)
-        
-        # 3. Confort en condiciones óptimas
-        if 22 <= temp <= 26 and 40 <= hum <= 60 and sound_level < 0.2:
-            self.last_state = "Confort"
-            return "Confort", 1.0 - sound_level
-        
-        # 4. Expectativa en silencio
-        if sound_level < 0.1:
-            self.last_state = "Expectativa"
-            return "Expectativa", 1.0 - sound_level
-        
-        # 5. Energía en situaciones activas pero cómodas
-        if 0.3 < sound_level < 0.6 and 20 <= temp <= 27:
-            self.last_state = "Energía"
-            return "Energía", sound_level + (1 - abs(temp - 23.5) / 6)
-            
-        # 6. Calma en condiciones moderadas
-        comfort_factor = 1.0 - (abs(temp - 23) / 8) - (abs(hum - 50) / 30) - sound_level
-        self.last_state = "Calma"
-        return "Calma", max(0.1, min(1.0, comfort_factor))
+        # Reglas (estrés, incomodidad, confort...) en aura.classify.RULES_PICO
+        self.last_state = state_name(self.classifier.classify(temp, hum, sound_level, features))
+        return self.last_state, self.classifier.value
     
     def display_message(self, message):
-        """Muestra un mensaje en la pantalla OLED"""
-        self.display.fill(0)
-        lines = message.split('\n')
-        for i, line in enumerate(lines):
-            self.display.text(line, 0, i * 10)
-        self.display.text(f"AURA-{DEVICE_CODE[-4:]}", 0, 54)
-        self.display.show()
+        """Muestra un mensaje en la pantalla OLED (solo se envían las líneas que cambian)"""
+        lines = message.split('\n')[:5]
+        while len(lines) < 5:
+            lines.append("")
+        lines.append(f"AURA-{DEVICE_CODE[-4:]}")
+        self.screen.lines(MESSAGE_LAYOUT, lines)
+        self.screen.flush()
 
     def display_sensor_values(self, temp, hum, sound, state, measurement):
         """Muestra los valores de los sensores y el estado en la pantalla"""
-        self.display.fill(0)
-        self.display.text(f"T:{temp}C  H:{hum}%", 0, 0)
-        self.display.text(f"Sound: {sound:.2f}", 0, 10)
-        self.display.text(f"Estado:", 0, 25)
-        self.display.text(f"> {state}", 20, 35)
-        self.display.text(f"Valor: {measurement:.2f}", 0, 45)
-        self.display.text(f"AURA-{DEVICE_CODE[-4:]}", 0, 54)
-        self.display.show()
+        screen = self.screen
+        screen.layout(SENSOR_LAYOUT)
+        screen.set("th", f"T:{temp}C  H:{hum}%")
+        screen.set("sound", f"Sound: {sound:.2f}")
+        screen.set("label", "Estado:")
+        screen.set("state", f"> {state}")
+        screen.set("value", f"Valor: {measurement:.2f}")
+        screen.set("foot", f"AURA-{DEVICE_CODE[-4:]}")
+        screen.flush()
+
+    def sample(self):
+        """
+        Trabajo de muestreo (cada SAMPLE_INTERVAL s, aura.sched): agrega en
+        la ventana (aura.stats) y, al vencer el plazo de reporte, clasifica
+        con las medias y encola un resumen. Nunca espera a la red.
+        """
+        window = self.window
+        # 1. Leer sensores y plegar en la ventana
+        temp, hum, sound_level, db = self.read_sensors()
+        window.add(temp, hum, sound_level)
+        window.add_level(db)             # LAeq de la muestra: media energética en la ventana
+        if self.alerts is not None:
+            self.alerts.update(TEMP, temp)
+            if self.alerts.update(HUM, hum):
+                self.alert_ready.set()
+        window.add_features(self.audio.features())
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.report_at) < 0:
+            return
+        # Plazo absoluto: el siguiente reporte no depende de lo que tarde este
+        self.report_at = time.ticks_add(self.report_at, self.interval * 1000)
+        if time.ticks_diff(self.report_at, now) <= 0:
+            self.report_at = time.ticks_add(now, self.interval * 1000)
+        
+        # 2. Determinar estado con los valores agregados
+        temp, hum, sound_level = window.means()
+        if temp is None:
+            temp, hum = self.last_temp, self.last_hum
+        if sound_level is None:
+            sound_level = self.last_sound
+        db = window.leq()
+        if db is None:
+            db = self.last_db
+        self.probe.begin(CLASSIFY)
+        room_state, measurement = self.determine_state(temp, hum, sound_level,
+                                                       window.feature_means())
+        self.probe.end(CLASSIFY)
+        
+        # 3. Publicar para la pantalla y la tarea de envío
+        self.latest = (
+            round(temp, 1) if temp is not None else "N/A",
+            round(hum, 1) if hum is not None else "N/A",
+            sound_level if sound_level is not None else 0,
+            room_state,
+            measurement
+        )
+        self.new_reading.set()
+        
+        # 4. Enviar solo si hay cambios o toca latido (aura.policy); el
+        #    resumen lleva también pico y percentiles del audio (aura.capture)
+        audio = self.audio.report()      # cierra la ventana de audio aunque no se envíe
+        if self.policy.should_send(room_state, temp, hum, sound_level):
+            stats = window.summary()
+            if audio is not None:
+                stats["audio"] = audio
+            self.send_measurement(room_state, measurement, temp, hum, sound_level, db,
+                                  self.policy.take_suppressed(), stats)
+        window.reset()
+
+    def watch(self):
+        """
+        Trabajo de alertas (cada ALERT_POLL ms): pasa el nivel de sonido
+        con ponderación Fast al detector (aura.alert) y, si hay un cruce
+        que notificar, despierta alert_task sin esperar al reporte
+        """
+        now = self.audio.level_now()
+        if now is not None and self.alerts.update(SOUND, now[0]):
+            self.alert_ready.set()
+
+    async def alert_task(self):
+        """Envía cada alerta en cuanto el detector la da, fuera del lote"""
+        alerts = self.alerts
+        while True:
+            await self.alert_ready.wait()
+            self.alert_ready.clear()
+            ev = alerts.take() if self.connected else None
+            while ev is not None:
+                try:
+                    code = await self.transport.send_alert(json.dumps(ev))
+                except Exception as e:
+                    print("Error enviando alerta:", e)
+                    code = 0
+                if code != 200:
+                    # Pendiente otra vez: se reintenta tras el cooldown del umbral
+                    alerts.retry()
+                    break
+                print(f"Alerta {'+' if ev['on'] else '-'}{ev['state']}: "
+                      f"{ev['field']}={ev['value']} ({ev['age']} ms desde el cruce)")
+                ev = alerts.take()
+
+    async def display_task(self):
+        """Muestra cada lectura nueva"""
+        while True:
+            await self.new_reading.wait()
+            self.new_reading.clear()
+            if self.latest is not None:
+                self.probe.begin(DISPLAY)
+                self.display_sensor_values(*self.latest)
+                self.probe.end(DISPLAY)
+
+    async def uplink(self):
+        """Trabajo de envío (cada segundo): vacía la cola en el lote y lo envía cuando toca"""
+        while len(self.queue):
+            room_state, measurement, temp, hum, sound, db, suppressed, stats = \
+                self.queue.get_nowait()
+            self.batch.add(room_state, measurement, temp, hum, sound, db,
+                           suppressed=suppressed, stats=stats)
+        if self.batch.due():
+            await self.flush_measurements()
+        elif self.link_ok and self.spool.pending():
+            # Con la conexión recuperada, vaciamos la flash lote a lote
+            await self.replay_spool()
+
+    async def refresh_config(self):
+        """
+        Trabajo de config (cada configRefresh s, o antes si un envío trae
+        otra configVersion); en pantalla solo si no había config en caché.
+        Si falla (p. ej. la red aún no responde al arrancar) se reintenta a
+        los CONFIG_RETRY s en lugar de esperar un periodo entero
+        """
+        if await self.get_config(quiet=self.store.config is not None) is None:
+            self.sched.trigger(self.config_job, CONFIG_RETRY * 1000)
+
+    def apply_interval(self):
+        """Intervalo de reporte de la config (o por defecto) y ritmo de muestreo"""
+        interval = self.config.get('samplingInterval', UPDATE_INTERVAL) if self.config else UPDATE_INTERVAL
+        if interval != self.interval:
+            self.interval = interval
+            self.report_at = time.ticks_add(time.ticks_ms(), interval * 1000)
+            if self.sample_job is not None:
+                self.sched.set_period(self.sample_job, min(SAMPLE_INTERVAL, interval) * 1000)
 
     async def main_loop(self):
         """Bucle principal del dispositivo"""
+        # Refresco de pantalla con límite de frecuencia
+        asyncio.create_task(self.screen.run())
+        
+        # Config de la última vez (flash): se aplica sin esperar a la red
+        self.apply_config(self.store.load())
+        
         # Conectar WiFi
-        if not self.connect_wifi():
+        if not await self.connect_wifi():
             for _ in range(10):  # Si no hay WiFi, intentamos cada 10s
                 self.led.toggle()
                 await asyncio.sleep(1)
             # Intentamos reiniciar
             import machine
             machine.reset()
-            
-        # Intentar obtener configuración
-        self.get_config()
         
-        # Determinar intervalo de muestreo (default o del servidor)
-        interval = self.config.get('samplingInterval', UPDATE_INTERVAL) if self.config else UPDATE_INTERVAL
+        # Captura de audio continua entre mediciones
+        self.audio.start()
         
-        # Bucle principal
-        while True:
-            # 1. Leer sensores
-            temp, hum, sound_level = self.read_sensors()
-            
-            # 2. Determinar estado
-            room_state, measurement = self.determine_state(temp, hum, sound_level)
-            
-            # 3. Mostrar información en pantalla
-            self.display_sensor_values(
-                temp if temp is not None else "N/A",
-                hum if hum is not None else "N/A",
-                sound_level if sound_level is not None else 0,
-                room_state,
-                measurement
-            )
-            
-            # 4. Enviar datos al servidor
-            self.send_measurement(room_state, measurement)
-            
-            # 5. Esperar hasta la próxima medición
-            for _ in range(interval):
-                self.led.toggle()  # Parpadeo durante espera
-                await asyncio.sleep(1)
-                # Liberar memoria cada 10 segundos
-                if _ % 10 == 0:
-                    gc.collect()
+        # Trabajos periódicos con plazos absolutos (aura.sched): una red
+        # lenta solo retrasa el envío y los retrasos se cuentan
+        sched = self.sched
+        self.report_at = time.ticks_add(time.ticks_ms(), self.interval * 1000)
+        self.sample_job = sched.every(min(SAMPLE_INTERVAL, self.interval) * 1000,
+                                      self.sample, "sample", delay=0)
+        sched.every(1000, self.led.toggle, "led")         # parpadeo
+        sched.every(10000, gc.collect, "gc")              # liberar memoria
+        sched.every(1000, self.uplink, "uplink", is_async=True)
+        if self.alerts is not None:
+            # Alertas inmediatas: su tarea envía sin pasar por la cola del lote
+            sched.every(ALERT_POLL, self.watch, "alert")
+            asyncio.create_task(self.alert_task())
+        if TRANSPORT == "mqtt":
+            sched.every(MQTT_KEEPALIVE * 500, self.transport.keepalive, "mqtt", is_async=True)
+        # Revalidación de la config en segundo plano, la primera ya mismo
+        self.config_job = sched.every((self.config or {}).get('configRefresh', CONFIG_REFRESH) * 1000,
+                                      self.refresh_config, "config", is_async=True, delay=0)
+        await asyncio.gather(sched.run(), self.display_task())
 
 # ------------------------------------------------------------------------
 # Punto de entrada principal
@@ -463,6 +561,7 @@ def main():
     except Exception as e:
         print(f"Error fatal: {e}")
         aura.display_message(f"Error fatal:\n{str(e)}")
+        aura.screen.flush(True)
         time.sleep(10)  # Mostrar error por 10 segundos
     finally:
         # Reiniciar en caso de error fatal
@@ -1,27 +1,40 @@
 """
 main.py – AURA Pico W  (sin tildes)
 -----------------------------------
-• measurement = XXXYYYZZZ  (T×10 | H×10 | dB×10)  → 9 digitos
+• measurement = valor del clasificador; T, H, dB y nivel van en registros
+  binarios de 18 bytes (aura.codec, campo "records" del lote)
+• BINARY_RECORDS = False: measurement = XXXYYYZZZ (T×10 | H×10 | dB×10)
 • Todos los textos en pantalla y roomState quedan SIN tildes.
 """
 
 # ---------------- IMPORTS ---------------------------------------------
-import time, gc, math, struct, uasyncio as asyncio
-try:
-    import random
-except ImportError:
-    import urandom as random
-import network, urequests
-from machine import Pin, I2C, ADC
-try:
-    from machine import I2S
-except ImportError:
-    I2S = None
+import time, gc, json, uasyncio as asyncio
+import network
+from machine import Pin, I2C
 try:
     import dht
 except ImportError:
     dht = None
 from ssd1306 import SSD1306_I2C
+from aura import wifi, unload
+from aura.audio import AudioSensor
+from aura.batch import MeasurementBatch
+from aura.http import AsyncHttpClient, MeasurementPayload
+from aura.queue import BoundedQueue
+from aura.spool import Spool
+from aura.screen import Screen
+from aura.classify import Classifier, DEFSIM
+from aura.states import state_name
+from aura.policy import ReportPolicy
+from aura.stats import ReportWindow
+from aura.spectrum import NFEAT
+from aura.probe import Probe, READ, AUDIO, CLASSIFY, DISPLAY, PAYLOAD, HTTP
+from aura.sched import Scheduler
+from aura.config import ConfigStore
+from aura.transport import HttpTransport
+from aura import codec
+# Solo cuando hacen falta: aura.register (hasta estar reclamado), aura.sim
+# (SIMULATE), aura.sampler (sin I2S, aura.audio) y aura.mqtt (TRANSPORT)
 
 # ---------------- CONFIG ----------------------------------------------
 SIMULATE   = True
@@ -30,8 +43,21 @@ WIFI_PASS  = "HolaHoal"
 SERVER_URL = "http://172.20.10.3:4000"
 DEVICE_CODE = "AURA-ABC001"
 
-UPDATE_INTERVAL             = 10   # s
-UNREGISTERED_RETRY_INTERVAL = 1    # s
+UPDATE_INTERVAL             = 10   # s entre reportes
+SAMPLE_INTERVAL             = 2    # s entre muestras agregadas (aura.stats)
+REGISTER_WAIT               = 25   # s de long-poll del registro (aura.register)
+HTTP_TIMEOUT                = 10   # s por peticion
+QUEUE_SIZE                  = 16   # lecturas pendientes de envio
+DUAL_CORE                   = False # captura de audio en el nucleo 1 (_thread)
+REPORT_HEALTH               = True  # tiempos y heap por fase (aura.probe) en cada lote
+PROBE_DUMP                  = False # tabla de aura.probe por consola en cada envio
+CONFIG_REFRESH              = 600  # s entre revalidaciones (sin configRefresh)
+CONFIG_RETRY                = 30   # s hasta reintentar una revalidacion fallida
+BINARY_RECORDS              = True  # registros aura.codec en el lote (False: XXXYYYZZZ)
+TRANSPORT                   = "http" # lotes por "http" o "mqtt" (aura.transport)
+MQTT_BROKER, MQTT_PORT      = "172.20.10.3", 1883
+MQTT_QOS                    = 1    # 0: sin confirmacion; 1: espera PUBACK
+MQTT_KEEPALIVE              = 60   # s; PINGREQ cada mitad
 
 # Pines
 DHT_PIN = 2
@@ -40,38 +66,11 @@ ADC_PIN = 26
 OLED_SDA_PIN, OLED_SCL_PIN, OLED_ADDR = 0, 1, 0x3C
 OLED_W, OLED_H = 128, 64
 
-# ---------------- AUDIO -----------------------------------------------
-class AudioSensor:
-    def __init__(self, ws,sck,sd,lr=None):
-        self.use_i2s = False
-        if I2S:
-            try:
-                if lr is not None:
-                    Pin(lr, Pin.OUT).value(1)      # canal Right
-                self.i2s = I2S(0, sck=Pin(sck), ws=Pin(ws), sd=Pin(sd),
-                               mode=I2S.RX, bits=16, format=I2S.MONO,
-                               rate=16000, ibuf=4096)
-                self.buf = bytearray(1600*2)
-                self.use_i2s = True
-            except Exception as e:
-                print("I2S init err:", e)
-        if not self.use_i2s:
-            self.adc = ADC(Pin(ADC_PIN))
-
-    def level_and_db(self):
-        if self.use_i2s:
-            n = self.i2s.readinto(self.buf)
-            if n:
-                samp = struct.unpack("<{}h".format(n//2), self.buf[:n])
-                rms = math.sqrt(sum(s*s for s in samp)/len(samp))
-                lvl = min(1.0, rms/10000)
-            else:
-                lvl = 0.0
-        else:
-            vals = [self.adc.read_u16() for _ in range(10)]
-            lvl  = sum(vals)/(len(vals)*65535)
-        db = 30 + lvl*15
-        return lvl, db
+# Layouts OLED (aura.screen): (campo, x, y, caracteres)
+MSG_LAYOUT  = (("l0",0,0,16), ("l1",0,10,16), ("l2",0,20,16),
+               ("l3",0,30,16), ("l4",0,40,16), ("code",0,54,16))
+SHOW_LAYOUT = (("t",0,0,8), ("h",64,0,8), ("s",0,10,16),
+               ("st",0,25,16), ("val",0,45,16))
 
 # ---------------- DEVICE ----------------------------------------------
 class AuraDevice:
@@ -79,149 +78,297 @@ class AuraDevice:
         self.i2c  = I2C(0, sda=Pin(OLED_SDA_PIN), scl=Pin(OLED_SCL_PIN),
                         freq=400000)
         self.disp = SSD1306_I2C(OLED_W, OLED_H, self.i2c, addr=OLED_ADDR)
+        self.scr  = Screen(self.disp)      # solo envia paginas modificadas
+        self.cls  = Classifier(DEFSIM)
+        self.policy = ReportPolicy()       # solo envia cambios y latidos
+        self.win  = ReportWindow(NFEAT)    # agregados de la ventana de reporte
         self.led  = Pin("LED", Pin.OUT)
 
         self.dht   = None if SIMULATE else dht.DHT11(Pin(DHT_PIN))
         self.audio = AudioSensor(MIC_WS_PIN, MIC_SCK_PIN, MIC_SD_PIN,
-                                 MIC_LR_PIN)
+                                 MIC_LR_PIN, 1, ADC_PIN, DUAL_CORE)  # canal Right
 
         self.wlan       = network.WLAN(network.STA_IF)
         self.connected  = False
         self.registered = False
+        self.batch      = MeasurementBatch(records=BINARY_RECORDS)
+        self.http       = AsyncHttpClient(SERVER_URL, timeout=HTTP_TIMEOUT)
+        self.queue      = BoundedQueue(QUEUE_SIZE)
+        self.spool      = Spool()
+        self.latest     = None
+        self.new        = asyncio.Event()
+        self.payload    = MeasurementPayload(DEVICE_CODE)
+        self.dev_hdr    = b"x-device-code: "+DEVICE_CODE.encode()+b"\r\n"
+        self.link_tx    = self.transport()   # lotes por HTTP o MQTT
+        self.probe      = Probe()          # tiempos y heap por fase
+        self.sched      = Scheduler()      # trabajos con plazos absolutos
+        self.store      = ConfigStore()    # config en flash con ETag
+        self.cfg_job    = None
+        self.due        = time.ticks_ms()  # plazo del proximo reporte
+        self.link       = "ok"             # resultado del ultimo envio
 
         # Valores demo iniciales
-        self.t, self.h, self.db = 22.35, 42.0, 37.0
+        if SIMULATE:
+            from aura.sim import SensorWalk
+            self.walk = SensorWalk(22.35, 42.0, 37.0)
         self.last_t = self.last_h = None
 
         self.msg("AURA\n"+DEVICE_CODE+"\nInit...")
 
     # -------- OLED helpers --------------------------------------------
     def msg(self, text, show_code=True):
-        self.disp.fill(0)
-        for i, line in enumerate(text.split("\n")):
-            self.disp.text(line, 0, i*10)
-        if show_code and not self.registered:
-            self.disp.text(DEVICE_CODE, 0, 54)
-        self.disp.show()
-
-    def big_code(self):
-        self.disp.fill(0)
-        half = len(DEVICE_CODE)//2
-        self.disp.text(DEVICE_CODE[:half], (OLED_W-half*4)//2, 18)
-        self.disp.text(DEVICE_CODE[half:], (OLED_W-half*4)//2, 34)
-        self.disp.show()
+        lines = (text.split("\n")+[""]*5)[:5]
+        lines.append(DEVICE_CODE if show_code and not self.registered else "")
+        self.scr.lines(MSG_LAYOUT, lines); self.scr.flush()
 
     # -------- Wi-Fi ----------------------------------------------------
-    def wifi(self):
+    async def wifi(self):
         self.msg("Conectando WiFi...", False)
-        self.wlan.active(True)
-        self.wlan.connect(WIFI_SSID, WIFI_PASS)
-        for _ in range(20):
-            if self.wlan.isconnected():
-                self.connected = True
-                self.msg("WiFi OK\n"+self.wlan.ifconfig()[0], False)
-                self.led.on(); return True
-            time.sleep(1); self.led.toggle()
+        if await wifi.connect(self.wlan, WIFI_SSID, WIFI_PASS,
+                              on_wait=lambda i, n: self.led.toggle()):
+            self.connected = True
+            self.msg("WiFi OK\n"+self.wlan.ifconfig()[0], False)
+            self.led.on(); wifi.sync_clock(); return True
         self.msg("Error WiFi", False); return False
 
     # -------- Lectura de sensores -------------------------------------
     def sensors(self):
+        pr = self.probe
         if SIMULATE:
-            self.t  = max(22.30, min(22.40, self.t+random.uniform(-0.02,0.02)))
-            self.h  = max(39.0,  min(45.0,  self.h+random.uniform(-0.4,0.4)))
-            self.db = max(30.0,  min(45.0,  self.db+random.uniform(-1,1)))
-            lvl = (self.db-30)/15
-            return round(self.t,1), round(self.h,1), round(self.db,1), lvl
+            pr.begin(READ); r = self.walk.step(); pr.end(READ)
+            return r                         # paseo aleatorio (aura.sim)
+        pr.begin(READ)
         try:
             self.dht.measure()
             t = self.dht.temperature(); h = self.dht.humidity()
             self.last_t, self.last_h = t, h
         except Exception as e:
-            print("DHT err:", e); t, h = self.last_t, self.last_h
+            print("DHT err:", e); t = h = None   # la ventana no la pliega
+        pr.end(READ); pr.begin(AUDIO)
         lvl, db = self.audio.level_and_db()
+        pr.end(AUDIO)
+        if t is None:
+            return None, None, round(db,1), lvl
         return round(t,1), round(h,1), round(db,1), lvl
 
     # -------- Estado ---------------------------------------------------
-    def state(self, t, h, lvl):
+    def state(self, t, h, lvl, f=None):
         if t is None or h is None:           return "Calma",        0.5
-        if lvl > 0.7:                        return "Estres",       lvl
-        if t>27 or t<19 or h>70 or h<30:     return "Incomodidad",  0.8
-        if 22<=t<=26 and 40<=h<=60 and lvl<0.2: return "Confort", 1-lvl
-        if lvl < 0.1:                        return "Expectativa",  1-lvl
-        if 0.3 < lvl < 0.6:                  return "Energia",      lvl
-        return "Calma", max(0.1,1-abs(t-23)/8-abs(h-50)/30-lvl)
-
-    # -------- Encode XXXYYYZZZ ----------------------------------------
+        i = self.cls.classify(t, h, lvl, f)  # reglas: aura.classify.RULES_DEFSIM
+        return state_name(i, ascii=True), self.cls.value
+
+    # -------- Medicion -------------------------------------------------
     @staticmethod
-    def encode(t,h,db):
-        part = lambda x: f"{int(round(x*10))%1000:03d}"
-        return int(part(t)+part(h)+part(db))
+    def measurement(t,h,db,val):
+        # con registros binarios los canales viajan aparte (aura.codec)
+        return val if BINARY_RECORDS else codec.encode(t,h,db)
 
     # -------- Envio ----------------------------------------------------
-    def send(self, st, val_num):
+    async def send(self, st, val_num):
         if not self.connected:
             print("⇢ sin WiFi"); return "net_err"
-        payload = {"code": DEVICE_CODE,
-                   "measurement": val_num,
-                   "roomState": st}
+        pr = self.probe
+        pr.begin(PAYLOAD); payload = self.payload.fill(val_num, st); pr.end(PAYLOAD)
         print("⇢ POST", SERVER_URL+"/api/devices/data")
-        print("  payload:", payload)
+        print("  payload:", bytes(payload))
         try:
-            r = urequests.post(SERVER_URL+"/api/devices/data",
-                               json=payload,
-                               headers={"Content-Type":"application/json"})
-            print("  status:", r.status_code)
-            body = {}
-            if r.headers.get("Content-Type","").startswith("application/json"):
-                body = r.json()
+            pr.begin(HTTP)
+            code = await self.http.request("POST", "/api/devices/data",
+                                           body=payload)
+            pr.end(HTTP)
+            print("  status:", code, "(%d ms)" % self.http.latency_ms)
+            body = self.http.json() if code == 200 else {}
             print("  body:", body)
             status = body.get("status","unknown")
-            r.close(); gc.collect()
-            return "http_"+str(r.status_code) if r.status_code!=200 else status
+            gc.collect()
+            return "http_"+str(code) if code!=200 else status
         except Exception as e:
             print("  EXC:", e); return "net_err"
 
+    # -------- Config y envio por lotes ---------------------------------
+    def transport(self):
+        if TRANSPORT == "mqtt":              # solo se carga si se usa
+            from aura.mqtt import MqttClient
+            from aura.transport import MqttTransport
+            return MqttTransport(MqttClient(MQTT_BROKER, MQTT_PORT, DEVICE_CODE,
+                                            MQTT_KEEPALIVE, timeout=HTTP_TIMEOUT),
+                                 DEVICE_CODE, MQTT_QOS)
+        return HttpTransport(self.http, self.dev_hdr)
+
+    def apply(self, cfg):
+        # config recibida o de la cache en flash (aura.config)
+        if not cfg: return
+        self.batch.configure(cfg.get("batchSize"), cfg.get("flushInterval"))
+        self.policy.configure(cfg)
+        self.audio.calibrate(cfg.get("dbOffset"))
+        if cfg.get("configRefresh") and self.cfg_job is not None:
+            self.sched.set_period(self.cfg_job, cfg["configRefresh"]*1000)
+
+    async def config(self):
+        # GET condicional (If-None-Match): 304 si no ha cambiado
+        try:
+            if await self.store.refresh(self.http, self.dev_hdr):
+                self.apply(self.store.config)
+            gc.collect()
+        except Exception as e:
+            print("  config EXC:", e)
+            self.sched.trigger(self.cfg_job, CONFIG_RETRY*1000)   # no esperar un periodo
+
+    async def flush(self):
+        if not self.connected:
+            self.to_flash(); return "net_err"
+        print("⇢ POST batch x", self.batch.count)
+        pr = self.probe
+        if PROBE_DUMP: pr.dump()
+        try:
+            pr.begin(PAYLOAD)
+            hl = None
+            if REPORT_HEALTH:
+                hl = pr.report()
+                late = self.sched.take_overruns()   # plazos perdidos
+                if late: hl["late"] = late
+            body = self.batch.body(DEVICE_CODE, hl)
+            pr.end(PAYLOAD); pr.begin(HTTP)
+            code = await self.link_tx.send_batch(body)
+            pr.end(HTTP)
+            body = self.link_tx.reply
+            gc.collect()
+            if code != 200:
+                self.to_flash(); return "http_"+str(code)
+            # 200: el servidor ya tiene el lote, aunque status no sea "ok"
+            # (p. ej. sin registrar); reenviarlo no cambiaria la respuesta
+            self.batch.clear()
+            status = body.get("status","unknown")
+            if self.store.outdated(body.get("configVersion")):
+                self.sched.trigger(self.cfg_job)   # config nueva: revalidar ya
+            return status
+        except Exception as e:
+            print("  EXC:", e); self.to_flash(); return "net_err"
+
+    # -------- Store-and-forward en flash --------------------------------
+    def to_flash(self):
+        try:
+            self.spool.store_batch(self.batch)   # vacia el lote segun guarda
+        except OSError as e:
+            print("  flash EXC:", e)
+
+    async def replay(self):
+        if not self.spool.read_batch():
+            return "ok"
+        pr = self.probe
+        try:
+            pr.begin(PAYLOAD)
+            body = json.dumps({"code": DEVICE_CODE,
+                               "items": self.spool.items()})
+            pr.end(PAYLOAD); pr.begin(HTTP)
+            code = await self.link_tx.send_batch(body)
+            pr.end(HTTP)
+        except Exception as e:
+            print("  replay EXC:", e); return "net_err"
+        if code != 200:
+            return "http_"+str(code)
+        self.spool.ack(); gc.collect()
+        print("⇢ flash pendientes:", self.spool.pending())
+        return "ok"
+
     # -------- Mostrar --------------------------------------------------
     def show(self, t, h, db, st, val):
-        self.disp.fill(0)
-        self.disp.text(f"T:{t}C", 0, 0)
-        self.disp.text(f"H:{h}%", 64, 0)
-        self.disp.text(f"S:{db}dB", 0, 10)
-        self.disp.text("> "+st, 0, 25)
-        self.disp.text(f"Val:{val:.2f}", 0, 45)
-        self.disp.show()
+        self.scr.lines(SHOW_LAYOUT, (f"T:{t}C", f"H:{h}%", f"S:{db}dB",
+                                     "> "+st, f"Val:{val:.2f}"))
+        self.scr.flush()
 
     # -------- Bucle principal -----------------------------------------
     async def loop(self):
-        if not self.wifi():
+        asyncio.create_task(self.scr.run())
+        self.apply(self.store.load())      # config de flash, sin esperar red
+        if not await self.wifi():
             await asyncio.sleep(5); import machine; machine.reset()
 
-        # Registro
+        # Registro: long-poll sin escrituras; retroceso con jitter si no hay
+        from aura import register
+        reg = register.Registration(self.http, self.dev_hdr, REGISTER_WAIT)
         while not self.registered:
-            self.big_code()
-            status = self.send("Calma", 0)
+            register.show_code(self.scr, DEVICE_CODE, OLED_W)
+            status = await reg.poll()
+            if status == "unsupported":          # backend sin la ruta
+                status = await self.send("Calma", 0)
             if status == "ok":
                 self.registered = True
                 self.msg("Registrado!", False)
                 await asyncio.sleep(2)
-            elif status == "no_registrado":
-                await asyncio.sleep(UNREGISTERED_RETRY_INTERVAL)
-            else:
+                break
+            if status != "no_registrado":
                 self.msg(f"ERR {status}", True)
-                await asyncio.sleep(2)
+            await asyncio.sleep(reg.pause(status))
+        del reg, register                        # solo hace falta una vez
+        unload("register"); gc.collect()
 
-        # Operacion normal
+        # Operacion normal: trabajos con plazos absolutos (aura.sched) y
+        # pantalla en su tarea; una red lenta solo retrasa el envio
+        if not SIMULATE:
+            self.audio.start()
+        self.due = time.ticks_add(time.ticks_ms(), UPDATE_INTERVAL*1000)
+        sc = self.sched
+        sc.every(min(SAMPLE_INTERVAL, UPDATE_INTERVAL)*1000, self.sample,
+                 "sample", delay=0)
+        sc.every(1000, self.led.toggle, "led")
+        sc.every(10000, gc.collect, "gc")
+        sc.every(1000, self.uplink, "uplink", is_async=True)
+        if TRANSPORT == "mqtt":
+            sc.every(MQTT_KEEPALIVE*500, self.link_tx.keepalive, "mqtt", is_async=True)
+        # config: revalidacion en segundo plano, la primera ya mismo
+        cfg = self.store.config or {}
+        self.cfg_job = sc.every(cfg.get("configRefresh", CONFIG_REFRESH)*1000,
+                                self.config, "config", is_async=True, delay=0)
+        await asyncio.gather(sc.run(), self.screen())
+
+    # -------- Trabajos -------------------------------------------------
+    def sample(self):
+        # Muestra cada SAMPLE_INTERVAL; reporte con las medias y el LAeq de la ventana
+        win = self.win
+        t,h,db,lvl = self.sensors()
+        win.add(t, h, lvl)                # nivel 0-1 en "sound", como raspberry.py
+        win.add_level(db)                 # dBA: media energetica (LAeq de la ventana)
+        if not SIMULATE: win.add_features(self.audio.features())
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.due) < 0:
+            return
+        self.due = time.ticks_add(self.due, UPDATE_INTERVAL*1000)
+        if time.ticks_diff(self.due, now) <= 0:   # reporte perdido: no encadenar
+            self.due = time.ticks_add(now, UPDATE_INTERVAL*1000)
+        t,h,lvl = win.means()
+        if t is None: t, h = self.last_t, self.last_h
+        if t is not None: t, h = round(t,1), round(h,1)
+        db  = round(win.leq(),1)
+        self.probe.begin(CLASSIFY)
+        st,val     = self.state(t,h,lvl,win.feature_means())
+        self.probe.end(CLASSIFY)
+        self.latest = (t,h,db,st,val); self.new.set()
+        audio = self.audio.report()   # pico y percentiles; cierra la ventana
+        if t is not None and self.policy.should_send(st, t, h, lvl):
+            stats = win.summary()
+            if audio is not None: stats["audio"] = audio
+            self.queue.put_nowait((st,self.measurement(t,h,db,val),t,h,lvl,db,
+                                   self.policy.take_suppressed(), stats))
+        win.reset()
+
+    async def screen(self):
         while True:
-            t,h,db,lvl = self.sensors()
-            st,val     = self.state(t,h,lvl)
-            encoded    = self.encode(t,h,db)
-            self.show(t,h,db,st,val)
-            status     = self.send(st, encoded)
-            if status not in ("ok","no_registrado"):
-                self.msg(f"ERR {status}", False)
-            for _ in range(UPDATE_INTERVAL):
-                self.led.toggle(); await asyncio.sleep(1)
-                if _%10 == 0: gc.collect()
+            await self.new.wait()
+            self.new.clear()
+            self.probe.begin(DISPLAY); self.show(*self.latest)
+            self.probe.end(DISPLAY)
+
+    async def uplink(self):
+        while len(self.queue):
+            st,m,t,h,lvl,db,sup,stats = self.queue.get_nowait()
+            self.batch.add(st, m, t, h, lvl, db, sup, stats)
+        if self.batch.due():
+            self.link = await self.flush()
+            if self.link not in ("ok","no_registrado"):
+                self.msg(f"ERR {self.link}", False)
+        elif self.link == "ok" and self.spool.pending():
+            self.link = await self.replay()
 
 # ---------------- MAIN -------------------------------------------------
 def main():
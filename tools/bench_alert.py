@@ -0,0 +1,177 @@
+"""
+bench_alert.py – latencia de las alertas inmediatas, del sonido al backend
+--------------------------------------------------------------------------
+Reproduce en tiempo real el camino de una alerta de raspberry.py:
+
+    micrófono   un bloque de 100 ms cada 100 ms por LoudnessMeter
+                (ponderación A y nivel Fast, aura.loudness)
+    detector    cada ALERT_POLL ms, EdgeDetector.update() con el nivel
+                Fast (aura.alert); si hay cruce, despierta al emisor
+    emisor      take() y HttpTransport.send_alert() por su conexión
+                keep-alive a tools/fake_backend.py (a través de un proxy
+                que añade --rtt ms de ida y vuelta, como la WiFi)
+
+La señal alterna ruido suave (~40 dBA) y fuerte (~90 dBA, Estrés) en
+ciclos de --quiet y --loud s. La latencia de cada alerta va del primer
+bloque con el cambio de nivel a la llegada al backend: incluye el bloque
+de audio, el sondeo, hold_ms, el envío y la respuesta. Para desactivar
+suma además release_ms. Falta el último salto, el evento de Socket.IO
+del backend al dashboard (en memoria en el backend y una trama de
+WebSocket por la LAN).
+
+Sale con código 1 si alguna activación supera --budget ms o si falta
+alguna alerta. El detector se crea sin cooldown ni límite por minuto:
+aquí se mide la latencia, no el límite de ritmo.
+
+Uso:
+    python tools/bench_alert.py [--cycles 5] [--rtt 20] [--budget 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import emu  # noqa: E402
+
+emu.install(fakes=False)      # ticks_* para aura.*; red y asyncio reales
+
+import fake_backend  # noqa: E402
+from bench_transport import CountingProxy, pct  # noqa: E402
+from aura.alert import EdgeDetector, HOLD_MS, RELEASE_MS  # noqa: E402
+from aura.classify import SOUND  # noqa: E402
+from aura.http import AsyncHttpClient  # noqa: E402
+from aura.loudness import LoudnessMeter, level as dba_level  # noqa: E402
+from aura.transport import HttpTransport  # noqa: E402
+
+CODE = "AURA-BENCH1"
+RATE = 16000
+BLOCK = 1600             # 100 ms, como aura.capture
+ALERT_POLL = 100         # ms, como raspberry.py
+QUIET_RMS = 3            # ~40 dBA con dbOffset 120
+LOUD_RMS = 1500          # ~90 dBA
+
+
+def block(rng, rms):
+    """Bloque PCM int16 de ruido blanco con el RMS dado."""
+    pcm = array("h", (max(-32768, min(32767, int(rng.gauss(0, rms)))) for _ in range(BLOCK)))
+    return bytearray(pcm.tobytes())
+
+
+class Bench:
+    def __init__(self, args, transport):
+        self.args = args
+        self.transport = transport
+        self.meter = LoudnessMeter()
+        self.detector = EdgeDetector(cooldown=0, burst=60)
+        self.ready = asyncio.Event()
+        self.changes = []            # (monotonic del primer bloque del cambio, True = fuerte)
+        self.running = True
+
+    async def mic(self):
+        """Un bloque cada 100 ms en tiempo real; el último ciclo termina en silencio."""
+        rng = random.Random(1)
+        quiet = [block(rng, QUIET_RMS) for _ in range(4)]
+        loud = [block(rng, LOUD_RMS) for _ in range(4)]
+        n_quiet = int(self.args.quiet * 10)
+        n_loud = int(self.args.loud * 10)
+        plan = ([False] * n_quiet + [True] * n_loud) * self.args.cycles + [False] * n_quiet
+        due = time.monotonic()
+        prev = False
+        for i, is_loud in enumerate(plan):
+            due += BLOCK / RATE
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+            buf = (loud if is_loud else quiet)[i % 4]
+            self.meter.process(buf, len(buf))
+            if is_loud != prev:
+                # El bloque que se acaba de procesar empezó hace 100 ms
+                self.changes.append((due - BLOCK / RATE, is_loud))
+                prev = is_loud
+        self.running = False
+
+    async def watch(self):
+        while self.running:
+            await asyncio.sleep(ALERT_POLL / 1000)
+            level = dba_level(self.meter.dba(self.meter.fast))
+            if self.detector.update(SOUND, level):
+                self.ready.set()
+
+    async def send(self):
+        det = self.detector
+        while self.running or det.pending():
+            try:
+                await asyncio.wait_for(self.ready.wait(), 0.5)
+            except asyncio.TimeoutError:
+                continue
+            self.ready.clear()
+            ev = det.take()
+            while ev is not None:
+                if await self.transport.send_alert(json.dumps(ev)) != 200:
+                    det.retry()
+                    break
+                ev = det.take()
+
+
+async def bench(args):
+    srv = fake_backend.make_server()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    proxy = CountingProxy(srv.server_address, args.rtt)
+    host, port = await proxy.start()
+    client = AsyncHttpClient("http://%s:%d" % (host, port), timeout=3, header_size=512)
+    header = b"x-device-code: " + CODE.encode() + b"\r\n"
+    transport = HttpTransport(client, header, client)
+    await client.request("GET", "/healthz")         # conexión fuera de la medida
+
+    b = Bench(args, transport)
+    print("%d ciclos de %.0f s suave + %.0f s fuerte, RTT añadido %.0f ms, "
+          "hold %d ms, release %d ms\n" % (args.cycles, args.quiet, args.loud, args.rtt,
+                                          HOLD_MS, RELEASE_MS))
+    await asyncio.gather(b.mic(), b.watch(), b.send())
+    await client.aclose()
+    proxy.close()
+    srv.shutdown()
+
+    got = srv.stats.alerts
+    on = [t for t, a in got if a["on"]]
+    off = [t for t, a in got if not a["on"]]
+    lat_on = [(t - c) * 1000 for (c, loud), t in zip([c for c in b.changes if c[1]], on)]
+    lat_off = [(t - c) * 1000 for (c, loud), t in zip([c for c in b.changes if not c[1]], off)]
+    print("alerta       n    p50 ms   máx ms")
+    for name, lat in (("activar", lat_on), ("desactivar", lat_off)):
+        print("{:<10} {:>3} {:>9.0f} {:>8.0f}".format(name, len(lat), pct(lat, 0.5),
+                                                     max(lat) if lat else 0))
+    ages = [a["age"] for _, a in got]
+    print("\nedad en el dispositivo (cruce -> envío): media %.0f ms, máx. %d ms; "
+          "%d peticiones en %d conexiones" % (sum(ages) / max(1, len(ages)),
+                                             max(ages or [0]), client.requests, client.connects))
+
+    ok = len(on) == args.cycles and len(off) == args.cycles
+    if not ok:
+        print("faltan alertas: %d activaciones y %d desactivaciones de %d ciclos"
+              % (len(on), len(off), args.cycles))
+    slow = [x for x in lat_on if x > args.budget]
+    if slow:
+        print("%d activaciones por encima de %d ms" % (len(slow), args.budget))
+    print("presupuesto: activar < %d ms -> %s" % (args.budget, "OK" if ok and not slow else "FALLO"))
+    return 0 if ok and not slow else 1
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--cycles", type=int, default=5, help="ciclos suave/fuerte")
+    ap.add_argument("--quiet", type=float, default=5, help="s de ruido suave por ciclo")
+    ap.add_argument("--loud", type=float, default=2, help="s de ruido fuerte por ciclo")
+    ap.add_argument("--rtt", type=float, default=20, help="ms de ida y vuelta añadidos")
+    ap.add_argument("--budget", type=float, default=1000, help="ms máximos para activar")
+    sys.exit(asyncio.run(bench(ap.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+bench_boot.py – arranque del firmware: compilar fuente frente a bytecode
+------------------------------------------------------------------------
+Mide en el host, con tools/emu, lo que cuesta arrancar raspberry.py y
+raspberry_defsim.py hasta tener AuraDevice() construido (importar el
+firmware y aura/, crear buffers, pantalla y sensores):
+
+    fuente     cada import compila el .py (como copiar aura/*.py a la Pico)
+    bytecode   los módulos llegan compilados (.pyc de CPython, el análogo
+               de los .mpy de tools/build_mpy.py o del firmware congelado)
+
+Cada medida es un proceso nuevo (python -B -X pycache_prefix=...), así
+que no se cuela nada ya importado. De cada caso da la mediana del tiempo
+y el pico de memoria (tracemalloc, en una pasada aparte porque ralentiza
+la compilación), y además qué módulos de aura/ se cargan al arrancar,
+los bytes de su fuente y, si hay mpy-cross, los de sus .mpy (lo que la
+Pico tiene que leer de flash).
+
+Los tiempos y el heap son de CPython: sirven para comparar casos entre
+sí (y antes/después de un cambio), no como cifras absolutas de la Pico.
+
+Uso:
+    python tools/bench_boot.py [raspberry raspberry_defsim] [--repeat 7]
+        [--set SIMULATE=False]
+"""
+
+import argparse
+import ast
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TOOLS)
+
+
+def child(name, trace, sets):
+    """Arranque medido en este proceso; imprime una línea JSON."""
+    sys.path.insert(0, TOOLS)
+    import importlib
+    import emu
+    emu.install()
+    for mod in emu._STDLIB + emu._FAKES:       # fuera de la medida
+        importlib.import_module(mod)
+    os.chdir(tempfile.mkdtemp(prefix="aura-flash-"))
+    import tracemalloc
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    mod = emu.load(name)
+    t1 = time.perf_counter()
+    for item in sets:
+        key, value = item.split("=", 1)
+        setattr(mod, key, ast.literal_eval(value))
+    mod.AuraDevice()
+    t2 = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    loaded = sorted(m for m in sys.modules if m == "aura" or m.startswith("aura."))
+    files = [os.path.relpath(sys.modules[m].__file__, ROOT) for m in loaded]
+    print(json.dumps({"import_ms": (t1 - t0) * 1000, "boot_ms": (t2 - t0) * 1000,
+                      "peak": peak, "files": [name + ".py"] + files}))
+
+
+def spawn(name, cache, write, trace, sets):
+    cmd = [sys.executable]
+    if not write:
+        cmd.append("-B")
+    cmd += ["-X", "pycache_prefix=" + cache, os.path.abspath(__file__),
+            "--child", name] + ["--set=" + s for s in sets]
+    if trace:
+        cmd.append("--trace")
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)     # -B decide si se escribe
+    out = subprocess.run(cmd, cwd=ROOT, env=env, check=True, capture_output=True,
+                         text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def median(values):
+    s = sorted(values)
+    return s[len(s) // 2]
+
+
+def mpy_sizes(files):
+    """Bytes de cada fichero compilado con mpy-cross (None si no está)."""
+    exe = shutil.which("mpy-cross")
+    if exe is None:
+        return None
+    out = tempfile.mkdtemp(prefix="aura-mpy-")
+    total = 0
+    for f in files:
+        dst = os.path.join(out, f.replace(os.sep, "_") + ".mpy")
+        subprocess.run([exe, "-march=armv6m", "-o", dst, os.path.join(ROOT, f)], check=True)
+        total += os.path.getsize(dst)
+    shutil.rmtree(out)
+    return total
+
+
+def bench(name, repeat, sets):
+    warm = tempfile.mkdtemp(prefix="aura-warm-")
+    spawn(name, warm, True, False, sets)                # llena la caché .pyc
+    # Misma caché sin los .pyc del repo: la biblioteca estándar sigue
+    # compilada y solo el firmware y aura/ se compilan desde la fuente
+    cold = tempfile.mkdtemp(prefix="aura-cold-")
+    shutil.rmtree(cold)
+    shutil.copytree(warm, cold)
+    shutil.rmtree(cold + ROOT)
+    rows = []
+    for label, cache in (("fuente", cold), ("bytecode", warm)):
+        runs = [spawn(name, cache, False, False, sets) for _ in range(repeat)]
+        traced = spawn(name, cache, False, True, sets)
+        rows.append((label, median([r["import_ms"] for r in runs]),
+                     median([r["boot_ms"] for r in runs]), traced["peak"]))
+    shutil.rmtree(cold)
+    shutil.rmtree(warm)
+    files = traced["files"]
+    src = sum(os.path.getsize(os.path.join(ROOT, f)) for f in files)
+    mpy = mpy_sizes(files)
+    print("%s: %d módulos de aura/ al arrancar, fuente %.1f KB%s" % (
+        name, len(files) - 1, src / 1024,
+        ", .mpy %.1f KB" % (mpy / 1024) if mpy is not None else " (sin mpy-cross)"))
+    print("  " + " ".join(f.replace("aura/", "").replace(".py", "") for f in files[1:]))
+    for label, imp, boot, peak in rows:
+        print("  {:<9} import {:>6.1f} ms   hasta AuraDevice() {:>6.1f} ms   pico {:>6.0f} KB".format(
+            label, imp, boot, peak / 1024))
+    return files
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("modules", nargs="*", default=["raspberry", "raspberry_defsim"])
+    ap.add_argument("--repeat", type=int, default=7, help="procesos por caso (mediana)")
+    ap.add_argument("--set", action="append", default=[], help="CONSTANTE=valor del firmware")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(args.child, args.trace, args.set)
+        return
+    for name in args.modules:
+        bench(name, args.repeat, args.set)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+bench_classify.py – benchmark de host para aura.classify
+--------------------------------------------------------
+Comprueba que aura.classify.Classifier toma exactamente las mismas
+decisiones (estado y valor) que las dos cadenas de if originales
+(raspberry.py determine_state y raspberry_defsim.py state) y compara
+tiempos: lectura a lectura y con classify_many sobre arrays.
+
+PICO y DEFSIM se clasifican con su cadena de if (Classifier._pico y
+_defsim); también se comprueba que esa ruta coincide con la tabla
+compilada (la que usa cualquier otro perfil), con rasgos de
+aura.spectrum aleatorios y con lecturas NaN, y se mide la tabla aparte.
+
+Las lecturas incluyen todos los umbrales exactos (27, 19, 0.7...) para
+ejercitar los límites estrictos e inclusivos.
+
+Uso:
+    python tools/bench_classify.py [--readings 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aura.classify import (Classifier, PICO, DEFSIM, RULES_PICO, RULES_DEFSIM,  # noqa: E402
+                           compile_rules)
+from aura.spectrum import NFEAT  # noqa: E402
+from aura.states import STATES, STATES_ASCII  # noqa: E402
+
+
+def legacy_pico(temp, hum, sound_level):
+    """Copia de AuraDevice.determine_state (raspberry.py) sin last_state."""
+    if sound_level > 0.7:
+        return "Estrés", sound_level
+    if temp > 27:
+        return "Incomodidad", min(1.0, (temp - 22) / 8)
+    if temp < 19:
+        return "Incomodidad", min(1.0, (20 - temp) / 5)
+    if hum > 70:
+        return "Incomodidad", min(1.0, (hum - 60) / 20)
+    if hum < 30:
+        return "Incomodidad", min(1.0, (40 - hum) / 15)
+    if 22 <= temp <= 26 and 40 <= hum <= 60 and sound_level < 0.2:
+        return "Confort", 1.0 - sound_level
+    if sound_level < 0.1:
+        return "Expectativa", 1.0 - sound_level
+    if 0.3 < sound_level < 0.6 and 20 <= temp <= 27:
+        return "Energía", sound_level + (1 - abs(temp - 23.5) / 6)
+    comfort_factor = 1.0 - (abs(temp - 23) / 8) - (abs(hum - 50) / 30) - sound_level
+    return "Calma", max(0.1, min(1.0, comfort_factor))
+
+
+def legacy_defsim(t, h, lvl):
+    """Copia de AuraDevice.state (raspberry_defsim.py) sin el caso None."""
+    if lvl > 0.7:                        return "Estres",       lvl  # noqa: E701
+    if t>27 or t<19 or h>70 or h<30:     return "Incomodidad",  0.8  # noqa: E701
+    if 22<=t<=26 and 40<=h<=60 and lvl<0.2: return "Confort", 1-lvl  # noqa: E701
+    if lvl < 0.1:                        return "Expectativa",  1-lvl  # noqa: E701
+    if 0.3 < lvl < 0.6:                  return "Energia",      lvl  # noqa: E701
+    return "Calma", max(0.1,1-abs(t-23)/8-abs(h-50)/30-lvl)
+
+
+def readings(count, seed=1):
+    rnd = random.Random(seed)
+    temps_edge = (19, 20, 22, 26, 27, 19.0, 27.0, 18.9, 27.1)
+    hums_edge = (30, 40, 60, 70, 29.9, 70.1)
+    sounds_edge = (0.1, 0.2, 0.3, 0.6, 0.7, 0.0, 1.0)
+    t, h, s = [], [], []
+    for _ in range(count):
+        t.append(rnd.choice(temps_edge) if rnd.random() < 0.2 else
+                 round(rnd.uniform(12, 34), rnd.choice((0, 1))))
+        h.append(rnd.choice(hums_edge) if rnd.random() < 0.2 else
+                 round(rnd.uniform(15, 90), rnd.choice((0, 1))))
+        s.append(rnd.choice(sounds_edge) if rnd.random() < 0.2 else rnd.random())
+    return t, h, s
+
+
+def check(legacy, table, names, t, h, s):
+    c = Classifier(table)
+    bad = 0
+    for i in range(len(t)):
+        name, value = legacy(t[i], h[i], s[i])
+        idx = c.classify(t[i], h[i], s[i])
+        if names[idx] != name or c.value != value:
+            bad += 1
+            if bad <= 5:
+                print("  DIFERENCIA", t[i], h[i], s[i], (name, value), (names[idx], c.value))
+    states, values = c.classify_many(array("d", t), array("d", h), array("d", s))
+    for i in range(len(t)):
+        name, value = legacy(t[i], h[i], s[i])
+        if names[states[i]] != name or values[i] != value:
+            bad += 1
+    return bad
+
+
+def same(a, b):
+    return a == b or a != a and b != b
+
+
+def check_table(table, rules, t, h, s, seed=2):
+    """Cadena de if frente a la tabla compilada, con rasgos y NaN."""
+    rnd = random.Random(seed)
+    nan = float("nan")
+    fast = Classifier(table)
+    slow = Classifier(compile_rules(rules))     # otra tabla: sin cadena de if
+    bad = 0
+    for i in range(len(t)):
+        f = None if rnd.random() < 0.3 else [rnd.random() for _ in range(NFEAT)]
+        x = [t[i], h[i], s[i]]
+        if rnd.random() < 0.05:
+            x[rnd.randrange(3)] = nan
+        a = fast.classify(x[0], x[1], x[2], f)
+        b = slow.classify(x[0], x[1], x[2], f)
+        if a != b or not same(fast.value, slow.value):
+            bad += 1
+            if bad <= 5:
+                print("  DIFERENCIA tabla", x, f, (a, fast.value), (b, slow.value))
+    return bad
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--readings", type=int, default=100000)
+    args = ap.parse_args()
+    t, h, s = readings(args.readings)
+    at, ah, as_ = array("d", t), array("d", h), array("d", s)
+    n = len(t)
+
+    for label, legacy, table, rules, names in (
+            ("pico", legacy_pico, PICO, RULES_PICO, STATES),
+            ("defsim", legacy_defsim, DEFSIM, RULES_DEFSIM, STATES_ASCII)):
+        bad = check(legacy, table, names, t, h, s)
+        bad += check_table(table, rules, t, h, s)
+        c = Classifier(table)
+        g = Classifier(compile_rules(rules))
+        rows = (
+            ("if (original)", timed(lambda: [legacy(t[i], h[i], s[i]) for i in range(n)])),
+            ("classify", timed(lambda: [c.classify(t[i], h[i], s[i]) for i in range(n)])),
+            ("classify_many", timed(lambda: c.classify_many(at, ah, as_))),
+            ("tabla", timed(lambda: [g.classify(t[i], h[i], s[i]) for i in range(n)])),
+        )
+        print("%s: %d lecturas, diferencias=%d" % (label, n, bad))
+        for name, secs in rows:
+            print("  %-14s %8.1f ms  %6.2f us/lectura" % (name, secs * 1000, secs * 1e6 / n))
+        if bad:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
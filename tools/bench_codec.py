@@ -0,0 +1,146 @@
+"""
+bench_codec.py – benchmark de host para aura.codec
+--------------------------------------------------
+Compara el empaquetado decimal XXXYYYZZZ (encode/decode) con el registro
+binario de 18 bytes (pack_into, unpack_from, unpack_many) sobre las
+mismas lecturas:
+
+- ida y vuelta: el registro binario debe devolver cada canal con su
+  resolución (0,01; nivel 0,0001), también >= 100.0, negativos y sin
+  dato; del decimal se cuenta cuántas lecturas pierde (vuelta a 100.0);
+- rendimiento: us por lectura al codificar y al decodificar, y la
+  decodificación por columnas de un relleno de miles de registros;
+- tamaño en el JSON del envío por lectura.
+
+Sale con código 1 si alguna ida y vuelta binaria falla.
+
+Uso:
+    python tools/bench_codec.py [--records 20000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aura import codec  # noqa: E402
+from aura.states import STATES  # noqa: E402
+
+
+def readings(count, seed=1):
+    """(seq, ts, estado, t, h, dB, nivel) con casos límite al principio."""
+    edge = [
+        (1, 0, 0, 22.3, 41.5, 37.2, 0.5),
+        (2, 1760000000, 3, 100.0, 100.0, 100.0, 1.0),
+        (3, 1760000010, 8, -12.75, 0.0, 123.45, 0.0),
+        (4, 1760000020, 255, None, None, None, None),
+        (5, 1760000030, 2, 327.67, 655.34, -0.5, 6.5534),
+        (0xFFFFFFFF, 0xFFFFFFFF, 1, -327.67, 99.99, 327.67, 0.0001),
+    ]
+    rnd = random.Random(seed)
+    out = edge[:]
+    for k in range(len(edge), count):
+        out.append((k + 1, 1760000000 + 10 * k, rnd.randrange(len(STATES)),
+                    round(rnd.uniform(-10, 45), 2), round(rnd.uniform(0, 100), 2),
+                    round(rnd.uniform(25, 120), 2), round(rnd.uniform(0, 1), 4)))
+    return out
+
+
+def close(a, b, tol):
+    return a is None and b is None or a is not None and b is not None and abs(a - b) <= tol
+
+
+def check_roundtrip(rows):
+    buf = bytearray(codec.RECORD_SIZE * len(rows))
+    off = 0
+    for r in rows:
+        off = codec.pack_into(buf, off, *r)
+    bad = 0
+    tols = (0, 0, 0, 0.005, 0.005, 0.005, 0.00005)
+    for k, r in enumerate(rows):
+        got = codec.unpack_from(buf, k * codec.RECORD_SIZE)
+        if not all(close(a, b, t) for a, b, t in zip(r, got, tols)):
+            bad += 1
+            if bad <= 5:
+                print("  FALLO binario", r, "->", got)
+    # Por columnas: mismos enteros que registro a registro
+    cols = codec.unpack_many(codec.b64decode(codec.b64encode(buf)))
+    names = [f[0] for f in codec.FIELDS[1:]]
+    for k in range(len(rows)):
+        raw = codec.struct.unpack_from(codec.RECORD, buf, k * codec.RECORD_SIZE)[1:]
+        if raw != tuple(cols[n][k] for n in names):
+            bad += 1
+            if bad <= 5:
+                print("  FALLO columnas en", k)
+    lost = 0
+    for r in rows:
+        if r[3] is None:
+            continue
+        t, h, db = codec.decode(codec.encode(r[3], r[4], r[5]))
+        if not (close(t, r[3], 0.05) and close(h, r[4], 0.05) and close(db, r[5], 0.05)):
+            lost += 1
+    return bad, lost, buf
+
+
+def timed(label, func, repeat, count):
+    func()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - t0) / repeat
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<34} {:>8.3f} us/lectura  {:>9.1f} ms  pico heap {:>9} B".format(
+        label, elapsed / count * 1e6, elapsed * 1e3, peak))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--records", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    rows = readings(args.records)
+    n = len(rows)
+    print("%d lecturas, registro de %d bytes (versión %d)\n" % (n, codec.RECORD_SIZE, codec.VERSION))
+
+    bad, lost, buf = check_roundtrip(rows)
+    print("ida y vuelta binaria: %s" % ("OK" if not bad else "%d FALLOS" % bad))
+    print("ida y vuelta XXXYYYZZZ: %d de %d lecturas alteradas (>= 100.0, negativos)\n"
+          % (lost, sum(r[3] is not None for r in rows)))
+
+    legacy_rows = [r for r in rows if r[3] is not None]
+    legacy = [codec.encode(r[3], r[4], r[5]) for r in legacy_rows]
+    out = bytearray(len(buf))
+    b64 = codec.b64encode(buf)
+    data = codec.b64decode(b64)
+
+    def pack_all():
+        off = 0
+        for r in rows:
+            off = codec.pack_into(out, off, *r)
+
+    timed("encode XXXYYYZZZ", lambda: [codec.encode(r[3], r[4], r[5]) for r in legacy_rows],
+          args.repeat, len(legacy_rows))
+    timed("pack_into (buffer preasignado)", pack_all, args.repeat, n)
+    timed("decode XXXYYYZZZ", lambda: [codec.decode(v) for v in legacy], args.repeat, len(legacy))
+    timed("decode_many (unpack_from)", lambda: codec.decode_many(data), args.repeat, n)
+    timed("unpack_many (columnas)", lambda: codec.unpack_many(data), args.repeat, n)
+    timed("b64decode + unpack_many", lambda: codec.unpack_many(codec.b64decode(b64)),
+          args.repeat, n)
+
+    dec = sum(len(json.dumps(v)) + 1 for v in legacy) / len(legacy)
+    print("\nJSON por lectura: XXXYYYZZZ %.1f B (3 canales)  base64 %.1f B (7 campos)"
+          % (dec, len(b64) / n))
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+bench_level.py – benchmark de host para aura.level
+--------------------------------------------------
+Compara el cálculo de nivel original de AudioSensor.read_level
+(slice + struct.unpack + generador) con aura.level.LevelMeter sobre los
+mismos buffers de 100 ms (1600 muestras int16 a 16 kHz).
+
+Uso:
+    python tools/bench_level.py                  # buffers sintéticos
+    python tools/bench_level.py grabacion.wav    # buffers de un WAV mono 16 bits
+"""
+
+import argparse
+import math
+import os
+import random
+import struct
+import sys
+import time
+import tracemalloc
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aura import level as aura_level  # noqa: E402
+from aura.level import LevelMeter  # noqa: E402
+
+WINDOW_BYTES = 1600 * 2
+
+
+def legacy_level(buffer, bytes_read):
+    """Copia literal del cálculo de raspberry.py antes de aura.level."""
+    samples = struct.unpack("<{}h".format(bytes_read // 2), buffer[:bytes_read])
+    sum_squares = sum(sample * sample for sample in samples)
+    rms = math.sqrt(sum_squares / len(samples))
+    return min(1.0, rms / 10000)
+
+
+def synthetic_windows(count, seed=1):
+    """Ventanas deterministas: silencio, voz (tonos + ruido) y golpes."""
+    rnd = random.Random(seed)
+    windows = []
+    for w in range(count):
+        amp = (200, 3000, 12000, 30000)[w % 4]
+        freq = 180 + 40 * (w % 7)
+        data = bytearray(WINDOW_BYTES)
+        for i in range(WINDOW_BYTES // 2):
+            v = amp * math.sin(2 * math.pi * freq * i / 16000) + rnd.gauss(0, amp / 10)
+            struct.pack_into("<h", data, 2 * i, max(-32768, min(32767, int(v))))
+        windows.append(data)
+    return windows
+
+
+def wav_windows(path):
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise SystemExit("Se necesita un WAV mono de 16 bits")
+        raw = wav.readframes(wav.getnframes())
+    return [bytearray(raw[i:i + WINDOW_BYTES])
+            for i in range(0, len(raw) - WINDOW_BYTES + 1, WINDOW_BYTES)]
+
+
+def run(label, func, windows, repeat):
+    func(windows[0])
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for w in windows:
+            func(w)
+    elapsed = time.perf_counter() - t0
+    # Memoria en una pasada aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    for w in windows:
+        func(w)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    calls = repeat * len(windows)
+    print("{:<22} {:>9.1f} us/ventana  pico heap {:>7} B".format(
+        label, elapsed / calls * 1e6, peak))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("wav", nargs="?", help="WAV mono 16 bits a 16 kHz")
+    ap.add_argument("-n", "--windows", type=int, default=40)
+    ap.add_argument("-r", "--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    windows = wav_windows(args.wav) if args.wav else synthetic_windows(args.windows)
+    if not windows:
+        raise SystemExit("No hay ventanas completas de 100 ms")
+
+    # Un medidor por buffer, como en AudioSensor (buffer preasignado)
+    meters = {id(w): LevelMeter(w) for w in windows}
+    bytes_meters = {}
+    for w in windows:
+        m = LevelMeter(w)
+        m._accumulate = aura_level._accumulate_bytes
+        bytes_meters[id(w)] = m
+
+    for w in windows:
+        ref = legacy_level(w, len(w))
+        for m in (meters[id(w)], bytes_meters[id(w)]):
+            m.measure(len(w))
+            if abs(m.level() - ref) > 1e-9:
+                raise SystemExit("Resultado distinto: {} != {}".format(m.level(), ref))
+
+    print("{} ventanas x {} repeticiones".format(len(windows), args.repeat))
+    run("original (struct)", lambda w: legacy_level(w, len(w)), windows, args.repeat)
+    run("LevelMeter (view)", lambda w: meters[id(w)].measure(len(w)), windows, args.repeat)
+    run("LevelMeter (bytes)", lambda w: bytes_meters[id(w)].measure(len(w)), windows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+bench_loudness.py – verificación y benchmark de host para aura.loudness
+-----------------------------------------------------------------------
+Genera tonos puros de nivel conocido, los pasa por LoudnessMeter en
+bloques de 100 ms (1600 muestras a 16 kHz, con el estado del filtro
+entre bloques) y compara los dBA medidos con la curva A de IEC 61672.
+También comprueba que aura._loudness_viper da los mismos enteros que
+el núcleo en Python puro (en CPython, con ptrN simulados) y mide el
+tiempo de CPU por bloque.
+
+Uso:
+    python tools/bench_loudness.py [--dbfs -20] [--tolerance 0.5]
+"""
+
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aura import loudness  # noqa: E402
+from aura.loudness import LoudnessMeter  # noqa: E402
+from bench_spectrum import viper_shim  # noqa: E402
+
+RATE = 16000
+BLOCK = 1600
+FREQS = (31.5, 63, 125, 250, 500, 1000, 2000, 4000, 6300, 7500)
+
+
+def a_weight(f):
+    """Ganancia A en dB (IEC 61672, analítica)."""
+    f2 = f * f
+    ra = (12194.217 ** 2 * f2 * f2) / (
+        (f2 + 20.598997 ** 2)
+        * math.sqrt((f2 + 107.65265 ** 2) * (f2 + 737.86223 ** 2))
+        * (f2 + 12194.217 ** 2))
+    return 20 * math.log10(ra) + 2.0
+
+
+def tone_blocks(freq, dbfs, blocks):
+    """Bloques int16 de un seno de `dbfs` (RMS respecto al fondo de escala)."""
+    amp = 32768 * math.sqrt(2) * 10 ** (dbfs / 20)
+    out = []
+    for b in range(blocks):
+        data = bytearray(2 * BLOCK)
+        for i in range(BLOCK):
+            v = amp * math.sin(2 * math.pi * freq * (b * BLOCK + i) / RATE)
+            struct.pack_into("<h", data, 2 * i, max(-32768, min(32767, int(round(v)))))
+        out.append(data)
+    return out
+
+
+def measure(meter, blocks, settle=3):
+    """LAeq de los bloques tras `settle` bloques de estabilización del filtro."""
+    meter.reset()
+    energy = 0.0
+    for i, buf in enumerate(blocks):
+        ms = meter.process(buf, len(buf))
+        if i >= settle:
+            energy += ms
+    return meter.dba(energy / (len(blocks) - settle))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dbfs", type=float, default=-20, help="nivel RMS de los tonos")
+    ap.add_argument("--blocks", type=int, default=8, help="bloques de 100 ms por tono")
+    ap.add_argument("--tolerance", type=float, default=0.5, help="dB de error admitido")
+    ap.add_argument("-r", "--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    if args.dbfs > -3.02:
+        raise SystemExit("Un seno no pasa de -3,01 dBFS RMS sin recortar")
+    meter = LoudnessMeter(offset=0.0)        # dBA = dBFS ponderados
+    worst = 0.0
+    print("%8s %9s %9s %7s" % ("Hz", "esperado", "medido", "error"))
+    tones = {}
+    for f in FREQS:
+        blocks = tone_blocks(f, args.dbfs, args.blocks)
+        tones[f] = blocks
+        expected = args.dbfs + a_weight(f)
+        got = measure(meter, blocks)
+        err = got - expected
+        worst = max(worst, abs(err))
+        print("%8.1f %9.2f %9.2f %+7.2f" % (f, expected, got, err))
+    print("error máx. %.2f dB" % worst)
+    if worst > args.tolerance:
+        raise SystemExit("Fuera de tolerancia (%.2f dB)" % args.tolerance)
+
+    # Mismo resultado partiendo el tono en bloques de otro tamaño (estado entre bloques)
+    whole = b"".join(tones[1000])
+    meter.reset()
+    meter.process(whole, len(whole))
+    ref = (meter._out[0], meter._out[1])
+    meter.reset()
+    lo = hi = 0
+    for i in range(0, len(whole), 2 * 400):
+        meter.process(whole[i:i + 800], 800)
+        lo += meter._out[0]
+        hi += meter._out[1]
+    if (hi << 30) + lo != (ref[1] << 30) + ref[0]:
+        raise SystemExit("El estado entre bloques no se conserva")
+
+    # Ruta viper con ptrN simulados: mismos enteros
+    mod = viper_shim("aura._loudness_viper")
+    for f in (63, 1000, 6300):
+        a = LoudnessMeter()
+        b = LoudnessMeter()
+        for buf in tones[f][:2]:
+            a.process(buf, len(buf))
+            loudness._weight, py = mod.weight, loudness._weight
+            try:
+                b.process(buf, len(buf))
+            finally:
+                loudness._weight = py
+            if a.mean_square != b.mean_square or list(a.state) != list(b.state):
+                raise SystemExit("viper distinto de Python a %s Hz" % f)
+    print("viper (simulado)   idéntico a Python")
+
+    blocks = tones[1000]
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for buf in blocks:
+            meter.process(buf, len(buf))
+    per = (time.perf_counter() - t0) / (args.repeat * len(blocks))
+    print("process            %8.1f us/bloque de 100 ms (%.1f%% del tiempo real, CPython)"
+          % (per * 1e6, per * 1e6 / 1000))
+
+
+if __name__ == "__main__":
+    main()
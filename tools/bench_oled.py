@@ -0,0 +1,132 @@
+"""
+bench_oled.py – tráfico I2C de la OLED: refresco completo vs aura.screen
+------------------------------------------------------------------------
+Reproduce la secuencia de pantallas del dispositivo (mensajes de arranque,
+intentos de WiFi y una serie de lecturas de sensores) con el driver
+SSD1306 falso de tools/emu y cuenta los bytes enviados por I2C:
+
+  legacy  fill(0) + text() + show() como raspberry.py antes de aura.screen
+  screen  aura.screen.Screen (campos, páginas sucias, límite de refrescos)
+
+Uso:
+    python tools/bench_oled.py [--readings 360] [--freq 400000]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import emu  # noqa: E402
+
+emu.install()
+
+from machine import I2C  # noqa: E402
+from ssd1306 import SSD1306_I2C  # noqa: E402
+
+from aura.screen import Screen  # noqa: E402
+# Mismos layouts que raspberry.py (importarlo exige network, dht...)
+MESSAGE_LAYOUT = (
+    ("l0", 0, 0, 16), ("l1", 0, 10, 16), ("l2", 0, 20, 16),
+    ("l3", 0, 30, 16), ("l4", 0, 40, 16), ("foot", 0, 54, 16),
+)
+SENSOR_LAYOUT = (
+    ("th", 0, 0, 16), ("sound", 0, 10, 16), ("label", 0, 25, 16),
+    ("state", 20, 35, 13), ("value", 0, 45, 16), ("foot", 0, 54, 16),
+)
+FOOT = "AURA-0001"
+STATES = ("Calma", "Alegría", "Tristeza", "Enojo", "Estrés", "Neutral")
+
+
+def script(readings, seed=1):
+    """Secuencia de pantallas: ("msg", texto) o ("sensor", t, h, s, estado, valor)."""
+    rnd = random.Random(seed)
+    out = [("msg", "Iniciando AURA...\nWiFi..."), ("msg", "Conectando WiFi\nMiRed")]
+    for i in range(1, 4):
+        out.append(("attempt", i))
+    out += [("msg", "WiFi OK\n192.168.1.50"), ("msg", "Obteniendo\nconfiguración...")]
+    t, h, s = 22.0, 45.0, 0.2
+    for _ in range(readings):
+        t = round(min(35, max(10, t + rnd.choice((-0.5, 0, 0, 0.5)))), 1)
+        h = round(min(90, max(20, h + rnd.choice((-1, 0, 0, 1)))), 1)
+        s = min(1.0, max(0.0, s + rnd.uniform(-0.05, 0.05)))
+        st = STATES[int(s * 5.99)] if rnd.random() < 0.3 else STATES[0]
+        out.append(("sensor", t, h, s, st, round(s * 2.5, 2)))
+    return out
+
+
+def legacy(display, steps):
+    lines = []
+    for step in steps:
+        display.fill(0)
+        if step[0] == "sensor":
+            _, t, h, s, st, val = step
+            display.text(f"T:{t}C  H:{h}%", 0, 0)
+            display.text(f"Sound: {s:.2f}", 0, 10)
+            display.text("Estado:", 0, 25)
+            display.text(f"> {st}", 20, 35)
+            display.text(f"Valor: {val:.2f}", 0, 45)
+        else:
+            if step[0] == "msg":
+                lines = step[1].split("\n")
+            else:
+                lines = lines[:2] + [f"Intento {step[1]}/20"]
+            for i, line in enumerate(lines):
+                display.text(line, 0, i * 10)
+        display.text(FOOT, 0, 54)
+        display.show()
+
+
+def with_screen(display, steps):
+    screen = Screen(display, min_interval_ms=0)
+    for step in steps:
+        if step[0] == "sensor":
+            _, t, h, s, st, val = step
+            screen.layout(SENSOR_LAYOUT)
+            screen.set("th", f"T:{t}C  H:{h}%")
+            screen.set("sound", f"Sound: {s:.2f}")
+            screen.set("label", "Estado:")
+            screen.set("state", f"> {st}")
+            screen.set("value", f"Valor: {val:.2f}")
+            screen.set("foot", FOOT)
+        elif step[0] == "msg":
+            lines = (step[1].split("\n") + [""] * 5)[:5] + [FOOT]
+            screen.lines(MESSAGE_LAYOUT, lines)
+        else:
+            screen.set("l2", f"Intento {step[1]}/20")
+        screen.flush()
+    return screen
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--readings", type=int, default=360)
+    ap.add_argument("--freq", type=int, default=400000, help="frecuencia I2C en Hz")
+    args = ap.parse_args()
+    steps = script(args.readings)
+
+    results = []
+    for name in ("legacy", "screen"):
+        i2c = I2C(0, freq=args.freq)
+        display = SSD1306_I2C(128, 64, i2c)
+        base_bytes, base_tx = i2c.bytes_written, i2c.transactions
+        if name == "legacy":
+            legacy(display, steps)
+        else:
+            with_screen(display, steps)
+        sent = i2c.bytes_written - base_bytes
+        results.append((name, sent, i2c.transactions - base_tx,
+                        sent * 9 * 1000 / args.freq))
+
+    print("%d pantallas, I2C a %d kHz" % (len(steps), args.freq // 1000))
+    print("%-8s %12s %14s %12s %14s" % ("", "bytes", "transacciones", "bus ms", "bytes/pantalla"))
+    for name, sent, tx, ms in results:
+        print("%-8s %12d %14d %12.1f %14.1f" % (name, sent, tx, ms, sent / len(steps)))
+    print("reducción: %.1fx" % (results[0][1] / max(1, results[1][1])))
+
+
+if __name__ == "__main__":
+    main()
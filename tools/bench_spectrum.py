@@ -0,0 +1,206 @@
+"""
+bench_spectrum.py – benchmark de host para aura.spectrum
+--------------------------------------------------------
+Mide el tiempo de CPU por ventana de 100 ms (1600 muestras int16 a
+16 kHz) de SpectrumAnalyzer.analyze() y comprueba:
+
+- que las fracciones de banda y la planitud en coma fija coinciden con
+  una referencia en coma flotante (misma ventana y mismos tramos);
+- que aura._spectrum_viper da exactamente los mismos enteros que el
+  núcleo en Python puro (se ejecuta en CPython con ptr8/16/32 simulados:
+  sus tiempos no dicen nada del RP2040, solo su aritmética).
+
+Uso:
+    python tools/bench_spectrum.py                  # señales sintéticas
+    python tools/bench_spectrum.py grabacion.wav    # ventanas de un WAV mono 16 bits
+"""
+
+import argparse
+import cmath
+import importlib
+import math
+import os
+import random
+import struct
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aura import spectrum  # noqa: E402
+from aura.level import LevelMeter  # noqa: E402
+from aura.spectrum import SpectrumAnalyzer, FEATURES, FLAT  # noqa: E402
+
+WINDOW_SAMPLES = 1600
+RATE = 16000
+
+
+def synth(kind, amp, rnd):
+    """Ventana sintética de un tipo de sonido."""
+    data = bytearray(2 * WINDOW_SAMPLES)
+    f0 = rnd.uniform(110, 220)
+    for i in range(WINDOW_SAMPLES):
+        t = i / RATE
+        if kind == "zumbido":
+            v = math.sin(2 * math.pi * 100 * t) + 0.3 * math.sin(2 * math.pi * 200 * t)
+        elif kind == "voz":
+            # Armónicos con formantes (~500, 1500 Hz) y algo de ruido
+            v = sum(math.sin(2 * math.pi * f0 * k * t) / (1 + abs(f0 * k - 500) / 300
+                                                          + abs(f0 * k - 1500) / 900)
+                    for k in range(1, 20)) + rnd.gauss(0, 0.05)
+        elif kind == "ruido":
+            v = rnd.gauss(0, 0.5)
+        else:  # agudo
+            v = math.sin(2 * math.pi * 6000 * t) + rnd.gauss(0, 0.05)
+        struct.pack_into("<h", data, 2 * i, max(-32768, min(32767, int(amp * v))))
+    return data
+
+
+def synthetic_windows(count, seed=1):
+    rnd = random.Random(seed)
+    kinds = ("zumbido", "voz", "ruido", "agudo")
+    return [(kinds[w % 4], synth(kinds[w % 4], (300, 3000, 12000)[w // 4 % 3], rnd))
+            for w in range(count)]
+
+
+def wav_windows(path):
+    import wave
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise SystemExit("Se necesita un WAV mono de 16 bits")
+        raw = wav.readframes(wav.getnframes())
+    step = 2 * WINDOW_SAMPLES
+    return [("wav", bytearray(raw[i:i + step])) for i in range(0, len(raw) - step + 1, step)]
+
+
+def reference(an, buf):
+    """Los mismos rasgos con DFT en coma flotante (sin escalados ni Q15)."""
+    n = an.n
+    count = len(buf) // 2
+    samples = struct.unpack("<%dh" % count, buf)
+    half = n // 2
+    acc = [0.0] * half
+    for f in range(an.frames):
+        off = f * (count - n) // (an.frames - 1) if an.frames > 1 else 0
+        x = [samples[off + i] * (0.5 - 0.5 * math.cos(2 * math.pi * i / n)) for i in range(n)]
+        for k in range(1, half):
+            w = cmath.exp(-2j * math.pi * k / n)
+            z = sum(x[i] * w ** i for i in range(n))
+            acc[k] += abs(z) ** 2
+    total = sum(acc[1:])
+    if not total:
+        return None
+    out = []
+    for b in range(3):
+        out.append(sum(acc[an.bands[2 * b]:an.bands[2 * b + 1]]) / total)
+    bins = half - 1
+    logs = sum(math.log(p) for p in acc[1:] if p > 0) / bins
+    out.append(min(1.0, math.exp(logs) / (total / bins)))
+    return out
+
+
+def viper_shim(name="aura._spectrum_viper"):
+    """Importa un módulo viper de aura/ en CPython con micropython/ptrN simulados."""
+    sys.modules.setdefault("micropython", types.SimpleNamespace(viper=lambda f: f))
+    mod = importlib.import_module(name)
+
+    class Ptr:
+        def __init__(self, obj, size):
+            self.mv = memoryview(obj).cast("B")
+            self.size = size
+
+        def __getitem__(self, i):
+            s = self.size
+            v = int.from_bytes(self.mv[i * s:(i + 1) * s], "little")
+            if s == 4 and v & 0x80000000:
+                v -= 1 << 32          # int de viper: palabra con signo
+            return v
+
+        def __setitem__(self, i, v):
+            s = self.size
+            self.mv[i * s:(i + 1) * s] = (v & ((1 << 8 * s) - 1)).to_bytes(s, "little")
+
+    mod.ptr8 = lambda o: Ptr(o, 1)
+    mod.ptr16 = lambda o: Ptr(o, 2)
+    mod.ptr32 = lambda o: Ptr(o, 4)
+    return mod
+
+
+def check_viper(windows):
+    mod = viper_shim()
+    py = (spectrum._load, spectrum._fft, spectrum._power, spectrum._crossings)
+    a = SpectrumAnalyzer()
+    expected = []
+    for _, buf in windows:
+        m = LevelMeter(buf)
+        m.measure(len(buf))
+        expected.append((m.peak, list(a.analyze(buf, len(buf), m.peak)), bytes(a.acc)))
+    spectrum._load, spectrum._fft = mod.load, mod.fft
+    spectrum._power, spectrum._crossings = mod.power, mod.crossings
+    try:
+        for (_, buf), (peak, feats, acc) in zip(windows, expected):
+            got = list(a.analyze(buf, len(buf), peak))
+            if bytes(a.acc) != acc or str(got) != str(feats):
+                raise SystemExit("viper distinto de Python: %s != %s" % (got, feats))
+    finally:
+        spectrum._load, spectrum._fft, spectrum._power, spectrum._crossings = py
+    print("viper (simulado)   idéntico a Python en %d ventanas" % len(windows))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("wav", nargs="?", help="WAV mono 16 bits a 16 kHz")
+    ap.add_argument("-n", "--windows", type=int, default=24)
+    ap.add_argument("-r", "--repeat", type=int, default=5)
+    ap.add_argument("--frames", type=int, default=spectrum.FRAMES, help="tramos FFT por ventana")
+    ap.add_argument("--every", type=int, default=5, help="SPECTRUM_EVERY de aura.capture")
+    args = ap.parse_args()
+
+    windows = wav_windows(args.wav) if args.wav else synthetic_windows(args.windows)
+    if not windows:
+        raise SystemExit("No hay ventanas completas de 100 ms")
+    an = SpectrumAnalyzer(frames=args.frames)
+    peaks = []
+    for _, buf in windows:
+        m = LevelMeter(buf)
+        m.measure(len(buf))
+        peaks.append(m.peak)
+
+    # Exactitud frente a la referencia en coma flotante
+    worst = [0.0] * 4
+    print("%-8s %s" % ("señal", "  ".join("%6s" % f for f in FEATURES)))
+    for (kind, buf), peak in zip(windows, peaks):
+        feats = an.analyze(buf, len(buf), peak)
+        ref = reference(an, buf)
+        if ref is not None:
+            for i in range(4):
+                worst[i] = max(worst[i], abs(feats[i] - ref[i]))
+        print("%-8s %s" % (kind, "  ".join("%6.3f" % v for v in feats)))
+    print("error máx. frente a coma flotante: low=%.4f speech=%.4f high=%.4f flat=%.4f"
+          % tuple(worst))
+    if max(worst[:3]) > 0.02 or worst[FLAT] > 0.1:
+        raise SystemExit("Rasgos fuera de tolerancia")
+
+    check_viper(windows[:4])
+
+    # Tiempo por ventana (CPython; en la Pico la ruta viper es la que cuenta)
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for (_, buf), peak in zip(windows, peaks):
+            an.analyze(buf, len(buf), peak)
+    per = (time.perf_counter() - t0) / (args.repeat * len(windows))
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, buf in windows:
+            spectrum._crossings(buf, WINDOW_SAMPLES)
+    zcr = (time.perf_counter() - t0) / (args.repeat * len(windows))
+    print("analyze (%d tramos)  %8.1f us/ventana (zcr %.1f us); ventana = 100000 us"
+          % (args.frames, per * 1e6, zcr * 1e6))
+    print("1 de cada %d bloques  %8.1f us por bloque de media (aura.capture)"
+          % (args.every, per * 1e6 / args.every))
+
+
+if __name__ == "__main__":
+    main()
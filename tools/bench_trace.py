@@ -0,0 +1,464 @@
+"""
+bench_trace.py – réplica de trazas grabadas y presupuesto de regresión
+----------------------------------------------------------------------
+Pasa cada traza de tools/traces/ (lecturas del DHT + PCM de 16 kHz del
+I2S) por las etapas del dispositivo con el mismo código de aura/ que usa
+raspberry.py:
+
+    audio     AudioCapture.read_block() de cada bloque de 100 ms: filtro A,
+              medidor de nivel y, uno de cada cinco, el espectro
+    window    por muestra: snapshot() del audio, nivel dBA y
+              ReportWindow.add() con la lectura del DHT y add_level()
+    classify  por reporte (cada REPORT muestras): medias de la ventana y
+              Classifier.classify()
+    encode    AudioCapture.report() (pico y percentiles para el resumen),
+              MeasurementBatch.add() con registro binario (con el LAeq de
+              la ventana) y, cada BATCH reportes, body() (el JSON que se
+              envía)
+    render    pantalla de lecturas con aura.screen sobre el SSD1306 de
+              tools/emu (con un I2C que cuenta bytes)
+
+Por etapa da llamadas, mediana y p95 en us de todas las pasadas, la
+mediana de la pasada más rápida ("mejor", la menos afectada por otros
+procesos) y bytes reservados por llamada; por traza, los bytes enviados (cuerpos de los lotes), los de
+I2C a la pantalla y la secuencia de estados. Las reservas se miden con
+tracemalloc en CPython (pico durante la llamada, en una pasada aparte
+porque ralentiza) y con gc.mem_alloc() en MicroPython (con el recolector
+parado durante la réplica: todas las reservas de la llamada).
+
+Presupuesto: tools/traces/budget.json guarda la referencia de cada
+implementación ("cpython", "micropython") y el margen permitido por
+magnitud ("margin": {"us": 0.5, "alloc": 0.1, "bytes": 0.02}). Sale con
+código 1 si las reservas de una etapa o los bytes enviados o por I2C
+superan referencia × (1 + margen) o si cambia la secuencia de estados:
+nada de eso depende de la máquina ni de la carga, así que el resultado
+no cambia entre dos ejecuciones del mismo árbol. Los tiempos solo se
+informan (con "!tiempo" si la mejor mediana supera la referencia): con
+--gate-time también hacen fallar, para comprobarlos en una máquina
+dedicada. --update regraba la referencia (en la máquina donde se vaya a
+comprobar) y --margin us=1.0 relaja el margen.
+
+Con --micropython RUTA la misma réplica corre además en el port unix de
+MicroPython (el script es compatible: lo lanza con --child).
+
+Uso:
+    python tools/bench_trace.py [quiet_office noisy_meeting hvac_failure]
+        [--repeat 3] [--micropython RUTA] [--update] [--margin us=1.0]
+        [--gate-time]
+"""
+
+import gc
+import json
+import sys
+import time
+
+MICROPYTHON = sys.implementation.name == "micropython"
+
+try:
+    import os.path
+    TOOLS = os.path.dirname(os.path.abspath(__file__))
+except ImportError:                     # MicroPython: sin os.path
+    TOOLS = __file__.rsplit("/", 1)[0] if "/" in __file__ else "."
+ROOT = TOOLS + "/.."
+TRACES = TOOLS + "/traces"
+
+if MICROPYTHON:
+    sys.path.insert(0, ROOT)
+else:
+    sys.path.insert(0, TOOLS)
+    import emu  # noqa: E402
+    emu.install()     # ticks_*, framebuf y ssd1306 de tools/emu
+
+from aura.batch import MeasurementBatch  # noqa: E402
+from aura.capture import AudioCapture  # noqa: E402
+from aura.classify import Classifier  # noqa: E402
+from aura.loudness import level as dba_level  # noqa: E402
+from aura.screen import Screen  # noqa: E402
+from aura.spectrum import NFEAT  # noqa: E402
+from aura.states import state_name  # noqa: E402
+from aura.stats import ReportWindow  # noqa: E402
+
+if MICROPYTHON:
+    sys.path.append(TOOLS + "/emu")     # solo ssd1306: framebuf es el del port
+from ssd1306 import SSD1306_I2C  # noqa: E402
+
+TRACE_NAMES = ("quiet_office", "noisy_meeting", "hvac_failure")
+STAGES = ("audio", "window", "classify", "encode", "render")
+AUDIO, WINDOW, CLASSIFY, ENCODE, RENDER = range(5)
+BLOCK_BYTES = 3200       # 100 ms a 16 kHz, como aura.capture
+REPORT = 6               # muestras por reporte
+BATCH = 5                # reportes por envío
+CODE = "AURA-BENCH1"
+SLACK = {"us": 20, "alloc": 16, "bytes": 0}
+SENSOR_LAYOUT = (        # el de raspberry.py
+    ("th", 0, 0, 16), ("sound", 0, 10, 16), ("label", 0, 25, 16),
+    ("state", 20, 35, 13), ("value", 0, 45, 16), ("foot", 0, 54, 16),
+)
+
+
+# -------- Trazas (lectura compatible con MicroPython) -------------------
+def read_wav(path):
+    """PCM de un WAV mono de 16 bits a 16 kHz."""
+    with open(path, "rb") as f:
+        data = f.read()
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        cid = data[pos:pos + 4]
+        size = int.from_bytes(data[pos + 4:pos + 8], "little")
+        if cid == b"fmt ":
+            fmt = (int.from_bytes(data[pos + 10:pos + 12], "little"),
+                   int.from_bytes(data[pos + 12:pos + 16], "little"),
+                   int.from_bytes(data[pos + 22:pos + 24], "little"))
+        elif cid == b"data":
+            if fmt != (1, 16000, 16):
+                raise ValueError("%s: se necesita mono, 16 kHz, 16 bits (%r)" % (path, fmt))
+            return data[pos + 8:pos + 8 + size]
+        pos += 8 + size + (size & 1)
+    raise ValueError("%s: sin datos" % path)
+
+
+def read_csv(path):
+    """Filas (temp, hum) o None (lectura fallida), como tools/emu/dht.py."""
+    rows = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#"):
+                continue
+            parts = line.split(",")
+            try:
+                rows.append((float(parts[0]), float(parts[1])))
+            except (ValueError, IndexError):
+                if parts[0].lower() in ("none", "error", ""):
+                    rows.append(None)
+    return rows
+
+
+class TraceI2S:
+    """I2S de réplica: entrega los bloques de la traza en orden y en bucle."""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.pos = 0
+
+    def readinto(self, buf):
+        block = self.blocks[self.pos]
+        self.pos = (self.pos + 1) % len(self.blocks)
+        buf[:] = block
+        return len(block)
+
+
+class CountingI2C:
+    def __init__(self):
+        self.bytes_written = 0
+
+    def writeto(self, addr, buf, stop=True):
+        self.bytes_written += 1 + len(buf)
+
+    def writevec(self, addr, vector, stop=True):
+        for b in vector:
+            self.bytes_written += len(b)
+        self.bytes_written += 1
+
+
+# -------- Medida por etapa -----------------------------------------------
+class Stages:
+    def __init__(self, alloc=False):
+        self.us = [[] for _ in STAGES]
+        self.best = [None] * len(STAGES)         # menor mediana de una pasada
+        self._mark = [0] * len(STAGES)
+        self.alloc = [0] * len(STAGES)
+        self.calls = [0] * len(STAGES)
+        self.measure_alloc = alloc
+        self._t0 = 0
+        self._a0 = 0
+
+    def begin(self, stage):
+        if self.measure_alloc:
+            self._a0 = _alloc_begin()
+        self._t0 = time.ticks_us()
+
+    def end(self, stage):
+        us = time.ticks_diff(time.ticks_us(), self._t0)
+        if self.measure_alloc:
+            self.alloc[stage] += _alloc_end(self._a0)
+        self.calls[stage] += 1
+        self.us[stage].append(us)
+
+    def end_pass(self):
+        """Cierra una pasada: guarda su mediana por etapa si es la mejor."""
+        for i in range(len(STAGES)):
+            us = sorted(self.us[i][self._mark[i]:])
+            self._mark[i] = len(self.us[i])
+            if us:
+                p50 = us[len(us) // 2]
+                if self.best[i] is None or p50 < self.best[i]:
+                    self.best[i] = p50
+
+    def summary(self):
+        out = {}
+        for i in range(len(STAGES)):
+            us = sorted(self.us[i])
+            n = self.calls[i]
+            if n:
+                out[STAGES[i]] = {"n": n, "p50": us[len(us) // 2],
+                                  "p95": us[min(len(us) - 1, len(us) * 95 // 100)],
+                                  "best": self.best[i],
+                                  "alloc": self.alloc[i] // n}
+        return out
+
+
+if MICROPYTHON:
+    def _alloc_begin():
+        return gc.mem_alloc()
+
+    def _alloc_end(a0):
+        return gc.mem_alloc() - a0
+else:
+    import tracemalloc
+
+    def _alloc_begin():
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def _alloc_end(a0):
+        return max(0, tracemalloc.get_traced_memory()[1] - a0)
+
+
+# -------- Réplica ----------------------------------------------------------
+def replay(name, repeat=1, alloc=False):
+    """Pasa la traza `repeat` veces; devuelve el resumen de la última pasada."""
+    pcm = read_wav(TRACES + "/" + name + ".wav")
+    rows = read_csv(TRACES + "/" + name + ".csv")
+    blocks = [bytearray(pcm[i:i + BLOCK_BYTES])
+              for i in range(0, len(pcm) - BLOCK_BYTES + 1, BLOCK_BYTES)]
+    per = max(1, len(blocks) // len(rows))       # bloques de audio por muestra
+    st = Stages(alloc)
+    if MICROPYTHON and alloc:
+        gc.disable()
+    for _ in range(repeat):
+        # Estado nuevo en cada pasada: todas dan los mismos resultados
+        cap = AudioCapture(TraceI2S(blocks))
+        win = ReportWindow(NFEAT)
+        cls = Classifier()
+        batch = MeasurementBatch(size=BATCH, capacity=BATCH, records=True)
+        i2c = CountingI2C()
+        scr = Screen(SSD1306_I2C(128, 64, i2c), min_interval_ms=0)
+        i2c.bytes_written = 0                    # sin la inicialización
+        states = []
+        sent = 0
+        last_t = last_h = None
+        for k in range(len(rows)):
+            gc.collect()
+            for _ in range(per):
+                st.begin(AUDIO)
+                cap.read_block()
+                st.end(AUDIO)
+            row = rows[k]
+            st.begin(WINDOW)
+            snap = cap.snapshot()
+            lvl = dba_level(snap.laeq)
+            if row is None:
+                win.add(None, None, lvl)
+            else:
+                win.add(row[0], row[1], lvl)
+            win.add_level(snap.laeq)
+            win.add_features(snap.features)
+            st.end(WINDOW)
+            if (k + 1) % REPORT:
+                continue
+
+            st.begin(CLASSIFY)
+            t, h, s = win.means()
+            if t is None:
+                t, h = last_t, last_h
+            last_t, last_h = t, h
+            idx = cls.classify(t, h, s, win.feature_means())
+            state = state_name(idx)
+            st.end(CLASSIFY)
+            states.append(idx)
+
+            st.begin(ENCODE)
+            stats = win.summary()
+            stats["audio"] = cap.report()
+            batch.add(state, cls.value, t, h, s, win.leq(), suppressed=0, stats=stats)
+            body = None
+            if batch.count >= BATCH:
+                body = batch.body(CODE)
+                batch.clear()
+            st.end(ENCODE)
+            if body is not None:
+                sent += len(body)
+            win.reset()
+
+            st.begin(RENDER)
+            scr.layout(SENSOR_LAYOUT)
+            scr.set("th", "T:%sC  H:%s%%" % (t, h))
+            scr.set("sound", "Sound: %.2f" % s)
+            scr.set("label", "Estado:")
+            scr.set("state", "> " + state)
+            scr.set("value", "Valor: %.2f" % cls.value)
+            scr.set("foot", "AURA-" + CODE[-4:])
+            scr.flush()
+            st.end(RENDER)
+        st.end_pass()
+    if MICROPYTHON and alloc:
+        gc.enable()
+    return {"stages": st.summary(), "reports": len(states), "bytes": sent,
+            "i2c": i2c.bytes_written, "states": states}
+
+
+def measure(name, repeat):
+    """Tiempos de `repeat` pasadas y reservas (en CPython, de una pasada más con tracemalloc)."""
+    out = replay(name, repeat, alloc=MICROPYTHON)
+    if not MICROPYTHON:
+        tracemalloc.start()
+        alloc = replay(name, 1, alloc=True)["stages"]
+        tracemalloc.stop()
+        for stage, s in out["stages"].items():
+            s["alloc"] = alloc[stage]["alloc"]
+    out["trace"] = name
+    return out
+
+
+def child(argv):
+    """Modo --child (también en MicroPython): una línea JSON por traza."""
+    repeat = int(argv[1])
+    for name in argv[2:]:
+        print(json.dumps(measure(name, repeat)))
+
+
+# -------- Informe y presupuesto (CPython) --------------------------------
+def run_micropython(exe, names, repeat):
+    import subprocess
+    cmd = [exe, "-X", "heapsize=8M", os.path.abspath(__file__), "--child", str(repeat)] + list(names)
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return [json.loads(line) for line in out.splitlines() if line.startswith("{")]
+
+
+def check(impl, res, ref, margin):
+    """Imprime la tabla de una traza; devuelve (fallos, tiempos por encima)."""
+    fails = []
+    slow = []
+    per_report = res["bytes"] / max(1, res["reports"])
+    print("%s [%s]: %d reportes, %d B enviados (%.0f B/reporte), I2C %d B" % (
+        res["trace"], impl, res["reports"], res["bytes"], per_report, res["i2c"]))
+    runs = []                               # estados seguidos: [índice, veces]
+    for idx in res["states"]:
+        if runs and runs[-1][0] == idx:
+            runs[-1][1] += 1
+        else:
+            runs.append([idx, 1])
+    print("  estados   " + " > ".join("%s x%d" % (state_name(i), n) for i, n in runs))
+    print("  {:<9} {:>5} {:>9} {:>9} {:>9} {:>9}   {:>9} {:>9}".format(
+        "etapa", "n", "p50 us", "p95 us", "mejor us", "B/llam.", "ref us", "ref B"))
+
+    def over(kind, value, base):
+        if base is None:
+            return False
+        # Holgura absoluta: unos pocos us o bytes sobre valores pequeños no son regresión
+        return value > max(base * (1 + margin[kind]), base + SLACK[kind])
+
+    for stage in STAGES:
+        s = res["stages"].get(stage)
+        if s is None:
+            continue
+        r = (ref or {}).get("stages", {}).get(stage, {})
+        # Referencias grabadas antes de "best": su p50
+        ref_us = r.get("best", r.get("p50"))
+        flag = []
+        if over("us", s["best"], ref_us):
+            flag.append("tiempo")
+            slow.append("%s/%s: tiempo %d us > ref %d" % (res["trace"], stage, s["best"], ref_us))
+        if over("alloc", s["alloc"], r.get("alloc")):
+            flag.append("reservas")
+            fails.append("%s/%s: reservas" % (res["trace"], stage))
+        print("  {:<9} {:>5} {:>9} {:>9} {:>9} {:>9}   {:>9} {:>9}  {}".format(
+            stage, s["n"], s["p50"], s["p95"], s["best"], s["alloc"],
+            ref_us if ref_us is not None else "-", r.get("alloc", "-"),
+            "  ".join("!" + f for f in flag)))
+    if ref:
+        for key, label in (("bytes", "bytes enviados"), ("i2c", "bytes I2C")):
+            if over("bytes", res[key], ref.get(key)):
+                fails.append("%s: %s %d > ref %d" % (res["trace"], label, res[key], ref[key]))
+        if ref.get("states") is not None and ref["states"] != res["states"]:
+            fails.append("%s: estados %s, ref %s" % (res["trace"], res["states"], ref["states"]))
+    else:
+        print("  (sin referencia para %s: --update la graba)" % impl)
+    return fails, slow
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("traces", nargs="*", default=list(TRACE_NAMES))
+    ap.add_argument("--repeat", type=int, default=3, help="pasadas por traza")
+    ap.add_argument("--budget", default=TRACES + "/budget.json", help="referencias y márgenes")
+    ap.add_argument("--micropython", help="ejecutable del port unix de MicroPython")
+    ap.add_argument("--update", action="store_true", help="regrabar la referencia")
+    ap.add_argument("--margin", action="append", default=[],
+                    help="magnitud=fracción, p. ej. us=1.0 (sobre el del presupuesto)")
+    ap.add_argument("--gate-time", action="store_true",
+                    help="fallar también por tiempo (solo en una máquina dedicada)")
+    args = ap.parse_args()
+
+    try:
+        with open(args.budget) as f:
+            budget = json.load(f)
+    except FileNotFoundError:
+        budget = {}
+    margin = {"us": 0.5, "alloc": 0.1, "bytes": 0.02}
+    margin.update(budget.get("margin", {}))
+    for item in args.margin:
+        kind, value = item.split("=", 1)
+        margin[kind] = float(value)
+
+    runs = [("cpython", [measure(name, args.repeat) for name in args.traces])]
+    if args.micropython:
+        runs.append(("micropython", run_micropython(args.micropython, args.traces, args.repeat)))
+
+    fails = []
+    slow = []
+    for impl, results in runs:
+        refs = budget.get(impl, {})
+        for res in results:
+            found, late = check(impl, res, refs.get(res["trace"]), margin)
+            print()
+            if not args.update:
+                fails += found
+                slow += late
+        if args.update:
+            refs.update((r["trace"], {k: v for k, v in r.items() if k != "trace"})
+                        for r in results)
+            budget[impl] = refs
+    if args.update:
+        budget.setdefault("margin", margin)
+        with open(args.budget, "w") as f:
+            json.dump(budget, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print("referencia grabada en", os.path.relpath(args.budget))
+        return
+    print("márgenes: tiempo +%d%% (%s), reservas +%d%%, bytes +%d%%" % (
+        margin["us"] * 100, "comprobado" if args.gate_time else "solo informativo",
+        margin["alloc"] * 100, margin["bytes"] * 100))
+    if slow and not args.gate_time:
+        print("tiempos por encima de la referencia (no cuentan sin --gate-time):")
+        for f in slow:
+            print("  " + f)
+    if args.gate_time:
+        fails += slow
+    if fails:
+        print("REGRESIÓN:")
+        for f in fails:
+            print("  " + f)
+        sys.exit(1)
+    print("dentro del presupuesto")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child(sys.argv[sys.argv.index("--child"):])
+    else:
+        main()
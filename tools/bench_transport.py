@@ -0,0 +1,193 @@
+"""
+bench_transport.py – bytes por muestra y latencia: HTTP frente a MQTT
+---------------------------------------------------------------------
+Envía los mismos lotes (aura.batch con registros aura.codec, lecturas de
+aura.sim) con cada transporte de aura.transport:
+
+    http       POST /api/devices/data/batch a tools/fake_backend.py
+    mqtt-q0    PUBLISH QoS 0 a tools/fake_broker.py
+    mqtt-q1    PUBLISH QoS 1 (espera PUBACK)
+
+Entre cliente y servidor hay un proxy TCP que cuenta los bytes en cada
+sentido (carga útil TCP: cabeceras HTTP o MQTT incluidas, sin IP/TCP) y
+puede añadir --rtt ms de ida y vuelta para imitar la WiFi. La latencia
+es la de send_batch(); con QoS 0 solo cubre la escritura en el socket.
+
+Uso:
+    python tools/bench_transport.py [--sends 200] [--batch 1 10] [--rtt 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import emu  # noqa: E402
+
+emu.install(fakes=False)      # ticks_* para aura.*; red y asyncio reales
+
+import fake_backend  # noqa: E402
+import fake_broker  # noqa: E402
+from aura.batch import MeasurementBatch  # noqa: E402
+from aura.classify import Classifier, DEFSIM  # noqa: E402
+from aura.http import AsyncHttpClient  # noqa: E402
+from aura.mqtt import MqttClient  # noqa: E402
+from aura.sim import SensorWalk  # noqa: E402
+from aura.states import state_name  # noqa: E402
+from aura.transport import HttpTransport, MqttTransport  # noqa: E402
+
+CODE = "AURA-BENCH1"
+
+
+class CountingProxy:
+    """Proxy TCP que cuenta bytes por sentido y retrasa cada trozo rtt/2."""
+
+    def __init__(self, target, rtt_ms):
+        self.target = target
+        self.delay = rtt_ms / 2000
+        self.up = 0
+        self.down = 0
+        self.active = 0          # conexiones abiertas a través del proxy
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._client, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def _pipe(self, reader, writer, up):
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                if up:
+                    self.up += len(data)
+                else:
+                    self.down += len(data)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def _client(self, reader, writer):
+        self.active += 1
+        try:
+            r2, w2 = await asyncio.open_connection(*self.target)
+            await asyncio.gather(self._pipe(reader, w2, True), self._pipe(r2, writer, False))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.active -= 1
+
+    async def drain(self, timeout=5):
+        """Espera a que se cierren las conexiones (con --rtt el proxy va por detrás)."""
+        t0 = time.perf_counter()
+        while self.active and time.perf_counter() - t0 < timeout:
+            await asyncio.sleep(0.01)
+
+    def reset(self):
+        self.up = self.down = 0
+
+    def close(self):
+        self.server.close()
+
+
+def bodies(count, size, seed=1):
+    """count cuerpos JSON de lotes de `size` lecturas."""
+    rng = random.Random(seed)
+    walk = SensorWalk(22.35, 42.0, 38.0, rng)
+    cls = Classifier(DEFSIM)
+    batch = MeasurementBatch(size=size, capacity=size, records=True)
+    out = []
+    for _ in range(count):
+        for _ in range(size):
+            t, h, db, lvl = walk.step()
+            st = state_name(cls.classify(t, h, lvl), ascii=True)
+            batch.add(st, cls.value, t, h, lvl, db)
+        out.append(batch.body(CODE).encode())
+        batch.clear()
+    return out
+
+
+def pct(values, p):
+    s = sorted(values)
+    return s[min(len(s) - 1, int(p * len(s)))] if s else 0.0
+
+
+async def run_one(name, make, proxy, payloads, size):
+    transport, close = make()
+    await transport.send_batch(payloads[0])        # conexión y sesión fuera de la medida
+    proxy.reset()
+    lat = []
+    for body in payloads:
+        t0 = time.perf_counter()
+        code = await transport.send_batch(body)
+        lat.append((time.perf_counter() - t0) * 1000)
+        if code != 200:
+            raise SystemExit("%s: código %d" % (name, code))
+    await close()
+    await proxy.drain()
+    samples = len(payloads) * size
+    payload = sum(len(b) for b in payloads) / samples
+    print("{:<9} lote {:>3}  {:>7.1f} B/muestra (cuerpo {:>5.1f}, subida {:>7.1f}, bajada {:>6.1f})"
+          "  p50 {:>6.2f} ms  p95 {:>6.2f} ms".format(
+              name, size, (proxy.up + proxy.down) / samples, payload, proxy.up / samples,
+              proxy.down / samples, pct(lat, 0.5), pct(lat, 0.95)))
+
+
+async def bench(args):
+    srv = fake_backend.make_server()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    brk = fake_broker.make_broker(
+        on_publish=lambda topic, msg: srv.ingest(json.loads(msg)))
+    threading.Thread(target=brk.serve_forever, daemon=True).start()
+    hproxy = CountingProxy(srv.server_address, args.rtt)
+    mproxy = CountingProxy(brk.server_address, args.rtt)
+    hhost, hport = await hproxy.start()
+    mhost, mport = await mproxy.start()
+    header = b"x-device-code: " + CODE.encode() + b"\r\n"
+
+    def http():
+        client = AsyncHttpClient("http://%s:%d" % (hhost, hport))
+        return HttpTransport(client, header), client.aclose
+
+    def mqtt(qos):
+        def make():
+            client = MqttClient(mhost, mport, client_id=CODE)
+            return MqttTransport(client, CODE, qos), client.disconnect
+        return make
+
+    print("%d envíos por caso, RTT añadido %.0f ms\n" % (args.sends, args.rtt))
+    for size in args.batch:
+        payloads = bodies(args.sends, size)
+        await run_one("http", http, hproxy, payloads, size)
+        await run_one("mqtt-q0", mqtt(0), mproxy, payloads, size)
+        await run_one("mqtt-q1", mqtt(1), mproxy, payloads, size)
+        print()
+    hproxy.close()
+    mproxy.close()
+    srv.shutdown()
+    brk.shutdown()
+    st = srv.stats
+    print("backend: %d mediciones recibidas (%d registros binarios)" % (st.measurements, st.records))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--sends", type=int, default=200, help="envíos por transporte y tamaño")
+    ap.add_argument("--batch", type=int, nargs="+", default=[1, 10], help="lecturas por envío")
+    ap.add_argument("--rtt", type=float, default=0, help="ms de ida y vuelta añadidos")
+    asyncio.run(bench(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
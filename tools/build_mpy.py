@@ -0,0 +1,130 @@
+"""
+build_mpy.py – compila el firmware y aura/ a bytecode .mpy para la Pico W
+-------------------------------------------------------------------------
+Copiados como .py, la Pico compila en cada arranque el firmware y todos
+los módulos de aura/ que importa (~130 KB de fuente): tarda y deja un
+pico de heap grande mientras dura. Con .mpy solo carga el bytecode.
+
+Para cada firmware deja en build/<firmware>/:
+
+    main.py             dos líneas: from <firmware> import main; main()
+    <firmware>.mpy      el firmware compilado
+    aura/*.mpy          todos los módulos de aura/ (también los de carga
+                        perezosa: sampler, mqtt, register...)
+    manifest.py         para congelarlo todo en la imagen del firmware
+    build.txt           versión de mpy-cross, arquitectura y sha256 de
+                        cada fichero
+
+La compilación es reproducible: mismas fuentes y misma versión de
+mpy-cross dan los mismos bytes (las rutas que quedan dentro de los .mpy
+son relativas al repo). -march=armv6m (Cortex-M0+ del RP2040) hace falta
+para los módulos @micropython.viper (aura/_*_viper.py).
+
+La versión de mpy-cross debe producir el formato .mpy del MicroPython
+de la Pico (p. ej. pip install mpy-cross==1.24.1.post3 para 1.24.x).
+
+Copiar a la Pico (borrar antes los aura/*.py que hubiera: si existe el
+.py, MicroPython lo prefiere al .mpy):
+    cd build/raspberry && mpremote cp -r aura main.py raspberry.mpy :
+
+Congelar en la imagen (sin ocupar RAM el bytecode, se ejecuta desde
+flash), desde micropython/ports/rp2:
+    make BOARD=RPI_PICO_W FROZEN_MANIFEST=/ruta/build/raspberry/manifest.py
+y copiar a la Pico solo main.py.
+
+Uso:
+    python tools/build_mpy.py [raspberry raspberry_defsim] [--out build]
+        [--mpy-cross /ruta/mpy-cross]
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARCH = "armv6m"
+
+MAIN = """\
+# Generado por tools/build_mpy.py: el firmware va compilado en {name}.mpy
+from {name} import main
+main()
+"""
+
+MANIFEST = """\
+# Generado por tools/build_mpy.py: aura/ y {name} congelados en la imagen
+include("$(PORT_DIR)/boards/manifest.py")
+require("ssd1306")
+package("aura", base_path="{root}")
+module("{name}.py", base_path="{root}")
+"""
+
+
+def find_mpy_cross(path=None):
+    exe = path or shutil.which("mpy-cross")
+    if exe is None:
+        raise SystemExit("mpy-cross no encontrado: pip install mpy-cross (versión de la Pico) "
+                         "o --mpy-cross /ruta/mpy-cross")
+    version = subprocess.run([exe, "--version"], check=True, capture_output=True,
+                             text=True).stdout.strip()
+    return exe, version
+
+
+def compile_one(exe, src, dst):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    # Ruta relativa al repo: es la que queda dentro del .mpy (trazas)
+    subprocess.run([exe, "-march=" + MARCH, "-o", dst, src], cwd=ROOT, check=True)
+
+
+def sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build(name, out, exe, version):
+    dest = os.path.join(out, name)
+    if os.path.isdir(dest):
+        shutil.rmtree(dest)
+    os.makedirs(dest)
+    sources = [name + ".py"] + sorted(
+        "aura/" + f for f in os.listdir(os.path.join(ROOT, "aura")) if f.endswith(".py"))
+    src_bytes = 0
+    for src in sources:
+        compile_one(exe, src, os.path.join(dest, src[:-3] + ".mpy"))
+        src_bytes += os.path.getsize(os.path.join(ROOT, src))
+    with open(os.path.join(dest, "main.py"), "w") as f:
+        f.write(MAIN.format(name=name))
+    root = os.path.relpath(ROOT, dest).replace(os.sep, "/")
+    with open(os.path.join(dest, "manifest.py"), "w") as f:
+        f.write(MANIFEST.format(name=name, root=root))
+
+    files = ["main.py", "manifest.py"] + [s[:-3] + ".mpy" for s in sources]
+    with open(os.path.join(dest, "build.txt"), "w") as f:
+        f.write("%s\nmarch %s\n\n" % (version, MARCH))
+        for rel in files:
+            f.write("%s  %s\n" % (sha256(os.path.join(dest, rel)), rel))
+    mpy_bytes = sum(os.path.getsize(os.path.join(dest, rel)) for rel in files[2:])
+    print("%-18s %2d módulos  fuente %6.1f KB -> .mpy %5.1f KB  (%s)" % (
+        name, len(sources), src_bytes / 1024, mpy_bytes / 1024,
+        os.path.relpath(dest, os.getcwd())))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("firmware", nargs="*", default=["raspberry", "raspberry_defsim"])
+    ap.add_argument("--out", default=os.path.join(ROOT, "build"), help="directorio de salida")
+    ap.add_argument("--mpy-cross", help="ejecutable de mpy-cross (por defecto el del PATH)")
+    args = ap.parse_args()
+    exe, version = find_mpy_cross(args.mpy_cross)
+    print(version)
+    for name in args.firmware:
+        if not os.path.exists(os.path.join(ROOT, name + ".py")):
+            sys.exit("no existe %s.py" % name)
+        build(name, os.path.abspath(args.out), exe, version)
+
+
+if __name__ == "__main__":
+    main()
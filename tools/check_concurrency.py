@@ -0,0 +1,175 @@
+"""
+check_concurrency.py – clientes de red compartidos entre tareas
+---------------------------------------------------------------
+En raspberry.py varias tareas usan el mismo cliente a la vez:
+
+    mqtt   el lote, las alertas inmediatas y el PINGREQ del keepalive
+           comparten la sesión MQTT (aura.mqtt);
+    http   el envío del lote y la revalidación de la config (aura.config)
+           comparten el AsyncHttpClient keep-alive (aura.http).
+
+Esta comprobación lanza esas operaciones a la vez, ronda tras ronda,
+contra tools/fake_broker.py y tools/fake_backend.py (a través del proxy
+de bench_transport con --rtt ms de ida y vuelta, para que se solapen de
+verdad) y verifica que:
+
+    - cada mensaje llega una sola vez y sin alterar a su tema, y cada
+      respuesta HTTP a su petición (la del lote trae su "count");
+    - ninguna operación falla (p. ej. dos lecturas del socket a la vez) ni
+      se queda colgada más de --timeout s;
+    - todo va por una sola conexión;
+    - la alerta QoS 0 no espera al PUBACK del lote lanzado a la vez: con
+      --rtt ms de ida y vuelta, vuelve antes que el lote.
+
+Sale con código 1 si algo no se cumple.
+
+Uso:
+    python tools/check_concurrency.py [--rounds 50] [--rtt 10] [--timeout 2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import emu  # noqa: E402
+
+emu.install(fakes=False)      # ticks_* para aura.*; red y asyncio reales
+
+import fake_backend  # noqa: E402
+import fake_broker  # noqa: E402
+from bench_transport import CountingProxy  # noqa: E402
+from aura.config import ConfigStore  # noqa: E402
+from aura.http import AsyncHttpClient  # noqa: E402
+from aura.mqtt import MqttClient  # noqa: E402
+from aura.transport import HttpTransport, MqttTransport  # noqa: E402
+
+CODE = "AURA-CHECK1"
+
+
+async def check_mqtt(args):
+    got = []
+    brk = fake_broker.make_broker(on_publish=lambda topic, msg: got.append((topic, msg)))
+    threading.Thread(target=brk.serve_forever, daemon=True).start()
+    proxy = CountingProxy(brk.server_address, args.rtt)
+    host, port = await proxy.start()
+    client = MqttClient(host, port, client_id=CODE)
+    transport = MqttTransport(client, CODE, qos=1)
+
+    async def ping():
+        # Keepalive vencido: el PINGREQ sale y espera su PINGRESP
+        client.last_tx = time.ticks_add(time.ticks_ms(), -client.keepalive * 1000)
+        await transport.keepalive()
+
+    done = []
+
+    async def timed(name, op):
+        await op
+        done.append(name)
+
+    sent = []
+    errors = []
+    late = 0
+    for i in range(args.rounds):
+        batch = b'{"round":%d,"data":"%s"}' % (i, b"x" * (200 + i))
+        alert = b'{"seq":%d}' % i
+        sent += [("aura/%s/batch" % CODE, batch), ("aura/%s/alert" % CODE, alert)]
+        done.clear()
+        ops = [timed("batch", transport.send_batch(batch)),
+               timed("alert", transport.send_alert(alert))]
+        if client.writer is not None:
+            ops.append(ping())
+        ops = [asyncio.wait_for(op, args.timeout) for op in ops]
+        for r in await asyncio.gather(*ops, return_exceptions=True):
+            if isinstance(r, BaseException):
+                errors.append("ronda %d: %r" % (i, r))
+        if len(done) == 2 and done.index("alert") > done.index("batch"):
+            late += 1
+    await client.disconnect()
+    await asyncio.sleep(0.2)      # lo último en vuelo hasta el broker
+    proxy.close()
+    brk.shutdown()
+
+    fails = errors[:5]
+    if sorted(got) != sorted(sent):
+        fails.append("el broker recibió %d mensajes de %d (o alterados)" % (len(got), len(sent)))
+    if client.connects != 1:
+        fails.append("%d conexiones, se esperaba 1" % client.connects)
+    if late:
+        fails.append("%d alertas esperaron al PUBACK del lote" % late)
+    print("mqtt: %d rondas lote + alerta + ping, %d publicaciones, %d conexiones -> %s"
+          % (args.rounds, client.publishes, client.connects, "FALLO" if fails else "OK"))
+    for f in fails:
+        print("  " + f)
+    return not fails
+
+
+async def check_http(args):
+    srv = fake_backend.make_server()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    proxy = CountingProxy(srv.server_address, args.rtt)
+    host, port = await proxy.start()
+    client = AsyncHttpClient("http://%s:%d" % (host, port), timeout=args.timeout)
+    header = b"x-device-code: " + CODE.encode() + b"\r\n"
+    transport = HttpTransport(client, header)
+    store = ConfigStore(os.path.join(tempfile.mkdtemp(), "config.json"))
+
+    async def batch(n):
+        body = json.dumps({"items": [{"temperature": 22, "humidity": 45}] * n})
+        code = await transport.send_batch(body)
+        if code != 200 or transport.reply.get("count") != n:
+            raise ValueError("lote de %d: HTTP %d %r" % (n, code, transport.reply))
+
+    async def config():
+        store.etag = None            # siempre 200 con cuerpo, como al arrancar
+        await store.refresh(client, header)
+        if "samplingInterval" not in store.config:
+            raise ValueError("config: %r" % (store.config,))
+
+    errors = []
+    items = 0
+    for i in range(args.rounds):
+        n = i % 3 + 1
+        items += n
+        ops = [asyncio.wait_for(op, args.timeout * 2) for op in (batch(n), config())]
+        for r in await asyncio.gather(*ops, return_exceptions=True):
+            if isinstance(r, BaseException):
+                errors.append("ronda %d: %r" % (i, r))
+    await client.aclose()
+    proxy.close()
+    srv.shutdown()
+
+    fails = errors[:5]
+    if srv.stats.measurements != items:
+        fails.append("el backend recibió %d mediciones de %d" % (srv.stats.measurements, items))
+    if client.connects != 1:
+        fails.append("%d conexiones, se esperaba 1" % client.connects)
+    print("http: %d rondas lote + config, %d peticiones, %d conexiones -> %s"
+          % (args.rounds, client.requests, client.connects, "FALLO" if fails else "OK"))
+    for f in fails:
+        print("  " + f)
+    return not fails
+
+
+async def check(args):
+    ok = await check_mqtt(args)
+    ok = await check_http(args) and ok
+    return 0 if ok else 1
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--rounds", type=int, default=50, help="rondas de operaciones simultáneas")
+    ap.add_argument("--rtt", type=float, default=10, help="ms de ida y vuelta añadidos")
+    ap.add_argument("--timeout", type=float, default=2, help="s máximos por operación")
+    sys.exit(asyncio.run(check(ap.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+tools/emu – módulos falsos de MicroPython para ejecutar el firmware en el host
+-----------------------------------------------------------------------------
+Este directorio se añade al principio de sys.path; cada fichero sustituye
+al módulo homónimo de la Pico W:
+
+    machine    Pin, I2C (cuenta bytes), I2S (WAV o ruido), ADC, reset()
+    network    WLAN con latencia, cortes y pérdidas (network.link)
+    dht        DHT11/DHT22 con lecturas guionizadas
+    uasyncio   asyncio sobre un reloj virtual (más rápido que el real)
+    ssd1306    driver con la interfaz de micropython-lib sobre framebuf
+    ntptime, urequests
+
+`time` y `gc` no pueden sustituirse por fichero (son módulos internos de
+CPython): load() importa el firmware con clock.module y heap.module en su
+lugar, de modo que raspberry.py y aura/ ven ticks_ms(), sleep_ms(),
+mem_free()... sobre el reloj virtual. install() solo añade las rutas y
+parchea el time real con ticks_* (para herramientas que no necesitan el
+reloj virtual, como tools/bench_oled.py).
+
+Uso:
+    import emu
+    mod = emu.load("raspberry_defsim")
+    dev = mod.AuraDevice()
+"""
+
+import importlib
+import os
+import sys
+import time
+
+EMU_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(EMU_DIR))
+
+# Módulos de la biblioteca estándar que deben quedar ligados al time real
+_STDLIB = ("asyncio", "selectors", "socket", "random", "wave", "csv", "json",
+           "struct", "threading", "tracemalloc", "http.client", "http.server")
+_FAKES = ("clock", "heap", "machine", "network", "uasyncio", "dht",
+          "framebuf", "ssd1306", "ntptime", "urequests")
+
+
+def _ticks_ms():
+    return int(time.monotonic() * 1000) & 0x3FFFFFFF
+
+
+def _ticks_us():
+    return int(time.monotonic() * 1000000) & 0x3FFFFFFF
+
+
+def _ticks_add(ticks, delta):
+    return (ticks + delta) & 0x3FFFFFFF
+
+
+def _ticks_diff(a, b):
+    d = (a - b) & 0x3FFFFFFF
+    return d - 0x40000000 if d & 0x20000000 else d
+
+
+def install(fakes=True):
+    """
+    Pone la raíz del repo (y, con fakes, los módulos falsos) en sys.path y
+    añade ticks_* al time real. Con fakes=False aura/ usa asyncio y socket
+    de CPython (herramientas como tools/loadgen.py).
+    """
+    for path in (ROOT, EMU_DIR) if fakes else (ROOT,):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    if not hasattr(time, "ticks_ms"):
+        time.ticks_ms = _ticks_ms
+        time.ticks_us = _ticks_us
+        time.ticks_add = _ticks_add
+        time.ticks_diff = _ticks_diff
+        time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+
+
+def load(name):
+    """
+    Importa (o reimporta) un módulo del firmware y aura/ sobre el reloj
+    virtual. Devuelve el módulo; sus clases se instancian con normalidad.
+    """
+    install()
+    for mod in _STDLIB + _FAKES:
+        importlib.import_module(mod)
+    import clock
+    import heap
+    for mod in list(sys.modules):
+        if mod == name or mod == "aura" or mod.startswith("aura."):
+            del sys.modules[mod]
+    saved = sys.modules["time"], sys.modules["gc"]
+    sys.modules["time"] = clock.module
+    sys.modules["gc"] = heap.module
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.modules["time"], sys.modules["gc"] = saved
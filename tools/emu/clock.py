@@ -0,0 +1,115 @@
+"""
+Reloj virtual del emulador.
+
+El tiempo del dispositivo es el tiempo real transcurrido más los saltos
+que da el bucle de asyncio cuando no hay nada que hacer (y las esperas
+bloqueantes como time.sleep o I2S.readinto): el trabajo de CPU cuenta,
+las esperas no, así que una hora de firmware pasa en segundos.
+
+`module` es un sustituto del módulo time de MicroPython (ticks_*, sleep_ms,
+time, gmtime...) que tools/emu inyecta en los módulos del dispositivo.
+
+Segundo núcleo (_thread, hilo real de CPython): mientras trabaja, el
+reloj no salta; mientras espera al micrófono (machine.I2S), solo salta
+hasta el instante en que llega su siguiente bloque (`core1`).
+"""
+
+import time as _time
+import types
+
+TICKS_MAX = 0x3FFFFFFF
+TICKS_HALF = 0x20000000
+CORE1_SLICE = 0.0005     # s de espera real mientras calcula el núcleo 1
+
+
+class VirtualClock:
+    def __init__(self, start=None):
+        self.offset = 0.0                  # s saltados sobre el tiempo real
+        self.skipped = 0.0
+        self._t0 = _time.monotonic()
+        self.epoch = _time.time() if start is None else start
+        self.core1 = None                  # s virtuales hasta los que espera el núcleo 1
+
+    def now(self):
+        """Segundos virtuales desde el arranque."""
+        return _time.monotonic() - self._t0 + self.offset
+
+    def advance(self, seconds):
+        if self.core1 is None:
+            if seconds > 0:
+                self.offset += seconds
+                self.skipped += seconds
+            return
+        # Sin dejar atrás al núcleo 1: saltar hasta donde espera y, mientras
+        # calcula, dejar pasar tiempo real
+        target = self.now() + seconds
+        while True:
+            left = target - self.now()
+            if left <= 0:
+                return
+            step = min(left, self.core1 - self.now())
+            if step > 0:
+                self.offset += step
+                self.skipped += step
+            else:
+                _time.sleep(CORE1_SLICE)
+
+    def wall(self):
+        """Segundos reales desde el arranque."""
+        return _time.monotonic() - self._t0
+
+    # -------- API de time (MicroPython) ----------------------------------
+    def ticks_ms(self):
+        return int(self.now() * 1000) & TICKS_MAX
+
+    def ticks_us(self):
+        return int(self.now() * 1000000) & TICKS_MAX
+
+    def time(self):
+        return int(self.epoch + self.now())
+
+    def time_ns(self):
+        return int((self.epoch + self.now()) * 1e9)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def sleep_ms(self, ms):
+        self.advance(ms / 1000)
+
+    def sleep_us(self, us):
+        self.advance(us / 1000000)
+
+    def localtime(self, secs=None):
+        return _time.localtime(self.time() if secs is None else secs)
+
+    def gmtime(self, secs=None):
+        return _time.gmtime(self.time() if secs is None else secs)
+
+    def make_module(self):
+        m = types.ModuleType("time")
+        for name in ("ticks_ms", "ticks_us", "time", "time_ns", "sleep",
+                     "sleep_ms", "sleep_us", "localtime", "gmtime"):
+            setattr(m, name, getattr(self, name))
+        m.ticks_cpu = self.ticks_us
+        m.ticks_add = ticks_add
+        m.ticks_diff = ticks_diff
+        m.mktime = _time.mktime
+        # Medidas reales de CPU para perfilar (no avanzan con el reloj virtual)
+        m.monotonic = self.now
+        m.perf_counter = _time.perf_counter
+        m.process_time = _time.process_time
+        return m
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+
+def ticks_diff(a, b):
+    d = (a - b) & TICKS_MAX
+    return d - TICKS_MAX - 1 if d & TICKS_HALF else d
+
+
+clock = VirtualClock()
+module = clock.make_module()
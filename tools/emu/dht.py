@@ -0,0 +1,79 @@
+"""
+dht falso: lecturas de DHT11/DHT22 guionizadas.
+
+`script` es la fuente compartida por todos los sensores:
+    dht.script = [(22.0, 45.0), (22.5, 46.0), None]   # None = lectura fallida
+    dht.script = "traza.csv"                           # columnas temp,hum
+Sin guion, temperatura y humedad siguen un paseo aleatorio suave.
+La lista se recorre en bucle, una entrada por measure().
+"""
+
+import csv
+import random
+
+script = None
+_pos = 0
+_rng = random.Random(3)
+_walk = [22.0, 45.0]
+
+
+def load_csv(path):
+    rows = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                rows.append((float(row[0]), float(row[1])))
+            except ValueError:
+                if row[0].strip().lower() in ("none", "error", ""):
+                    rows.append(None)      # fila de fallo; las cabeceras se saltan
+    return rows
+
+
+def _next():
+    global script, _pos
+    if isinstance(script, str):
+        script = load_csv(script)
+    if script:
+        value = script[_pos % len(script)]
+        _pos += 1
+        return value
+    _walk[0] = max(15.0, min(32.0, _walk[0] + _rng.choice((-0.5, 0, 0, 0.5))))
+    _walk[1] = max(20.0, min(85.0, _walk[1] + _rng.choice((-1, 0, 0, 1))))
+    return tuple(_walk)
+
+
+class DHTBase:
+    def __init__(self, pin):
+        self.pin = pin
+        self.reads = 0
+        self.errors = 0
+        self._t = None
+        self._h = None
+
+    def measure(self):
+        self.reads += 1
+        value = _next()
+        if value is None:
+            self.errors += 1
+            raise OSError(110, "ETIMEDOUT (emu)")
+        self._t, self._h = value
+
+    def temperature(self):
+        return self._t
+
+    def humidity(self):
+        return self._h
+
+
+class DHT11(DHTBase):
+    def measure(self):
+        super().measure()
+        # El DHT11 solo da enteros
+        self._t = int(self._t)
+        self._h = int(self._h)
+
+
+class DHT22(DHTBase):
+    pass
@@ -0,0 +1,73 @@
+"""
+framebuf falso (solo MONO_VLSB, el formato de la SSD1306).
+La fuente no es la real: cada carácter se dibuja con un patrón de 8x8
+derivado de su código, suficiente para medir qué bytes cambian.
+"""
+
+MONO_VLSB = 0
+
+
+def _glyph(ch):
+    if ch == " ":
+        return b"\x00" * 8
+    c = ord(ch)
+    return bytes(((c * 2654435761) >> (3 * i)) & 0x7E for i in range(8))
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, fmt=MONO_VLSB, stride=None):
+        if fmt != MONO_VLSB:
+            raise ValueError("solo MONO_VLSB")
+        self._buf = buffer
+        self._w = width
+        self._h = height
+
+    def fill(self, c):
+        v = 0xFF if c else 0
+        for i in range(len(self._buf)):
+            self._buf[i] = v
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._w and 0 <= y < self._h):
+            return None
+        i = (y >> 3) * self._w + x
+        bit = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buf[i] & bit else 0
+        if c:
+            self._buf[i] |= bit
+        else:
+            self._buf[i] &= ~bit & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(0, y), min(self._h, y + h)):
+            for xx in range(max(0, x), min(self._w, x + w)):
+                self.pixel(xx, yy, c)
+
+    def rect(self, x, y, w, h, c):
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def text(self, s, x, y, c=1):
+        for ch in str(s):
+            g = _glyph(ch)
+            for col in range(8):
+                bits = g[col]
+                for row in range(8):
+                    if bits & (1 << row):
+                        self.pixel(x + col, y + row, c)
+            x += 8
+
+    def scroll(self, dx, dy):
+        pass
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        pass
@@ -0,0 +1,36 @@
+"""
+Sustituto del módulo gc de MicroPython: collect() real y mem_free() /
+mem_alloc() estimados con tracemalloc sobre un heap del tamaño del de la
+Pico W (sin tracemalloc activo, mem_alloc() es 0).
+"""
+
+import gc as _gc
+import tracemalloc
+import types
+
+HEAP_SIZE = 192 * 1024
+
+
+def mem_alloc():
+    if not tracemalloc.is_tracing():
+        return 0
+    return tracemalloc.get_traced_memory()[0]
+
+
+def mem_free():
+    return max(0, HEAP_SIZE - mem_alloc())
+
+
+def make_module():
+    m = types.ModuleType("gc")
+    m.collect = _gc.collect
+    m.enable = _gc.enable
+    m.disable = _gc.disable
+    m.isenabled = _gc.isenabled
+    m.mem_alloc = mem_alloc
+    m.mem_free = mem_free
+    m.threshold = lambda amount=None: -1
+    return m
+
+
+module = make_module()
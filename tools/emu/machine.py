@@ -0,0 +1,245 @@
+"""
+machine falso para el host.
+I2C cuenta transacciones y bytes escritos (incluida la dirección), que es
+lo que cuesta el tiempo de bus en la OLED real. I2S entrega PCM de una
+fuente (WavSource o NoiseSource) al ritmo del reloj virtual (desde un
+hilo, el núcleo 1 de _thread, la lectura bloqueante espera a que el reloj
+llegue al final del bloque); reset() lanza machine.Reset para que el
+emulador se detenga.
+"""
+
+import asyncio
+import random
+import threading
+import time as _time
+import wave
+from array import array
+
+from clock import clock
+
+CORE1_POLL = 0.0002      # s reales entre comprobaciones del reloj (núcleo 1)
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+
+    def __init__(self, id, mode=IN, pull=None, value=None):
+        self.id = id
+        self.mode = mode
+        self._value = value or 0
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = 1 if v else 0
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def toggle(self):
+        self._value ^= 1
+
+
+class I2C:
+    def __init__(self, id, sda=None, scl=None, freq=400000):
+        self.freq = freq
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def writeto(self, addr, buf, stop=True):
+        self.transactions += 1
+        self.bytes_written += 1 + len(buf)
+        return len(buf)
+
+    def writevec(self, addr, vector, stop=True):
+        self.transactions += 1
+        self.bytes_written += 1 + sum(len(b) for b in vector)
+        return 1
+
+    def bus_time_ms(self):
+        """Tiempo aproximado de bus: 9 bits por byte a la frecuencia configurada."""
+        return self.bytes_written * 9 * 1000 / self.freq
+
+
+# -------- Reinicio -------------------------------------------------------
+class Reset(BaseException):
+    """machine.reset(): detiene el emulador (el firmware no debe capturarlo)."""
+
+
+resets = 0
+
+
+def reset():
+    global resets
+    resets += 1
+    raise Reset()
+
+
+def soft_reset():
+    reset()
+
+
+def freq(hz=None):
+    return 125000000
+
+
+def unique_id():
+    return b"\xe6\x61\x41\x04\x03\x2b\x00\x01"
+
+
+def idle():
+    pass
+
+
+# -------- Fuentes de audio -----------------------------------------------
+class NoiseSource:
+    """
+    PCM int16 sintético: ruido de fondo con ráfagas de voz ocasionales.
+    Los bloques se generan una vez por nivel (8 niveles) y se reutilizan,
+    para que una hora de audio no cueste minutos de CPU en el host.
+    """
+
+    LEVELS = 8
+
+    # Con la calibración por defecto (aura.loudness: 0 dBFS = 120 dB SPL)
+    # el fondo queda en ~45 dBA y las ráfagas llegan a ~80 dBA
+    def __init__(self, level=0.0005, burst=0.015, seed=1):
+        self.level = level
+        self.burst = burst
+        self.rng = random.Random(seed)
+        self.step = 0
+        self.bank = {}
+
+    def _block(self, step, nbytes, variant):
+        key = (step, nbytes, variant)
+        block = self.bank.get(key)
+        if block is None:
+            amp = int((self.level + self.burst * step / (self.LEVELS - 1)) * 32767)
+            samples = array("h", (self.rng.randint(-amp, amp) for _ in range(nbytes // 2)))
+            block = self.bank[key] = samples.tobytes()
+        return block
+
+    def fill(self, view, nbytes):
+        r = self.rng.random()
+        if r < 0.05:
+            self.step = self.rng.randrange(1, self.LEVELS)
+        elif r < 0.25:
+            self.step = 0
+        view[:nbytes] = self._block(self.step, nbytes, self.rng.randrange(4))
+
+
+class WavSource:
+    """PCM de un WAV mono de 16 bits; al terminar vuelve a empezar."""
+
+    def __init__(self, path, loop=True):
+        with wave.open(path, "rb") as w:
+            if w.getsampwidth() != 2 or w.getnchannels() != 1:
+                raise ValueError("se necesita un WAV mono de 16 bits")
+            self.rate = w.getframerate()
+            self.data = w.readframes(w.getnframes())
+        self.pos = 0
+        self.loop = loop
+
+    def fill(self, view, nbytes):
+        done = 0
+        while done < nbytes:
+            if self.pos >= len(self.data):
+                if not self.loop:
+                    view[done:nbytes] = bytes(nbytes - done)
+                    return
+                self.pos = 0
+            n = min(nbytes - done, len(self.data) - self.pos)
+            view[done:done + n] = self.data[self.pos:self.pos + n]
+            self.pos += n
+            done += n
+
+
+# -------- I2S ------------------------------------------------------------
+class I2S:
+    RX = 0
+    TX = 1
+    MONO = 0
+    STEREO = 1
+
+    source = NoiseSource()      # fuente compartida: WavSource(...) para trazas
+
+    def __init__(self, id, sck=None, ws=None, sd=None, mode=RX, bits=16,
+                 format=MONO, rate=16000, ibuf=20000):
+        self.bits = bits
+        self.rate = rate
+        self.channels = 2 if format == I2S.STEREO else 1
+        self.handler = None
+        self.blocks = 0
+        self.ibuf = ibuf
+        self.due = None             # fin del próximo bloque leído desde el núcleo 1
+        self.dropped = 0            # desbordes del ibuf con el núcleo 1 atrasado
+
+    def _duration(self, nbytes):
+        return nbytes / (self.bits // 8 * self.channels * self.rate)
+
+    def irq(self, handler):
+        self.handler = handler
+
+    def _pace(self, duration):
+        """Núcleo 1: espera (en tiempo real) a que el reloj virtual llegue al bloque."""
+        now = clock.now()
+        if self.due is None:
+            self.due = now
+        elif now - self.due > self._duration(self.ibuf):
+            self.dropped += 1             # el ibuf se ha desbordado: se pierde audio
+            self.due = now
+        self.due += duration
+        clock.core1 = self.due
+        while clock.now() < self.due:
+            _time.sleep(CORE1_POLL)
+        clock.core1 = clock.now()         # calculando: el reloj no salta
+
+    def readinto(self, buf):
+        """Bloqueante sin irq; con irq vuelve enseguida y avisa al llenarse."""
+        view = memoryview(buf).cast("B")
+        nbytes = len(view)
+        I2S.source.fill(view, nbytes)
+        self.blocks += 1
+        duration = self._duration(nbytes)
+        if self.handler is None:
+            if threading.current_thread() is not threading.main_thread():
+                self._pace(duration)
+            else:
+                clock.advance(duration)
+            return nbytes
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            clock.advance(duration)
+            self.handler(self)
+            return 0
+        loop.call_later(duration, self._complete, self.handler)
+        return 0
+
+    def _complete(self, handler):
+        if handler is self.handler:
+            handler(self)
+
+    def deinit(self):
+        self.handler = None
+
+
+# -------- ADC ------------------------------------------------------------
+class ADC:
+    CORE_TEMP = 4
+    source = None               # callable() -> int 0..65535; por defecto ruido
+
+    def __init__(self, pin):
+        self.pin = pin
+        self.rng = random.Random(2)
+
+    def read_u16(self):
+        if ADC.source is not None:
+            return ADC.source()
+        return max(0, min(65535, 32768 + int(self.rng.gauss(0, 900))))
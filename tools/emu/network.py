@@ -0,0 +1,98 @@
+"""
+network falso: WLAN simulada con latencia y cortes inyectables.
+
+`link` describe la red para todo el emulador; uasyncio.open_connection
+la consulta en cada conexión y en cada petición:
+
+    link.connect_delay   s hasta que WLAN.isconnected() da True
+    link.latency         s añadidos a cada petición (ida y vuelta)
+    link.drop_rate       probabilidad de que una petición se corte
+    link.outages         [(inicio, fin), ...] en s virtuales sin red
+    link.fail            la WLAN nunca llega a conectar
+"""
+
+import random
+
+from clock import clock
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_WRONG_PASSWORD = -3
+STAT_NO_AP_FOUND = -2
+STAT_CONNECT_FAIL = -1
+STAT_GOT_IP = 3
+
+
+class Link:
+    def __init__(self):
+        self.connect_delay = 2.0
+        self.latency = 0.0
+        self.drop_rate = 0.0
+        self.outages = []
+        self.fail = False
+        self.rng = random.Random(1)
+        self.drops = 0           # peticiones cortadas
+        self.refused = 0         # conexiones rechazadas sin red
+
+    def up(self):
+        now = clock.now()
+        for start, end in self.outages:
+            if start <= now < end:
+                return False
+        return True
+
+    def should_drop(self):
+        if self.drop_rate and self.rng.random() < self.drop_rate:
+            self.drops += 1
+            return True
+        return False
+
+
+link = Link()
+
+
+class WLAN:
+    def __init__(self, interface=STA_IF):
+        self.interface = interface
+        self._active = False
+        self._since = None
+        self.ssid = None
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        self._active = bool(value)
+        if not value:
+            self._since = None
+
+    def connect(self, ssid=None, key=None):
+        self.ssid = ssid
+        self._since = clock.now()
+
+    def disconnect(self):
+        self._since = None
+
+    def isconnected(self):
+        if not self._active or self._since is None or link.fail:
+            return False
+        return clock.now() - self._since >= link.connect_delay and link.up()
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -55
+        if link.fail:
+            return STAT_NO_AP_FOUND
+        if self._since is None:
+            return STAT_IDLE
+        return STAT_GOT_IP if self.isconnected() else STAT_CONNECTING
+
+    def ifconfig(self, config=None):
+        return ("192.168.4.20", "255.255.255.0", "192.168.4.1", "192.168.4.1")
+
+    def config(self, *args, **kwargs):
+        if args == ("mac",):
+            return b"\x28\xcd\xc1\x00\x00\x01"
+        return None
@@ -0,0 +1,181 @@
+"""
+uasyncio falso: asyncio de CPython con los añadidos de MicroPython y un
+bucle de eventos sobre el reloj virtual (tools/emu/clock.py).
+
+Cuando el bucle no tiene nada listo, en vez de dormir adelanta el reloj
+hasta el siguiente temporizador. Si hay sockets reales abiertos (p. ej.
+Mientras una conexión o una respuesta de red está en curso (p. ej. contra
+tools/fake_backend.py) espera de verdad, en tramos cortos, para no dar
+por vencido un timeout mientras llega la respuesta.
+"""
+
+import asyncio as _asyncio
+import selectors as _selectors
+from asyncio import *  # noqa: F401,F403
+
+from clock import clock
+from network import link
+
+REAL_SLICE = 0.05        # s de espera real con sockets abiertos
+
+
+class _VirtualSelector:
+    def __init__(self, selector):
+        self._sel = selector
+        self.inflight = 0        # esperas de red en curso (ver _LinkReader)
+
+    def __getattr__(self, name):
+        return getattr(self._sel, name)
+
+    def select(self, timeout=None):
+        if self.inflight:
+            wait = REAL_SLICE if timeout is None else min(timeout, REAL_SLICE)
+            return self._sel.select(wait)
+        events = self._sel.select(0)
+        if not events:
+            if timeout is None:
+                raise RuntimeError("emu: bucle bloqueado sin temporizadores ni red")
+            clock.advance(timeout)
+        return events
+
+
+class VirtualLoop(_asyncio.SelectorEventLoop):
+    def __init__(self):
+        super().__init__(_VirtualSelector(_selectors.DefaultSelector()))
+
+    def time(self):
+        return clock.now()
+
+
+def new_event_loop():
+    loop = VirtualLoop()
+    _asyncio.set_event_loop(loop)
+    return loop
+
+
+def run(coro):
+    loop = new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        # Como asyncio.run: cancelar las tareas de fondo (pantalla, audio...)
+        pending = _asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(_asyncio.gather(*pending, return_exceptions=True))
+        _asyncio.set_event_loop(None)
+        loop.close()
+
+
+def get_event_loop():
+    try:
+        return _asyncio.get_running_loop()
+    except RuntimeError:
+        return new_event_loop()
+
+
+async def sleep_ms(ms):
+    await _asyncio.sleep(ms / 1000)
+
+
+async def wait_for_ms(aw, timeout):
+    return await _asyncio.wait_for(aw, timeout / 1000)
+
+
+class ThreadSafeFlag:
+    """Como el de MicroPython: set() desde una IRQ despierta a wait()."""
+
+    def __init__(self):
+        self._event = _asyncio.Event()
+        self._loop = None
+
+    def set(self):
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            try:
+                if _asyncio.get_running_loop() is loop:
+                    self._event.set()
+                    return
+            except RuntimeError:
+                pass
+            loop.call_soon_threadsafe(self._event.set)
+        else:
+            self._event.set()
+
+    def clear(self):
+        self._event.clear()
+
+    async def wait(self):
+        self._loop = _asyncio.get_running_loop()
+        await self._event.wait()
+        self._event.clear()
+
+
+# -------- Streams con las condiciones de red de network.link ----------
+class _Inflight:
+    """Marca una espera de red real: el bucle deja de saltar el reloj."""
+
+    def __enter__(self):
+        sel = getattr(_asyncio.get_running_loop(), "_selector", None)
+        self.sel = sel if isinstance(sel, _VirtualSelector) else None
+        if self.sel is not None:
+            self.sel.inflight += 1
+
+    def __exit__(self, *exc):
+        if self.sel is not None:
+            self.sel.inflight -= 1
+
+
+class _LinkReader:
+    def __init__(self, reader):
+        self._r = reader
+
+    def __getattr__(self, name):
+        return getattr(self._r, name)
+
+    async def readline(self):
+        with _Inflight():
+            return await self._r.readline()
+
+    async def readexactly(self, n):
+        with _Inflight():
+            return await self._r.readexactly(n)
+
+    async def read(self, n=-1):
+        with _Inflight():
+            return await self._r.read(n)
+
+
+class _LinkWriter:
+    def __init__(self, writer):
+        self._w = writer
+
+    def __getattr__(self, name):
+        return getattr(self._w, name)
+
+    async def drain(self):
+        if not link.up() or link.should_drop():
+            self._w.close()
+            raise OSError(104, "ECONNRESET (emu)")
+        if link.latency:
+            await _asyncio.sleep(link.latency)
+        with _Inflight():
+            await self._w.drain()
+
+
+async def open_connection(host, port, *args, **kwargs):
+    if not link.up():
+        link.refused += 1
+        await _asyncio.sleep(0.5)
+        raise OSError(113, "EHOSTUNREACH (emu)")
+    if link.latency:
+        await _asyncio.sleep(link.latency)        # handshake TCP
+    with _Inflight():
+        reader, writer = await _asyncio.open_connection(host, port, *args, **kwargs)
+    return _LinkReader(reader), _LinkWriter(writer)
+
+
+__all__ = [n for n in dir(_asyncio) if not n.startswith("_")] + [
+    "VirtualLoop", "run", "sleep_ms", "wait_for_ms", "ThreadSafeFlag",
+    "open_connection", "new_event_loop", "get_event_loop"]
@@ -0,0 +1,58 @@
+"""
+urequests falso (bloqueante) sobre http.client, respetando network.link.
+"""
+
+import http.client
+import json as _json
+from urllib.parse import urlsplit
+
+from network import link
+
+
+class Response:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode()
+
+    def json(self):
+        return _json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+def request(method, url, data=None, json=None, headers=None, timeout=None):
+    if not link.up() or link.should_drop():
+        raise OSError(113, "EHOSTUNREACH (emu)")
+    parts = urlsplit(url)
+    headers = dict(headers or {})
+    if json is not None:
+        data = _json.dumps(json)
+        headers.setdefault("Content-Type", "application/json")
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout or 10)
+    try:
+        conn.request(method, parts.path or "/", body=data, headers=headers)
+        resp = conn.getresponse()
+        return Response(resp.status, resp.read())
+    finally:
+        conn.close()
+
+
+def get(url, **kw):
+    return request("GET", url, **kw)
+
+
+def post(url, **kw):
+    return request("POST", url, **kw)
+
+
+def put(url, **kw):
+    return request("PUT", url, **kw)
+
+
+def delete(url, **kw):
+    return request("DELETE", url, **kw)
@@ -0,0 +1,250 @@
+"""
+fake_backend.py – backend AURA mínimo para pruebas en el host
+-------------------------------------------------------------
+Servidor HTTP/1.1 con keep-alive que imita las rutas que usan los
+dispositivos, sin Postgres ni Node:
+
+    POST /api/devices/data         -> {"status": "ok" | "no_registrado", "configVersion"}
+    POST /api/devices/data/batch   -> {"status": "ok", "count": n, "configVersion"}
+                                      ("records" se decodifica con aura.codec)
+    POST /api/devices/alert        -> {"status": "ok"}; guarda la alerta
+                                      (aura.alert) con la hora de llegada
+    GET  /api/devices/config       -> {"config": {...}, "version"} con ETag, o 304
+                                      si If-None-Match coincide
+    GET  /api/devices/registration?wait=N
+                                   -> {"status": "ok" | "no_registrado", "wait"}
+                                      retenida hasta N s (máx. --long-poll) o
+                                      hasta el reclamo (--claim-after)
+
+Uso:
+    python tools/fake_backend.py --port 4000 [--latency 50] [--unregistered]
+        [--claim-after 30] [--long-poll 0]      # 0: sin la ruta (backend antiguo)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from aura import codec  # noqa: E402
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.measurements = 0
+        self.health = None       # último bloque "health" recibido (aura.probe)
+        self.config_gets = 0
+        self.not_modified = 0    # GET /config respondidos con 304
+        self.records = 0         # registros binarios decodificados (aura.codec)
+        self.registration = 0    # consultas de registro (long-poll)
+        self.last_record = None  # último, como tupla de codec.unpack_from
+        self.alerts = []         # (time.monotonic() de llegada, alerta) de aura.alert
+
+    def add(self, requests=0, connections=0, measurements=0):
+        with self.lock:
+            self.requests += requests
+            self.connections += connections
+            self.measurements += measurements
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "AuraFake/1.0"
+    # Cabeceras y cuerpo van en dos escrituras: sin esto Nagle + ACK
+    # retardado añaden ~40 ms a cada respuesta y falsean las latencias
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stats.add(connections=1)
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _reply(self, status, obj, etag=None):
+        body = json.dumps(obj).encode() if obj is not None else b""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if obj is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        return json.loads(raw) if raw else {}
+
+    def do_GET(self):
+        self.server.stats.add(requests=1)
+        if self.path == "/api/devices/config":
+            version = self.server.config_version()
+            etag = '"%s"' % version
+            with self.server.stats.lock:
+                self.server.stats.config_gets += 1
+            inm = self.headers.get("If-None-Match") or ""
+            if etag in [t.strip() for t in inm.split(",")]:
+                with self.server.stats.lock:
+                    self.server.stats.not_modified += 1
+                return self._reply(304, None, etag)
+            return self._reply(200, {"config": dict(self.server.config),
+                                     "version": version}, etag)
+        url = urlsplit(self.path)
+        if url.path == "/api/devices/registration" and self.server.long_poll:
+            with self.server.stats.lock:
+                self.server.stats.registration += 1
+            if not self.server.unregistered:
+                return self._reply(200, {"status": "ok"})
+            wait = min(float(parse_qs(url.query).get("wait", ["0"])[0] or 0),
+                       self.server.long_poll)
+            t0 = time.monotonic()
+            if wait > 0:
+                self.server.claimed.wait(wait)
+            return self._reply(200, {
+                "status": "no_registrado" if self.server.unregistered else "ok",
+                "wait": max(1, round(time.monotonic() - t0)) if wait > 0 else 0})
+        if self.path == "/healthz":
+            return self._reply(200, {"status": "ok"})
+        return self._reply(404, {"message": "not found"})
+
+    def do_POST(self):
+        self.server.stats.add(requests=1)
+        try:
+            body = self._body()
+        except ValueError:
+            return self._reply(400, {"message": "JSON inválido"})
+        if self.path == "/api/devices/data":
+            if self.server.unregistered:
+                return self._reply(200, {"status": "no_registrado"})
+            self.server.stats.add(measurements=1)
+            return self._reply(200, {"status": "ok",
+                                     "configVersion": self.server.config_version()})
+        if self.path == "/api/devices/data/batch":
+            return self._reply(*self.server.ingest(body))
+        if self.path == "/api/devices/alert":
+            return self._reply(*self.server.alert(body))
+        return self._reply(404, {"message": "not found"})
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512     # flotas de tools/loadgen.py conectando a la vez
+
+    def ingest(self, body):
+        """
+        Lote de /api/devices/data/batch (o de MQTT, ver fake_broker.py):
+        devuelve (status HTTP, respuesta).
+        """
+        items = body.get("items") or []
+        if not items:
+            return 400, {"message": "Campo 'items' es necesario"}
+        if "records" in body:
+            try:
+                data = codec.b64decode(body["records"])
+                recs = codec.unpack_many(data)
+            except (ValueError, TypeError):
+                recs = None
+            if recs is None or len(recs["seq"]) != len(items):
+                return 400, {"message": "Campo 'records' inválido"}
+            with self.stats.lock:
+                self.stats.records += len(items)
+                self.stats.last_record = codec.unpack_from(
+                    data, (len(items) - 1) * codec.RECORD_SIZE)
+        self.stats.add(measurements=len(items))
+        if isinstance(body.get("health"), dict):
+            self.stats.health = body["health"]
+        return 200, {"status": "ok", "count": len(items),
+                     "configVersion": self.config_version()}
+
+    def alert(self, body):
+        """Alerta de /api/devices/alert (o de MQTT): devuelve (status HTTP, respuesta)."""
+        if not isinstance(body.get("state"), str) or not isinstance(body.get("on"), bool):
+            return 400, {"message": "Campos 'state' y 'on' son necesarios"}
+        with self.stats.lock:
+            self.stats.alerts.append((time.monotonic(), body))
+        return 200, {"status": "ok"}
+
+    def claim(self):
+        """Marca el dispositivo como reclamado y despierta las consultas retenidas."""
+        self.unregistered = False
+        self.claimed.set()
+
+    def config_version(self):
+        """Versión de la config: hash corto del JSON, como el backend real."""
+        raw = json.dumps(self.config, sort_keys=True).encode()
+        return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.0, unregistered=False,
+                config=None, verbose=False, long_poll=30, claim_after=None):
+    """
+    Crea el servidor (sin arrancarlo); port=0 elige un puerto libre.
+    long_poll: s máximos de retención del registro (0 = sin la ruta).
+    claim_after: s tras los que se reclaman los dispositivos sin registrar.
+    """
+    srv = Server((host, port), Handler)
+    srv.latency = latency
+    srv.unregistered = unregistered
+    srv.long_poll = long_poll
+    srv.claimed = threading.Event()
+    if claim_after is not None:
+        timer = threading.Timer(claim_after, srv.claim)
+        timer.daemon = True
+        timer.start()
+    srv.verbose = verbose
+    if not verbose:
+        # Clientes que cortan a mitad de respuesta (tools/emu) no son errores
+        srv.handle_error = lambda request, client_address: None
+    srv.stats = Stats()
+    srv.config = config or {"samplingInterval": 60, "alias": None,
+                            "batchSize": 10, "flushInterval": 300,
+                            "deadbandTemp": 0.5, "deadbandHum": 2,
+                            "deadbandSound": 0.1, "heartbeat": 600,
+                            "dbOffset": 120, "configRefresh": 600,
+                            "alertCooldown": 10}
+    return srv
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=4000)
+    ap.add_argument("--latency", type=float, default=0.0, help="ms añadidos a cada respuesta")
+    ap.add_argument("--unregistered", action="store_true", help="responder no_registrado")
+    ap.add_argument("--claim-after", type=float, help="s hasta reclamar (con --unregistered)")
+    ap.add_argument("--long-poll", type=float, default=30,
+                    help="s máximos de retención del registro (0: sin la ruta)")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args()
+    srv = make_server(args.host, args.port, args.latency / 1000, args.unregistered,
+                      verbose=args.verbose, long_poll=args.long_poll,
+                      claim_after=args.claim_after)
+    print("Backend falso en http://%s:%d" % srv.server_address)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        st = srv.stats
+        print("peticiones=%d conexiones=%d mediciones=%d"
+              % (st.requests, st.connections, st.measurements))
+
+
+if __name__ == "__main__":
+    main()
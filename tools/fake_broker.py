@@ -0,0 +1,214 @@
+"""
+fake_broker.py – broker MQTT 3.1.1 mínimo para pruebas en el host
+-----------------------------------------------------------------
+Lo justo para aura.mqtt (dispositivo) y aura-backend/src/mqtt.ts
+(suscriptor del backend), sin Mosquitto:
+
+    CONNECT/CONNACK, PUBLISH QoS 0 y 1 (PUBACK), SUBSCRIBE/SUBACK con
+    comodines + y #, PINGREQ/PINGRESP, DISCONNECT.
+
+No guarda sesiones ni mensajes retenidos: cada PUBLISH se reparte en el
+momento a los suscriptores conectados (con el menor QoS de los dos) y,
+si se indica, a on_publish(tema, mensaje) en el mismo proceso; así
+tools/run_emu.py --mqtt lo conecta a tools/fake_backend.py como haría el
+suscriptor del backend real.
+
+Cuenta conexiones, publicaciones y bytes recibidos y enviados.
+
+Uso:
+    python tools/fake_broker.py --port 1883 [-v]
+"""
+
+import argparse
+import socketserver
+import struct
+import threading
+
+CONNECT, CONNACK, PUBLISH, PUBACK = 0x10, 0x20, 0x30, 0x40
+SUBSCRIBE, SUBACK, PINGREQ, PINGRESP, DISCONNECT = 0x80, 0x90, 0xC0, 0xD0, 0xE0
+
+
+def topic_matches(pattern, topic):
+    p = pattern.split("/")
+    t = topic.split("/")
+    for i, part in enumerate(p):
+        if part == "#":
+            return True
+        if i >= len(t) or part != "+" and part != t[i]:
+            return False
+    return len(p) == len(t)
+
+
+def _varlen(n):
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        out.append(b | 0x80 if n else b)
+        if not n:
+            return bytes(out)
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.publishes = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.topics = {}
+
+
+class Session(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.subs = []               # (patrón, qos)
+        self.wlock = threading.Lock()
+        self.pid = 0
+        with self.server.stats.lock:
+            self.server.stats.connections += 1
+
+    def _recv(self, n):
+        data = b""
+        while len(data) < n:
+            chunk = self.request.recv(n - len(data))
+            if not chunk:
+                raise EOFError
+            data += chunk
+        with self.server.stats.lock:
+            self.server.stats.bytes_in += n
+        return data
+
+    def send(self, data):
+        with self.wlock:
+            self.request.sendall(data)
+        with self.server.stats.lock:
+            self.server.stats.bytes_out += len(data)
+
+    def _packet(self):
+        first = self._recv(1)[0]
+        n = shift = 0
+        while True:
+            b = self._recv(1)[0]
+            n |= (b & 0x7F) << shift
+            if not b & 0x80:
+                break
+            shift += 7
+        return first, self._recv(n) if n else b""
+
+    def deliver(self, topic, msg, qos):
+        t = topic.encode()
+        head = struct.pack("!H", len(t)) + t
+        if qos:
+            self.pid = self.pid % 0xFFFF + 1
+            head += struct.pack("!H", self.pid)
+        self.send(bytes((PUBLISH | qos << 1,)) + _varlen(len(head) + len(msg)) + head + msg)
+
+    def handle(self):
+        srv = self.server
+        try:
+            first, body = self._packet()
+            if first & 0xF0 != CONNECT:
+                return
+            keepalive = struct.unpack_from("!H", body, 8)[0]
+            if keepalive:
+                self.request.settimeout(keepalive * 1.5)
+            self.send(bytes((CONNACK, 2, 0, 0)))
+            with srv.lock:
+                srv.sessions.append(self)
+            while True:
+                first, body = self._packet()
+                typ = first & 0xF0
+                if typ == PUBLISH:
+                    qos = (first >> 1) & 3
+                    n = struct.unpack_from("!H", body)[0]
+                    topic = body[2:2 + n].decode()
+                    pos = 2 + n
+                    if qos:
+                        pid = body[pos:pos + 2]
+                        pos += 2
+                    msg = body[pos:]
+                    with srv.stats.lock:
+                        srv.stats.publishes += 1
+                        srv.stats.topics[topic] = srv.stats.topics.get(topic, 0) + 1
+                    srv.publish(topic, msg, qos)
+                    if qos:
+                        self.send(bytes((PUBACK, 2)) + pid)
+                elif typ == SUBSCRIBE:
+                    pid = body[:2]
+                    pos = 2
+                    granted = bytearray()
+                    while pos < len(body):
+                        n = struct.unpack_from("!H", body, pos)[0]
+                        pattern = body[pos + 2:pos + 2 + n].decode()
+                        qos = min(body[pos + 2 + n], 1)
+                        self.subs.append((pattern, qos))
+                        granted.append(qos)
+                        pos += 3 + n
+                    self.send(bytes((SUBACK, 2 + len(granted))) + pid + granted)
+                elif typ == PINGREQ:
+                    self.send(bytes((PINGRESP, 0)))
+                elif typ == DISCONNECT:
+                    return
+                # PUBACK de los suscriptores: sin reintentos, se ignoran
+        except (EOFError, OSError, struct.error):
+            return
+        finally:
+            with srv.lock:
+                if self in srv.sessions:
+                    srv.sessions.remove(self)
+
+
+class Broker(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def publish(self, topic, msg, qos):
+        if self.on_publish is not None:
+            self.on_publish(topic, msg)
+        with self.lock:
+            sessions = list(self.sessions)
+        for s in sessions:
+            for pattern, sub_qos in s.subs:
+                if topic_matches(pattern, topic):
+                    try:
+                        s.deliver(topic, msg, min(qos, sub_qos))
+                    except OSError:
+                        pass
+                    break
+
+
+def make_broker(host="127.0.0.1", port=0, on_publish=None):
+    """Crea el broker (sin arrancarlo); port=0 elige un puerto libre."""
+    brk = Broker((host, port), Session)
+    brk.on_publish = on_publish
+    brk.lock = threading.Lock()
+    brk.sessions = []
+    brk.stats = Stats()
+    return brk
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=1883)
+    ap.add_argument("-v", "--verbose", action="store_true", help="mostrar cada publicación")
+    args = ap.parse_args()
+    on_publish = None
+    if args.verbose:
+        def on_publish(topic, msg):
+            print("%s  %d B" % (topic, len(msg)))
+    brk = make_broker(args.host, args.port, on_publish)
+    print("Broker MQTT falso en %s:%d" % brk.server_address)
+    try:
+        brk.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        st = brk.stats
+        print("conexiones=%d publicaciones=%d bytes entrada=%d salida=%d"
+              % (st.connections, st.publishes, st.bytes_in, st.bytes_out))
+
+
+if __name__ == "__main__":
+    main()
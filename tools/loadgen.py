@@ -0,0 +1,299 @@
+"""
+loadgen.py – generador de carga: flota de dispositivos AURA virtuales
+---------------------------------------------------------------------
+Lanza N dispositivos virtuales en un solo proceso asyncio. Cada uno
+reproduce raspberry_defsim.py con SIMULATE = True: paseo aleatorio de
+sensores (aura.sim), estado con las reglas de defsim (aura.classify),
+valor del clasificador como medición, espera del registro y después envío periódico por su propia
+conexión keep-alive (aura.http.AsyncHttpClient).
+
+El registro es el del firmware (aura.register): long-poll a
+GET /api/devices/registration y retroceso exponencial con jitter si el
+backend no lo admite. Con --legacy-register se repite el flujo anterior,
+POST /api/devices/data cada --retry s hasta recibir "ok".
+
+--rate es el ritmo agregado de lecturas por segundo de toda la flota;
+cada dispositivo envía una lectura cada devices/rate s, con la fase
+repartida al azar. Con --batch N (>1) las lecturas se agrupan y se
+envían a /api/devices/data/batch con sus registros binarios (aura.codec).
+
+Al final (y cada --report s) muestra throughput, latencias p50/p95/p99,
+códigos de respuesta, errores y reutilización de conexiones.
+
+Backend local sin red externa:
+    SEED_FLEET=2000 npm run seed        # crea AURA-LG00001..AURA-LG02000
+    python tools/loadgen.py --server http://127.0.0.1:4000 --devices 2000 \\
+        --rate 200 --duration 300 --claim usuario@aura.local:clave
+
+Prueba rápida contra tools/fake_backend.py en el mismo proceso:
+    python tools/loadgen.py --fake --devices 500 --rate 500 --duration 20
+
+Escenario "N dispositivos sin reclamar" (req/s del servidor con cada flujo):
+    python tools/loadgen.py --fake --unclaimed --devices 100 --duration 60
+    python tools/loadgen.py --fake --unclaimed --devices 100 --duration 60 --legacy-register
+    python tools/loadgen.py --fake --unclaimed --claim-after 30 ...   # se reclaman a los 30 s
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import emu  # noqa: E402
+
+emu.install(fakes=False)      # ticks_* para aura.batch; red y asyncio reales
+
+from aura.batch import MeasurementBatch  # noqa: E402
+from aura.classify import Classifier, DEFSIM  # noqa: E402
+from aura.http import AsyncHttpClient, HttpClient, MeasurementPayload  # noqa: E402
+from aura.register import Registration  # noqa: E402
+from aura.sim import SensorWalk  # noqa: E402
+from aura.states import state_name  # noqa: E402
+
+
+class Metrics:
+    def __init__(self):
+        self.latencies = array("f")       # ms de las peticiones de medición
+        self.codes = {}
+        self.errors = {}
+        self.readings = 0
+        self.registered = 0
+        self.register_ms = array("f")     # tiempo hasta el primer "ok"
+        self.polls = 0                    # consultas de registro (long-poll, sin latencias)
+        self.t0 = time.perf_counter()
+        self.mark = (self.t0, 0, 0, 0)    # instante, peticiones, lecturas y consultas del último informe
+
+    def request(self, ms, code, readings):
+        self.latencies.append(ms)
+        self.codes[code] = self.codes.get(code, 0) + 1
+        if code == 200:
+            self.readings += readings
+
+    def error(self, exc):
+        name = type(exc).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class VirtualDevice:
+    def __init__(self, code, server, metrics, interval, batch, seed):
+        self.code = code
+        self.metrics = metrics
+        self.interval = interval
+        rng = random.Random(seed)
+        self.rng = rng
+        self.walk = SensorWalk(22.35, 42.0, rng.uniform(30, 45), rng)
+        self.cls = Classifier(DEFSIM)
+        self.http = AsyncHttpClient(server, timeout=10)
+        self.payload = MeasurementPayload(code)
+        self.header = b"x-device-code: " + code.encode() + b"\r\n"
+        self.batch = MeasurementBatch(size=batch, interval=3600, capacity=max(batch, 1),
+                                      records=True)
+        self.batched = batch > 1
+
+    def reading(self):
+        t, h, db, lvl = self.walk.step()
+        i = self.cls.classify(t, h, lvl)
+        return state_name(i, ascii=True), self.cls.value, (t, h, lvl, db)
+
+    async def post(self, path, body, readings):
+        t0 = time.perf_counter()
+        try:
+            code = await self.http.request("POST", path, body=body, headers=self.header)
+        except Exception as e:
+            self.metrics.error(e)
+            return None
+        self.metrics.request((time.perf_counter() - t0) * 1000, code, readings)
+        return code
+
+    async def register(self, retry, deadline, legacy=False):
+        """Flujo de defsim: long-poll (aura.register) o, con legacy, POST Calma/0 hasta "ok"."""
+        t0 = time.perf_counter()
+        if not legacy:
+            reg = Registration(self.http, self.header)
+            while time.perf_counter() < deadline:
+                self.metrics.polls += 1
+                try:
+                    status = await asyncio.wait_for(reg.poll(), deadline - time.perf_counter())
+                except asyncio.TimeoutError:
+                    return False             # fin de la prueba con la consulta retenida
+                if status == "ok":
+                    self.metrics.registered += 1
+                    self.metrics.register_ms.append((time.perf_counter() - t0) * 1000)
+                    return True
+                await asyncio.sleep(min(reg.pause(status), max(0, deadline - time.perf_counter())))
+            return False
+        while time.perf_counter() < deadline:
+            code = await self.post("/api/devices/data", self.payload.fill(0, "Calma"), 0)
+            if code == 200 and self.http.json().get("status") == "ok":
+                self.metrics.registered += 1
+                self.metrics.register_ms.append((time.perf_counter() - t0) * 1000)
+                return True
+            await asyncio.sleep(retry)
+        return False
+
+    async def run(self, stop_at, retry, skip_register, legacy_register=False):
+        # Fase aleatoria: la flota no envía toda a la vez
+        await asyncio.sleep(self.rng.uniform(0, self.interval))
+        if not skip_register and not await self.register(retry, stop_at, legacy_register):
+            await self.http.aclose()
+            return
+        next_at = time.perf_counter()
+        while True:
+            next_at += self.interval
+            state, measurement, channels = self.reading()
+            if self.batched:
+                self.batch.add(state, measurement, *channels)
+                if self.batch.due():
+                    if await self.post("/api/devices/data/batch", self.batch.body(self.code),
+                                       self.batch.count) == 200:
+                        self.batch.clear()
+            else:
+                await self.post("/api/devices/data", self.payload.fill(measurement, state), 1)
+            delay = next_at - time.perf_counter()
+            if next_at >= stop_at:
+                break
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await self.http.aclose()
+
+
+def claim_devices(server, codes, credentials):
+    """Inicia sesión y reclama los códigos (POST /api/devices) para que acepten datos."""
+    email, password = credentials.split(":", 1)
+    http = HttpClient(server)
+    if http.request("POST", "/auth/login",
+                    body=json.dumps({"email": email, "password": password})) != 200:
+        raise SystemExit("login fallido: %d %s" % (http.status, bytes(http.data)))
+    auth = b"Authorization: Bearer " + http.json()["token"].encode() + b"\r\n"
+    claimed = 0
+    for code in codes:
+        status = http.request("POST", "/api/devices", headers=auth,
+                              body=json.dumps({"code": code, "name": code}))
+        claimed += status == 201
+    http.close()
+    return claimed
+
+
+def report(m, http_clients, final=False):
+    now = time.perf_counter()
+    t_prev, req_prev, read_prev, polls_prev = m.mark
+    requests = len(m.latencies)
+    span = now - (m.t0 if final else t_prev)
+    req = requests if final else requests - req_prev
+    req += m.polls if final else m.polls - polls_prev
+    reads = m.readings if final else m.readings - read_prev
+    lat = m.latencies if final else m.latencies[req_prev:]
+    print("%s %6.1fs  %8.1f req/s  %8.1f lecturas/s  p50=%.1f p95=%.1f p99=%.1f ms  registrados=%d"
+          % ("TOTAL" if final else "     ", now - m.t0, req / span if span else 0,
+             reads / span if span else 0, percentile(lat, 0.5), percentile(lat, 0.95),
+             percentile(lat, 0.99), m.registered))
+    m.mark = (now, requests, m.readings, m.polls)
+    if final:
+        connects = sum(c.connects for c in http_clients)
+        total = sum(c.requests for c in http_clients)
+        print("códigos      %s" % ", ".join("%s=%d" % kv for kv in sorted(m.codes.items())))
+        print("errores      %s" % (", ".join("%s=%d" % kv for kv in sorted(m.errors.items()))
+                                   or "ninguno"))
+        print("conexiones   %d para %d peticiones (%.1f peticiones/conexión)"
+              % (connects, total, total / connects if connects else 0))
+        if m.register_ms:
+            print("registro     p50=%.0f ms p99=%.0f ms"
+                  % (percentile(m.register_ms, 0.5), percentile(m.register_ms, 0.99)))
+        if m.polls:
+            print("long-poll    %d consultas de registro (%.2f/s)" % (m.polls, m.polls / span))
+
+
+async def run(args, server):
+    m = Metrics()
+    codes = ["%s%05d" % (args.prefix, args.start + i) for i in range(args.devices)]
+    interval = args.devices / args.rate
+    stop_at = time.perf_counter() + args.duration
+    devices = [VirtualDevice(code, server, m, interval, args.batch, args.seed + i)
+               for i, code in enumerate(codes)]
+    tasks = [asyncio.create_task(d.run(stop_at, args.retry, args.skip_register,
+                                       args.legacy_register))
+             for d in devices]
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(args.report)
+            report(m, [])
+
+    rep = asyncio.create_task(reporter())
+    await asyncio.gather(*tasks)
+    rep.cancel()
+    report(m, [d.http for d in devices], final=True)
+
+
+def raise_fd_limit():
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--server", default="http://127.0.0.1:4000")
+    ap.add_argument("--fake", action="store_true", help="usar tools/fake_backend.py en proceso")
+    ap.add_argument("--devices", type=int, default=100)
+    ap.add_argument("--rate", type=float, default=10, help="lecturas/s de toda la flota")
+    ap.add_argument("--duration", type=float, default=60, help="s")
+    ap.add_argument("--batch", type=int, default=1, help="lecturas por envío (>1: /data/batch)")
+    ap.add_argument("--prefix", default="AURA-LG")
+    ap.add_argument("--start", type=int, default=1, help="primer número de código")
+    ap.add_argument("--claim", metavar="EMAIL:CLAVE", help="reclamar los códigos antes de empezar")
+    ap.add_argument("--skip-register", action="store_true", help="no esperar el 'ok' inicial")
+    ap.add_argument("--retry", type=float, default=1,
+                    help="s entre intentos de registro (--legacy-register)")
+    ap.add_argument("--legacy-register", action="store_true",
+                    help="registro anterior: POST /data cada --retry s")
+    ap.add_argument("--unclaimed", action="store_true",
+                    help="con --fake: los dispositivos empiezan sin reclamar")
+    ap.add_argument("--claim-after", type=float, help="con --unclaimed: s hasta reclamarlos")
+    ap.add_argument("--report", type=float, default=10, help="s entre informes parciales")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    raise_fd_limit()
+    server = args.server
+    srv = None
+    if args.fake:
+        import fake_backend
+        srv = fake_backend.make_server(unregistered=args.unclaimed,
+                                       claim_after=args.claim_after if args.unclaimed else None)
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        server = "http://%s:%d" % srv.server_address
+    if args.claim:
+        codes = ["%s%05d" % (args.prefix, args.start + i) for i in range(args.devices)]
+        print("reclamados %d/%d" % (claim_devices(server, codes, args.claim), len(codes)))
+
+    print("%d dispositivos, %.1f lecturas/s, %.0f s contra %s"
+          % (args.devices, args.rate, args.duration, server))
+    asyncio.run(run(args, server))
+    if srv is not None:
+        st = srv.stats
+        print("backend      peticiones=%d (%.1f/s) conexiones=%d mediciones=%d"
+              % (st.requests, st.requests / args.duration, st.connections, st.measurements))
+        srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
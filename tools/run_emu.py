@@ -0,0 +1,210 @@
+"""
+run_emu.py – ejecuta el firmware AURA en el host con tools/emu
+---------------------------------------------------------------
+Carga raspberry.py o raspberry_defsim.py sin modificar sobre los módulos
+falsos (machine, network, dht, ssd1306, uasyncio con reloj virtual), lo
+apunta a tools/fake_backend.py (o a --server) y lo deja correr el tiempo
+virtual indicado, más rápido que en tiempo real.
+
+Uso:
+    python tools/run_emu.py raspberry --duration 3600
+    python tools/run_emu.py raspberry_defsim --set SIMULATE=False \\
+        --wav clase.wav --dht traza.csv --latency 120 --drop 0.05 \\
+        --outage 600:900 --quiet
+    python tools/run_emu.py raspberry --set DUAL_CORE=True   # captura en un hilo
+    python tools/run_emu.py raspberry --mqtt     # lotes por MQTT (tools/fake_broker.py)
+
+Con DUAL_CORE=True el núcleo 1 es un hilo real de CPython que compite
+con el bucle asyncio: sirve para buscar carreras entre ambos núcleos y
+medir cuántos bloques de audio procesa por segundo virtual.
+"""
+
+import argparse
+import ast
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import emu  # noqa: E402
+
+
+def parse_outage(text):
+    start, end = text.split(":")
+    return float(start), float(end)
+
+
+def start_backend(latency):
+    import fake_backend
+    srv = fake_backend.make_server(latency=latency / 1000)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, "http://%s:%d" % srv.server_address
+
+
+def start_broker(srv):
+    """Broker MQTT falso; los lotes de aura/+/batch van a fake_backend como en el backend real."""
+    import json
+    import fake_broker
+
+    def ingest(topic, msg):
+        if srv is None:
+            return
+        if fake_broker.topic_matches("aura/+/batch", topic):
+            srv.ingest(json.loads(msg))
+        elif fake_broker.topic_matches("aura/+/alert", topic):
+            srv.alert(json.loads(msg))
+
+    brk = fake_broker.make_broker(on_publish=ingest)
+    threading.Thread(target=brk.serve_forever, daemon=True).start()
+    return brk
+
+
+async def _run_for(coro, seconds):
+    import uasyncio as asyncio
+    try:
+        await asyncio.wait_for(coro, seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+def run(args):
+    emu.install()
+    import clock
+    import dht
+    import machine
+    import network
+    import uasyncio
+
+    link = network.link
+    link.latency = args.latency / 1000
+    link.drop_rate = args.drop
+    link.outages = [parse_outage(o) for o in args.outage]
+    link.connect_delay = args.connect_delay
+    if args.wav:
+        machine.I2S.source = machine.WavSource(args.wav)
+    if args.dht:
+        dht.script = os.path.abspath(args.dht)   # se lee tras el chdir a la flash
+
+    srv = None
+    server_url = args.server
+    if not server_url:
+        srv, server_url = start_backend(args.backend_latency)
+
+    brk = start_broker(srv) if args.mqtt else None
+
+    # La flash del dispositivo (spool/...) es un directorio temporal
+    os.chdir(args.flash or tempfile.mkdtemp(prefix="aura-flash-"))
+    mod = emu.load(args.module)
+    mod.SERVER_URL = server_url
+    if brk is not None:
+        mod.TRANSPORT = "mqtt"
+        mod.MQTT_BROKER, mod.MQTT_PORT = brk.server_address
+    for item in args.set:
+        name, value = item.split("=", 1)
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass
+        setattr(mod, name, value)
+
+    out = io.StringIO() if args.quiet else sys.stdout
+    reset = False
+    with contextlib.redirect_stdout(out):
+        dev = mod.AuraDevice()
+        main = dev.main_loop() if hasattr(dev, "main_loop") else dev.loop()
+        try:
+            uasyncio.run(_run_for(main, args.duration))
+        except machine.Reset:
+            reset = True
+        finally:
+            # Parar el núcleo 1 (si lo hay) antes de resumir
+            audio = getattr(dev, "audio", None)
+            for part in (getattr(audio, "capture", None), getattr(audio, "sampler", None)):
+                if part is not None:
+                    part.stop()
+            clock.clock.core1 = None
+
+    virtual = clock.clock.now()
+    wall = clock.clock.wall()
+    print("firmware     %s (%s)" % (args.module, server_url))
+    print("tiempo       %.0f s virtuales en %.2f s reales (x%.0f)%s"
+          % (virtual, wall, virtual / max(wall, 1e-6), "  [machine.reset()]" if reset else ""))
+    if srv is not None:
+        st = srv.stats
+        print("backend      peticiones=%d conexiones=%d mediciones=%d"
+              % (st.requests, st.connections, st.measurements))
+        if st.records:
+            # (seq, ts, estado, t, h, dB, nivel) del último registro (aura.codec)
+            print("registros    binarios=%d último=%s" % (st.records, st.last_record))
+        if st.config_gets:
+            print("config       peticiones=%d sin cambios (304)=%d" % (st.config_gets, st.not_modified))
+        if st.health:
+            # [n, mín, media, máx us, media B] por fase (aura.probe)
+            print("salud        heap libre %d B (mín. %d B); %s" % (
+                st.health.get("free", 0), st.health.get("freeMin", 0),
+                " ".join("%s=%dus" % (k, v[2]) for k, v in st.health.get("ph", {}).items())))
+            if st.health.get("late"):
+                # [overruns, retraso máx. ms] por trabajo (aura.sched)
+                print("retrasos     %s" % " ".join(
+                    "%s=%d (máx. %d ms)" % (k, v[0], v[1]) for k, v in st.health["late"].items()))
+        if st.alerts:
+            # age: ms virtuales del cruce al envío (aura.alert)
+            ages = [a["age"] for _, a in st.alerts]
+            print("alertas      %d (%s)  retenidas=%d  edad media %.0f ms, máx. %d ms" % (
+                len(st.alerts), " ".join("%s%s/%s" % ("+" if a["on"] else "-", a["state"], a["field"])
+                                         for _, a in st.alerts[:6]),
+                sum(a.get("held", 0) for _, a in st.alerts), sum(ages) / len(ages), max(ages)))
+    http = getattr(dev, "http", None)
+    if http is not None:
+        print("http         peticiones=%d conexiones=%d" % (http.requests, http.connects))
+    if brk is not None:
+        st = brk.stats
+        print("mqtt         publicaciones=%d conexiones=%d bytes entrada=%d salida=%d"
+              % (st.publishes, st.connections, st.bytes_in, st.bytes_out))
+    print("red          cortes=%d rechazadas=%d" % (link.drops, link.refused))
+    i2c = getattr(dev, "i2c", None)
+    if i2c is not None:
+        print("i2c          %d bytes, %d transacciones" % (i2c.bytes_written, i2c.transactions))
+    spool = getattr(dev, "spool", None)
+    if spool is not None:
+        print("spool        pendientes=%d perdidas=%d" % (spool.pending(), spool.dropped))
+    capture = getattr(getattr(dev, "audio", None), "capture", None)
+    if capture is not None and capture.blocks:
+        # busy_us solo se mide en el núcleo 1 (DUAL_CORE)
+        print("audio        bloques=%d (%.1f/s virtuales)%s"
+              % (capture.blocks, capture.blocks / max(virtual, 1e-6),
+                 "  núcleo 1: %.2f ms/bloque, desbordes=%d"
+                 % (capture.busy_us / capture.blocks / 1000, capture.i2s.dropped)
+                 if capture.busy_us else ""))
+    if srv is not None:
+        srv.shutdown()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("module", nargs="?", default="raspberry",
+                    help="raspberry | raspberry_defsim")
+    ap.add_argument("--duration", type=float, default=600, help="s virtuales")
+    ap.add_argument("--server", help="URL de un backend real (por defecto fake_backend)")
+    ap.add_argument("--backend-latency", type=float, default=0, help="ms del backend falso")
+    ap.add_argument("--wav", help="WAV mono 16 bits para el I2S")
+    ap.add_argument("--dht", help="CSV temp,hum para el DHT")
+    ap.add_argument("--latency", type=float, default=0, help="ms de red por petición")
+    ap.add_argument("--drop", type=float, default=0, help="probabilidad de corte por petición")
+    ap.add_argument("--outage", action="append", default=[], help="inicio:fin en s virtuales")
+    ap.add_argument("--connect-delay", type=float, default=2, help="s hasta tener WiFi")
+    ap.add_argument("--flash", help="directorio que hace de flash (por defecto uno temporal)")
+    ap.add_argument("--set", action="append", default=[], help="CONSTANTE=valor del firmware")
+    ap.add_argument("--mqtt", action="store_true", help="enviar los lotes por MQTT al broker falso")
+    ap.add_argument("-q", "--quiet", action="store_true", help="ocultar la salida del firmware")
+    args = ap.parse_args()
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
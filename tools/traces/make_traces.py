@@ -0,0 +1,148 @@
+"""
+make_traces.py – genera las trazas canónicas de tools/bench_trace.py
+--------------------------------------------------------------------
+Cada traza son dos ficheros con el mismo nombre:
+
+    <traza>.csv   lecturas del DHT, una por muestra (formato de
+                  tools/emu/dht.py: temp,hum; "error" = lectura fallida)
+    <traza>.wav   PCM mono de 16 bits a 16 kHz del micrófono I2S
+
+Las tres trazas son sintéticas y deterministas (semilla fija), con la
+escala de aura.loudness (DB_OFFSET 120: 0 dBFS = 120 dB SPL):
+
+    quiet_office   ~40 dBA de ventilación y teclas sueltas; 22 °C, 45 %
+    noisy_meeting  voces solapadas a 65–75 dBA; la sala se calienta y
+                   se humedece con la gente
+    hvac_failure   zumbido de 120 Hz y aire a ~58 dBA que se para a
+                   mitad de traza; después sube la temperatura y la
+                   humedad, con dos lecturas fallidas del DHT
+
+Sirven también para el emulador:
+    python tools/run_emu.py raspberry --wav tools/traces/noisy_meeting.wav \\
+        --dht tools/traces/noisy_meeting.csv
+
+Una grabación real se añade igual: WAV mono de 16 bits a 16 kHz y un
+CSV con una fila por muestra (SAMPLES filas para SECONDS s de audio).
+
+Uso:
+    python tools/traces/make_traces.py
+"""
+
+import math
+import os
+import random
+import wave
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RATE = 16000
+SECONDS = 6
+SAMPLES = 60             # filas del CSV: un bloque de audio de 100 ms por muestra
+
+
+def lowpass(x, fc):
+    a = 1 - math.exp(-2 * math.pi * fc / RATE)
+    y = 0.0
+    out = []
+    for v in x:
+        y += a * (v - y)
+        out.append(y)
+    return out
+
+
+def highpass(x, fc):
+    low = lowpass(x, fc)
+    return [a - b for a, b in zip(x, low)]
+
+
+def rms(x):
+    return math.sqrt(sum(v * v for v in x) / len(x))
+
+
+def scaled(x, target):
+    k = target / (rms(x) or 1)
+    return [v * k for v in x]
+
+
+def noise(rng, n):
+    return [rng.gauss(0, 1) for _ in range(n)]
+
+
+def quiet_office(rng):
+    n = RATE * SECONDS
+    air = scaled(lowpass(noise(rng, n), 400), 5)          # ~40 dBA
+    click_at = set(int(rng.uniform(0, n - 400)) for _ in range(8))
+    out = air[:]
+    for start in click_at:
+        for k in range(300):
+            out[start + k] += 250 * math.exp(-k / 40) * rng.gauss(0, 1)
+    rows = [(round(22.0 + 0.3 * math.sin(i / 9), 1), round(45 + math.sin(i / 13), 1))
+            for i in range(SAMPLES)]
+    return out, rows
+
+
+def noisy_meeting(rng):
+    n = RATE * SECONDS
+    voice = highpass(lowpass(noise(rng, n), 3000), 300)
+    out = []
+    for i, v in enumerate(voice):
+        t = i / RATE
+        syll = abs(math.sin(2 * math.pi * 4 * t)) * (0.6 + 0.4 * math.sin(2 * math.pi * 0.3 * t))
+        out.append(v * syll)
+    out = scaled(out, 150)                                # ~72 dBA
+    back = scaled(lowpass(noise(rng, n), 500), 30)
+    out = [a + b for a, b in zip(out, back)]
+    rows = [(round(22.5 + 2.3 * i / SAMPLES, 1), round(46 + 9 * i / SAMPLES, 1))
+            for i in range(SAMPLES)]
+    return out, rows
+
+
+def hvac_failure(rng):
+    n = RATE * SECONDS
+    stop = n // 2
+    hum = [math.sin(2 * math.pi * 120 * i / RATE) + 0.5 * math.sin(2 * math.pi * 240 * i / RATE)
+           + 0.25 * math.sin(2 * math.pi * 360 * i / RATE) for i in range(n)]
+    hum = scaled(hum, 45)
+    air = scaled(lowpass(noise(rng, n), 1500), 25)
+    room = scaled(lowpass(noise(rng, n), 400), 5)
+    out = []
+    for i in range(n):
+        g = 1.0 if i < stop else math.exp(-(i - stop) / (0.3 * RATE))
+        out.append(g * (hum[i] + air[i]) + room[i])
+    rows = []
+    for i in range(SAMPLES):
+        k = max(0, i - SAMPLES // 2)
+        rows.append((round(22.0 + 0.25 * k, 1), round(45 + 0.5 * k, 1)))
+    rows[40] = rows[47] = None                            # DHT sin respuesta
+    return out, rows
+
+
+def write(name, samples, rows, about):
+    pcm = array("h", (max(-32768, min(32767, int(round(v)))) for v in samples))
+    with wave.open(os.path.join(HERE, name + ".wav"), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(pcm.tobytes())
+    with open(os.path.join(HERE, name + ".csv"), "w", newline="") as f:
+        f.write("# %s\ntemp,hum\n" % about)
+        for row in rows:
+            f.write("error\n" if row is None else "%.1f,%.1f\n" % row)
+    print("%-14s %d muestras, %.1f s de audio" % (name, len(rows), len(pcm) / RATE))
+
+
+TRACES = (
+    ("quiet_office", quiet_office, "oficina en silencio: ventilación y teclas sueltas"),
+    ("noisy_meeting", noisy_meeting, "reunión ruidosa: voces solapadas, la sala se calienta"),
+    ("hvac_failure", hvac_failure, "fallo de climatización: se para el aire y sube la temperatura"),
+)
+
+
+def main():
+    for seed, (name, make, about) in enumerate(TRACES, 1):
+        samples, rows = make(random.Random(seed))
+        write(name, samples, rows, about)
+
+
+if __name__ == "__main__":
+    main()